@@ -0,0 +1,505 @@
+"""
+Offline load test for the ticker and watchlist APIs.
+
+Boots `main.app` in-process against a fresh file-backed SQLite DB with a
+deterministic fake yfinance (optionally with simulated Yahoo latency),
+then has `--concurrency` virtual users run weighted request mixes for
+`--duration` seconds:
+
+    dashboard  watchlist, snapshot, batch info/intraday, news and FX
+    research   info, intraweek, quarterly and annual reports for one ticker
+    backfill   daily history over multi-year ranges (rows and columnar)
+    positions  create, read, update and delete a watchlist position
+
+p50/p95/p99 latency and requests/sec per route are printed and written as
+JSON to `--output`, so runs can be compared for regressions.
+
+    python benchmarks/load_test.py --duration 10 --concurrency 16 \\
+        --mix dashboard=4,research=2,backfill=2,positions=2 --output load_test.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+TICKERS = ["AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "META", "TSLA", "JPM"]
+WATCHLIST_SIZE = 5
+CURRENCIES = ["SGD", "EUR", "JPY", "GBP"]
+BACKFILL_STARTS = [
+    f"{year}-{month:02d}-01" for year in range(2015, 2024) for month in (1, 7)
+]
+BACKFILL_YEARS = [1, 2, 5]
+DEFAULT_MIX = "dashboard=4,research=2,backfill=2,positions=2"
+PERIOD_SECONDS = {"1d": 86400, "5d": 5 * 86400}
+INTERVAL_SECONDS = {"1m": 60, "1h": 3600, "1d": 86400}
+
+
+# Deterministic fake upstream
+
+
+def _to_epoch(value) -> int:
+    if isinstance(value, (int, float, np.integer)):
+        return int(value)
+    return int(pd.Timestamp(value, tz="UTC").timestamp())
+
+
+def fake_bars(symbol: str, start: int, end: int, interval: str) -> pd.DataFrame:
+    """Bars on a fixed grid (weekdays only for daily) with prices seeded by symbol"""
+    step = INTERVAL_SECONDS[interval]
+    timestamps = np.arange((start + step - 1) // step * step, end, step, dtype=np.int64)
+    if interval == "1d":
+        # 1970-01-01 was a Thursday
+        timestamps = timestamps[(timestamps // 86400 + 3) % 7 < 5]
+    seed = zlib.crc32(symbol.encode()) % 1000
+    close = 50 + seed / 10 + 10 * np.sin(timestamps / 86400 / 20 + seed)
+    index = pd.to_datetime(timestamps, unit="s", utc=True)
+    return pd.DataFrame(
+        {
+            "Open": close,
+            "High": close + 1,
+            "Low": close - 1,
+            "Close": close,
+            "Volume": (1_000_000 + seed * 1000 + timestamps % 997).astype(np.int64),
+        },
+        index=index,
+    )
+
+
+def fake_statements(symbol: str, annual: bool):
+    periods = pd.date_range(end="2024-12-31", periods=4, freq="YE" if annual else "QE")
+    columns = periods[::-1]
+    base = 1000.0 + zlib.crc32(symbol.encode()) % 100
+    income = pd.DataFrame(
+        {
+            c: {
+                "Total Revenue": base + i,
+                "Gross Profit": 400.0,
+                "Net Income": 100.0,
+                "Diluted EPS": 1.5,
+                "EBITDA": 200.0,
+            }
+            for i, c in enumerate(columns)
+        }
+    )
+    balance = pd.DataFrame(
+        {
+            c: {
+                "Total Assets": 5000.0,
+                "Total Liabilities Net Minority Interest": 3000.0,
+                "Stockholders Equity": 2000.0,
+            }
+            for c in columns
+        }
+    )
+    cashflow = pd.DataFrame(
+        {c: {"Operating Cash Flow": 150.0, "Free Cash Flow": 120.0} for c in columns}
+    )
+    return income, balance, cashflow
+
+
+class FakeUpstream:
+    """Stands in for yfinance.Ticker and yfinance.download"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    def _wait(self):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def window(self, period=None, start=None, end=None) -> tuple[int, int]:
+        now = int(time.time())
+        if start is None:
+            return now - PERIOD_SECONDS.get(period, 86400), now
+        return _to_epoch(start), _to_epoch(end) if end is not None else now
+
+    def ticker(self, symbol: str, session=None):
+        return FakeTicker(self, symbol.upper())
+
+    def download(self, tickers, period=None, interval="1d", group_by="column", **kw):
+        self._wait()
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        start, end = self.window(period)
+        frames = {}
+        for symbol in tickers:
+            if symbol.endswith("=X"):
+                rate = 1.0 + zlib.crc32(symbol.encode()) % 200 / 10
+                frames[symbol] = pd.DataFrame(
+                    {"Close": [rate]}, index=pd.to_datetime([end], unit="s", utc=True)
+                )
+            else:
+                frames[symbol] = fake_bars(symbol, start, end, interval)
+        df = pd.concat(frames, axis=1)
+        return df if group_by == "ticker" else df.swaplevel(axis=1)
+
+
+class FakeTicker:
+    def __init__(self, upstream: FakeUpstream, symbol: str):
+        self._upstream = upstream
+        self.symbol = symbol
+
+    @property
+    def info(self) -> dict:
+        from calendars import calendar_registry
+
+        self._upstream._wait()
+        seed = zlib.crc32(self.symbol.encode()) % 1000
+        marketOpen = calendar_registry.get("XNYS").is_open(int(time.time()))
+        return {
+            "symbol": self.symbol,
+            "shortName": f"{self.symbol} Inc.",
+            "fullExchangeName": "NasdaqGS",
+            "exchangeTimezoneName": "America/New_York",
+            "marketState": "REGULAR" if marketOpen else "CLOSED",
+            "regularMarketPrice": 50 + seed / 10,
+            "previousClose": 49 + seed / 10,
+            "region": "US",
+            "currency": "USD",
+        }
+
+    def history(self, period=None, interval="1d", start=None, end=None, **kw):
+        self._upstream._wait()
+        return fake_bars(
+            self.symbol, *self._upstream.window(period, start, end), interval
+        )
+
+    def get_news(self, count=10):
+        self._upstream._wait()
+        now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        return [
+            {
+                "content": {
+                    "id": f"{self.symbol}-{i}",
+                    "title": f"{self.symbol} headline {i}",
+                    "provider": {"displayName": "Fake Wire"},
+                    "summary": "Summary",
+                    "pubDate": now.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                }
+            }
+            for i in range(count)
+        ]
+
+    def _statement(self, annual: bool, index: int):
+        self._upstream._wait()
+        return fake_statements(self.symbol, annual)[index]
+
+    quarterly_income_stmt = property(lambda self: self._statement(False, 0))
+    quarterly_balance_sheet = property(lambda self: self._statement(False, 1))
+    quarterly_cashflow = property(lambda self: self._statement(False, 2))
+    income_stmt = property(lambda self: self._statement(True, 0))
+    balance_sheet = property(lambda self: self._statement(True, 1))
+    cashflow = property(lambda self: self._statement(True, 2))
+
+
+# Request mixes; each step is (route label, method, url, json body)
+
+
+def dashboard(user: "VirtualUser"):
+    symbols = ",".join(user.watchlist)
+    ticker = user.rng.choice(user.watchlist)
+    currency = user.rng.choice(CURRENCIES)
+    return [
+        ("GET /users/me/watchlist", "GET", "/users/me/watchlist", None),
+        (
+            "GET /users/me/watchlist/snapshot",
+            "GET",
+            f"/users/me/watchlist/snapshot?currency={currency}",
+            None,
+        ),
+        (
+            "GET /ticker/batch/info",
+            "GET",
+            f"/ticker/batch/info?symbols={symbols}",
+            None,
+        ),
+        (
+            "GET /ticker/batch/intraday",
+            "GET",
+            f"/ticker/batch/intraday?symbols={symbols}",
+            None,
+        ),
+        ("GET /ticker/{ticker}/news", "GET", f"/ticker/{ticker}/news", None),
+        ("GET /forex", "GET", f"/forex?fromCur=USD&toCur={currency}", None),
+    ]
+
+
+def research(user: "VirtualUser"):
+    ticker = user.rng.choice(TICKERS)
+    return [
+        ("GET /ticker/{ticker}/info", "GET", f"/ticker/{ticker}/info", None),
+        ("GET /ticker/{ticker}/intraweek", "GET", f"/ticker/{ticker}/intraweek", None),
+        (
+            "GET /ticker/{ticker}/quarterly-reports",
+            "GET",
+            f"/ticker/{ticker}/quarterly-reports",
+            None,
+        ),
+        (
+            "GET /ticker/{ticker}/annual-reports",
+            "GET",
+            f"/ticker/{ticker}/annual-reports",
+            None,
+        ),
+    ]
+
+
+def backfill(user: "VirtualUser"):
+    ticker = user.rng.choice(TICKERS)
+    start = user.rng.choice(BACKFILL_STARTS)
+    end = f"{int(start[:4]) + user.rng.choice(BACKFILL_YEARS)}{start[4:]}"
+    fmt = user.rng.choice(["rows", "columnar"])
+    return [
+        (
+            "GET /ticker/{ticker}/history",
+            "GET",
+            f"/ticker/{ticker}/history?start={start}&end={end}&format={fmt}",
+            None,
+        )
+    ]
+
+
+def positions(user: "VirtualUser"):
+    ticker = user.rng.choice(user.watchlist)
+    base = f"/users/me/watchlist/{ticker}"
+    body = {"direction": "BUY", "quantity": user.rng.randint(1, 100), "unitCost": 10.0}
+    return [
+        (
+            "POST /users/me/watchlist/{ticker}/positions",
+            "POST",
+            f"{base}/positions",
+            body,
+        ),
+        ("GET /users/me/watchlist/{ticker}", "GET", base, None),
+        ("PUT /users/me/watchlist/{ticker}/positions/{id}", "PUT", None, body),
+        ("DELETE /users/me/watchlist/{ticker}/positions/{id}", "DELETE", None, None),
+    ]
+
+
+SCENARIOS = {
+    "dashboard": dashboard,
+    "research": research,
+    "backfill": backfill,
+    "positions": positions,
+}
+
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name!r}, pick from {list(SCENARIOS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+class VirtualUser:
+    def __init__(self, user_id: int, seed: int):
+        self.user_id = user_id
+        self.rng = random.Random(seed)
+        self.watchlist = self.rng.sample(TICKERS, WATCHLIST_SIZE)
+
+
+async def run_user(client, user, weights, deadline, samples, errors):
+    names, scenario_weights = list(weights), list(weights.values())
+    headers = {"x-bench-user": str(user.user_id)}
+    while time.perf_counter() < deadline:
+        scenario = user.rng.choices(names, scenario_weights)[0]
+        created = None
+        for label, method, url, body in SCENARIOS[scenario](user):
+            # Position updates and deletes target the position just created
+            if url is None:
+                if created is None:
+                    continue
+                url = f"/users/me/watchlist/{created[0]}/positions/{created[1]}"
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, json=body, headers=headers)
+                ok = response.status_code < 400
+            except Exception:
+                ok = False
+            samples.setdefault(label, []).append(time.perf_counter() - start)
+            if not ok:
+                errors[label] = errors.get(label, 0) + 1
+            elif method == "POST":
+                created = (url.split("/")[4], response.json()["id"])
+
+
+def summarize(samples: dict, errors: dict, duration: float) -> dict:
+    routes = {}
+    for label, latencies in sorted(samples.items()):
+        p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+        routes[label] = {
+            "requests": len(latencies),
+            "errors": errors.get(label, 0),
+            "requestsPerSec": len(latencies) / duration,
+            "p50Ms": p50,
+            "p95Ms": p95,
+            "p99Ms": p99,
+        }
+    total = sum(len(v) for v in samples.values())
+    return {
+        "routes": routes,
+        "totalRequests": total,
+        "totalErrors": sum(errors.values()),
+        "requestsPerSec": total / duration,
+    }
+
+
+def seed_users(SessionLocal, models, count: int, seed: int) -> list[VirtualUser]:
+    users = [
+        VirtualUser(user_id, seed=seed * 100_000 + user_id)
+        for user_id in range(1, count + 1)
+    ]
+    with SessionLocal() as db:
+        for user in users:
+            db.add(
+                models.User(
+                    id=user.user_id,
+                    email=f"bench{user.user_id}@example.com",
+                    hashed_password="unused",
+                    is_active=True,
+                    is_superuser=False,
+                    is_verified=True,
+                )
+            )
+            db.add_all(
+                models.UserWatchlist(user_id=user.user_id, ticker=ticker)
+                for ticker in user.watchlist
+            )
+        db.commit()
+    return users
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args, directory: str) -> dict:
+    # The app reads its configuration at import time
+    os.environ["EQUISIGHT_DATABASE_URL"] = f"sqlite:///{directory}/load.db"
+    os.environ["EQUISIGHT_REFRESHER"] = "0"
+
+    from unittest import mock
+
+    from fastapi import Request
+    from httpx import ASGITransport, AsyncClient
+
+    upstream = FakeUpstream(args.upstream_latency)
+    with (
+        mock.patch("yfinance.Ticker", upstream.ticker),
+        mock.patch("yfinance.download", upstream.download),
+    ):
+        import models
+        from auth import current_active_user
+        from database import SessionLocal
+        from main import app
+
+        users = seed_users(SessionLocal, models, args.concurrency, args.seed)
+        accounts = {}
+        with SessionLocal() as db:
+            for user in users:
+                account = db.get(models.User, user.user_id)
+                db.expunge(account)
+                accounts[str(user.user_id)] = account
+
+        def bench_user(request: Request):
+            return accounts[request.headers["x-bench-user"]]
+
+        app.dependency_overrides[current_active_user] = bench_user
+
+        samples, errors = {}, {}
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://bench") as client:
+            start = time.perf_counter()
+            deadline = start + args.duration
+            await asyncio.gather(
+                *(
+                    run_user(client, user, args.weights, deadline, samples, errors)
+                    for user in users
+                )
+            )
+            elapsed = time.perf_counter() - start
+        app.dependency_overrides.clear()
+
+    return {
+        "startedAt": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "config": {
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "mix": args.weights,
+            "upstreamLatency": args.upstream_latency,
+            "seed": args.seed,
+        },
+        "upstreamCalls": upstream.calls,
+        **summarize(samples, errors, elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument(
+        "--upstream-latency",
+        type=float,
+        default=0.05,
+        help="Seconds each fake yfinance call takes",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="load_test.json")
+    args = parser.parse_args()
+    args.weights = parse_mix(args.mix)
+
+    with tempfile.TemporaryDirectory(prefix="equisight-load-") as directory:
+        result = asyncio.run(run(args, directory))
+
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+
+    print(
+        f"{'route':<52}{'req':>7}{'err':>5}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}"
+    )
+    for label, stats in result["routes"].items():
+        print(
+            f"{label:<52}{stats['requests']:>7}{stats['errors']:>5}"
+            f"{stats['requestsPerSec']:>9.1f}{stats['p50Ms']:>9.1f}"
+            f"{stats['p95Ms']:>9.1f}{stats['p99Ms']:>9.1f}"
+        )
+    print(
+        f"total {result['totalRequests']} requests, {result['requestsPerSec']:.1f}/s, "
+        f"{result['totalErrors']} errors; latencies in ms; written to {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Concurrent read/write throughput on SQLite with and without the pragma
+profile from database.py.
+
+Writers upsert 1m bars through the ingestion stage (as /intraday and the
+refresher do) while readers run the intraday endpoint's query, each on its
+own pooled connection, for a fixed duration per profile. Size the pool
+for the task count (EQUISIGHT_DB_POOL_SIZE) so both profiles reuse
+connections rather than reconnecting through the overflow.
+
+    EQUISIGHT_DB_POOL_SIZE=16 python benchmarks/sqlite_concurrency.py --duration 5
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from database import create_engines  # noqa: E402
+from ingestion import bulk_upsert  # noqa: E402
+from models import Base, Intraday  # noqa: E402
+
+TICKERS = [f"T{i:03d}" for i in range(50)]
+START = 1_700_000_000
+SESSION_BARS = 390
+BARS_PER_WRITE = 60
+
+
+async def writer(session_maker, deadline, counts, seed):
+    rng = np.random.default_rng(seed)
+    while time.perf_counter() < deadline:
+        ticker = TICKERS[rng.integers(len(TICKERS))]
+        offset = int(rng.integers(0, SESSION_BARS - BARS_PER_WRITE)) * 60
+        columns = {
+            "timestamp": START + offset + 60 * np.arange(BARS_PER_WRITE),
+            "close": rng.random(BARS_PER_WRITE) * 100,
+        }
+        try:
+            async with session_maker() as db:
+                await bulk_upsert(db, Intraday, ticker, columns, ("close",))
+                await db.commit()
+            counts["writes"] += 1
+        except Exception:
+            counts["errors"] += 1
+
+
+async def reader(session_maker, deadline, counts, seed):
+    rng = np.random.default_rng(seed)
+    while time.perf_counter() < deadline:
+        ticker = TICKERS[rng.integers(len(TICKERS))]
+        try:
+            async with session_maker() as db:
+                stmt = (
+                    select(Intraday.timestamp, Intraday.close)
+                    .filter_by(ticker=ticker)
+                    .order_by(Intraday.timestamp.desc())
+                )
+                (await db.execute(stmt)).all()
+            counts["reads"] += 1
+        except Exception:
+            counts["errors"] += 1
+
+
+# A full session per ticker up front, so writers overwrite rather than grow
+async def seed(session_maker):
+    columns = {
+        "timestamp": START + 60 * np.arange(SESSION_BARS),
+        "close": np.full(SESSION_BARS, 100.0),
+    }
+    async with session_maker() as db:
+        for ticker in TICKERS:
+            await bulk_upsert(db, Intraday, ticker, columns)
+        await db.commit()
+
+
+async def run_profile(tuned: bool, args) -> dict:
+    with tempfile.TemporaryDirectory(prefix="equisight-bench-") as directory:
+        engine, async_engine = create_engines(
+            f"sqlite:///{directory}/bench.db", sqlite_tuning=tuned
+        )
+        Base.metadata.create_all(bind=engine)
+        session_maker = sessionmaker(
+            async_engine, class_=AsyncSession, expire_on_commit=False
+        )
+        await seed(session_maker)
+
+        counts = {"reads": 0, "writes": 0, "errors": 0}
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(
+            *(writer(session_maker, deadline, counts, i) for i in range(args.writers)),
+            *(
+                reader(session_maker, deadline, counts, 1000 + i)
+                for i in range(args.readers)
+            ),
+        )
+        await async_engine.dispose()
+        engine.dispose()
+
+    return {
+        "profile": "tuned" if tuned else "default",
+        "readsPerSec": counts["reads"] / args.duration,
+        "writesPerSec": counts["writes"] / args.duration,
+        "errors": counts["errors"],
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"{'profile':<10}{'reads/s':>12}{'writes/s':>12}{'errors':>8}")
+    for tuned in (False, True):
+        result = await run_profile(tuned, args)
+        print(
+            f"{result['profile']:<10}{result['readsPerSec']:>12.1f}"
+            f"{result['writesPerSec']:>12.1f}{result['errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,374 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+from metrics import record_cache
+from responses import dump_json, load_json
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # pragma: no cover - optional "redis" extra
+    redis = None
+
+# memory:// (per process), sqlite:///path/to/cache.db (per host) or
+# redis://host:6379/0 (shared by every worker); empty disables the L2 tier
+CACHE_URL = os.getenv("EQUISIGHT_CACHE_URL", "memory://")
+# Bump when the shape of any cached value changes
+CACHE_VERSION = 1
+KEY_PREFIX = "equisight"
+L1_MAX_ENTRIES = 4096
+# Bounds how long a worker can serve an entry another worker invalidated
+L1_TTL_SECONDS = 5
+# Writes between sweeps of expired entries
+PURGE_EVERY = 256
+# Bounds the in-process L2 (memory://)
+MEMORY_MAX_ENTRIES = 10_000
+
+
+class CacheBackend:
+    """Shared (L2) byte store. Expired keys read as None."""
+
+    async def get(self, key: str) -> bytes | None:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        raise NotImplementedError
+
+    async def delete(self, key: str):
+        raise NotImplementedError
+
+    async def incr(self, key: str) -> int:
+        """Atomically add one to an integer key (starting from 0), no expiry"""
+        raise NotImplementedError
+
+    async def clear(self):
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """
+    Local stand-in for a shared store, visible to this process only.
+    Bounded to `max_entries` (least recently used go first), with expired
+    entries swept every PURGE_EVERY writes.
+    """
+
+    def __init__(self, max_entries: int = MEMORY_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._values: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        # Tag generations are kept apart so eviction never resets them
+        self._counters: dict[str, int] = {}
+        self._writes = 0
+
+    async def get(self, key):
+        if key in self._counters:
+            return str(self._counters[key]).encode()
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.time():
+            del self._values[key]
+            return None
+        self._values.move_to_end(key)
+        return entry[0]
+
+    async def set(self, key, value, ttl):
+        self._values[key] = (value, time.time() + ttl)
+        self._values.move_to_end(key)
+        while len(self._values) > self.max_entries:
+            self._values.popitem(last=False)
+        self._writes += 1
+        if self._writes % PURGE_EVERY == 0:
+            now = time.time()
+            for expired in [k for k, (_, exp) in self._values.items() if exp <= now]:
+                del self._values[expired]
+
+    async def delete(self, key):
+        self._values.pop(key, None)
+        self._counters.pop(key, None)
+
+    async def incr(self, key):
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    async def clear(self):
+        self._values.clear()
+        self._counters.clear()
+
+    def __len__(self):
+        return len(self._values)
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Cache table in a SQLite file, shared by every worker on the host.
+    Queries run on a thread so lock waits never block the event loop.
+    """
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache "
+            "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expiresAt REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _run(self, sql: str, params=(), one=False):
+        with self._lock, self._conn:
+            cursor = self._conn.execute(sql, params)
+            return cursor.fetchone() if one else None
+
+    async def get(self, key):
+        row = await asyncio.to_thread(
+            self._run,
+            "SELECT value FROM cache WHERE key = ? AND expiresAt > ?",
+            (key, time.time()),
+            True,
+        )
+        if row is None:
+            return None
+        # incr() leaves integers behind
+        return row[0] if isinstance(row[0], bytes) else str(row[0]).encode()
+
+    async def set(self, key, value, ttl):
+        await asyncio.to_thread(
+            self._run,
+            "INSERT OR REPLACE INTO cache VALUES (?, ?, ?)",
+            (key, value, time.time() + ttl),
+        )
+        self._writes += 1
+        if self._writes % PURGE_EVERY == 0:
+            await asyncio.to_thread(
+                self._run, "DELETE FROM cache WHERE expiresAt <= ?", (time.time(),)
+            )
+
+    async def delete(self, key):
+        await asyncio.to_thread(self._run, "DELETE FROM cache WHERE key = ?", (key,))
+
+    async def incr(self, key):
+        row = await asyncio.to_thread(
+            self._run,
+            "INSERT INTO cache VALUES (?, '1', 1e300) ON CONFLICT(key) DO UPDATE "
+            "SET value = CAST(CAST(value AS TEXT) AS INTEGER) + 1 RETURNING value",
+            (key,),
+            True,
+        )
+        return int(row[0])
+
+    async def clear(self):
+        await asyncio.to_thread(self._run, "DELETE FROM cache")
+
+
+class RedisBackend(CacheBackend):
+    """Any server speaking the Redis protocol (Redis, Valkey, KeyDB, ...)"""
+
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError(
+                "Redis cache requires redis (install the 'redis' extra)."
+            )
+        self._client = redis.from_url(url)
+
+    async def get(self, key):
+        return await self._client.get(key)
+
+    async def set(self, key, value, ttl):
+        await self._client.set(key, value, px=max(int(ttl * 1000), 1))
+
+    async def delete(self, key):
+        await self._client.delete(key)
+
+    async def incr(self, key):
+        return await self._client.incr(key)
+
+    async def clear(self):
+        async for key in self._client.scan_iter(match=f"{KEY_PREFIX}:*"):
+            await self._client.delete(key)
+
+
+def create_backend(url: str) -> CacheBackend | None:
+    if not url:
+        return None
+    scheme = urlparse(url).scheme
+    if scheme == "memory":
+        return MemoryBackend()
+    if scheme == "sqlite":
+        return SQLiteBackend(url.removeprefix("sqlite:///"))
+    if scheme in ("redis", "rediss", "unix"):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported cache backend: {scheme}")
+
+
+def bars_tag(model, ticker: str) -> str:
+    """Tag of everything derived from `model` bars of `ticker`"""
+    return f"bars:{model.__tablename__}:{ticker}"
+
+
+class TieredCache:
+    """
+    Read-through cache of JSON-serializable values: a per-process LRU (L1)
+    in front of an optional shared backend (L2).
+
+    Keys are versioned with CACHE_VERSION. Values can carry a tag, whose
+    generation counter lives in L2 and is part of the key, so
+    `invalidate(tag)` drops every value under it for all workers at once.
+    L1 entries are kept at most `l1_ttl`, which bounds how long another
+    worker's invalidation can go unnoticed.
+    """
+
+    def __init__(
+        self,
+        l2: CacheBackend | None = None,
+        l1_size: int = L1_MAX_ENTRIES,
+        l1_ttl: float = L1_TTL_SECONDS,
+    ):
+        self.l2 = l2
+        self.l1_size = l1_size
+        self.l1_ttl = l1_ttl
+        # key -> (value, storedAt, L1 expiry)
+        self._l1: OrderedDict[str, tuple] = OrderedDict()
+        self._generations: dict[str, tuple[int, float]] = {}
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._hits = {"l1": 0, "l2": 0}
+        self._misses = 0
+
+    async def _generation(self, tag: str) -> int:
+        cached = self._generations.get(tag)
+        if cached is not None and (self.l2 is None or cached[1] > time.time()):
+            return cached[0]
+        raw = await self.l2.get(self._tag_key(tag)) if self.l2 is not None else None
+        generation = int(raw) if raw else 0
+        self._generations[tag] = (generation, time.time() + self.l1_ttl)
+        return generation
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{KEY_PREFIX}:v{CACHE_VERSION}:tag:{tag}"
+
+    async def _key(self, namespace: str, key: str, tag: str | None) -> str:
+        full = f"{KEY_PREFIX}:v{CACHE_VERSION}:{namespace}:{key}"
+        if tag is not None:
+            full += f"@{tag}#{await self._generation(tag)}"
+        return full
+
+    def _store_l1(self, key: str, value, stored_at: float, ttl: float):
+        expires = min(stored_at + ttl, time.time() + self.l1_ttl)
+        self._l1[key] = (value, stored_at, expires)
+        self._l1.move_to_end(key)
+        while len(self._l1) > self.l1_size:
+            self._l1.popitem(last=False)
+
+    async def get(
+        self,
+        namespace: str,
+        key: str,
+        max_age: float | None = None,
+        tag: str | None = None,
+    ):
+        """Cached value, or None if missing, expired or older than `max_age`"""
+        full = await self._key(namespace, key, tag)
+        now = time.time()
+
+        entry = self._l1.get(full)
+        if entry is not None and entry[2] > now:
+            if max_age is None or now - entry[1] < max_age:
+                self._l1.move_to_end(full)
+                self._hits["l1"] += 1
+                record_cache(f"shared:{namespace}", hits=1)
+                return entry[0]
+
+        raw = await self.l2.get(full) if self.l2 is not None else None
+        if raw is not None:
+            stamp, _, payload = raw.partition(b"\n")
+            stored_at = float(stamp)
+            if max_age is None or now - stored_at < max_age:
+                value = load_json(payload)
+                self._store_l1(full, value, stored_at, self.l1_ttl)
+                self._hits["l2"] += 1
+                record_cache(f"shared:{namespace}", hits=1)
+                return value
+
+        self._misses += 1
+        record_cache(f"shared:{namespace}", misses=1)
+        return None
+
+    async def set(
+        self, namespace: str, key: str, value, ttl: float, tag: str | None = None
+    ):
+        full = await self._key(namespace, key, tag)
+        stored_at = time.time()
+        self._store_l1(full, value, stored_at, ttl)
+        if self.l2 is not None:
+            envelope = f"{stored_at:.6f}\n".encode() + dump_json(value)
+            await self.l2.set(full, envelope, ttl)
+
+    async def get_or_load(
+        self,
+        namespace: str,
+        key: str,
+        loader,
+        ttl: float,
+        max_age: float | None = None,
+        tag: str | None = None,
+    ):
+        """
+        Cached value, or the result of `await loader()` which is then stored.
+        Concurrent misses in this process share one load; None isn't stored.
+        """
+        value = await self.get(namespace, key, max_age, tag)
+        if value is not None:
+            return value
+
+        flight = f"{namespace}:{key}:{tag}:{max_age}"
+        inflight = self._inflight.get(flight)
+        if inflight is None:
+
+            async def load():
+                value = await loader()
+                if value is not None:
+                    await self.set(namespace, key, value, ttl, tag)
+                return value
+
+            inflight = asyncio.ensure_future(load())
+            self._inflight[flight] = inflight
+
+            def _done(fut, flight=flight):
+                if self._inflight.get(flight) is fut:
+                    del self._inflight[flight]
+
+            inflight.add_done_callback(_done)
+
+        # Shield so one cancelled request does not cancel the shared load
+        return await asyncio.shield(inflight)
+
+    async def invalidate(self, tag: str):
+        """Retire every value stored under `tag`, in every worker"""
+        if self.l2 is not None:
+            generation = await self.l2.incr(self._tag_key(tag))
+        else:
+            generation = self._generations.get(tag, (0, 0))[0] + 1
+        self._generations[tag] = (generation, time.time() + self.l1_ttl)
+
+    async def clear(self):
+        self._l1.clear()
+        self._generations.clear()
+        self._inflight.clear()
+        if self.l2 is not None:
+            await self.l2.clear()
+
+    def stats(self) -> dict:
+        return {
+            "l1Entries": len(self._l1),
+            "l1Hits": self._hits["l1"],
+            "l2Hits": self._hits["l2"],
+            "misses": self._misses,
+        }
+
+
+shared_cache = TieredCache(create_backend(CACHE_URL))
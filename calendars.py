@@ -0,0 +1,93 @@
+import threading
+from dataclasses import dataclass
+
+import exchange_calendars as xcals
+import numpy as np
+
+
+@dataclass(frozen=True)
+class SessionTable:
+    """
+    Flat NumPy view of an exchange calendar's schedule.
+
+    `sessions` are session dates (datetime64[D]), `midnights` the local
+    midnight of each session in epoch seconds (the timestamp yfinance gives
+    daily bars), `opens`/`closes` the session open/close in epoch seconds.
+    All lookups are `searchsorted` calls on these arrays.
+    """
+
+    iso: str
+    sessions: np.ndarray
+    midnights: np.ndarray
+    opens: np.ndarray
+    closes: np.ndarray
+
+    @classmethod
+    def from_calendar(cls, iso: str, calendar: xcals.ExchangeCalendar):
+        sessions = calendar.sessions
+        return cls(
+            iso=iso,
+            sessions=sessions.values.astype("datetime64[D]"),
+            midnights=sessions.tz_localize(calendar.tz).as_unit("s").asi8,
+            opens=calendar.opens.dt.as_unit("s").astype("int64").to_numpy(),
+            closes=calendar.closes.dt.as_unit("s").astype("int64").to_numpy(),
+        )
+
+    def session_index(self, day) -> int | None:
+        day = np.datetime64(day, "D")
+        idx = int(np.searchsorted(self.sessions, day))
+        if idx < len(self.sessions) and self.sessions[idx] == day:
+            return idx
+        return None
+
+    def sessions_between(self, start, end) -> slice:
+        """Indexes of sessions with start <= date <= end (YYYY-MM-DD or date)"""
+        lo = np.searchsorted(self.sessions, np.datetime64(start, "D"), side="left")
+        hi = np.searchsorted(self.sessions, np.datetime64(end, "D"), side="right")
+        return slice(int(lo), int(hi))
+
+    def covers(self, start, end) -> bool:
+        return (
+            self.sessions[0] <= np.datetime64(start, "D")
+            and np.datetime64(end, "D") <= self.sessions[-1]
+        )
+
+    def latest_open_index(self, ts: int) -> int:
+        """Index of the most recent session that opened at or before ts"""
+        return int(np.searchsorted(self.opens, ts, side="right")) - 1
+
+    def previous_open(self, ts: int) -> int:
+        return int(self.opens[np.searchsorted(self.opens, ts, side="left") - 1])
+
+    def previous_close(self, ts: int) -> int:
+        return int(self.closes[np.searchsorted(self.closes, ts, side="left") - 1])
+
+    def is_open(self, ts: int) -> bool:
+        idx = self.latest_open_index(ts)
+        return idx >= 0 and ts < self.closes[idx]
+
+    def last_sessions(self, count: int, ts: int) -> slice:
+        """The `count` most recent sessions that have opened by ts"""
+        end = self.latest_open_index(ts) + 1
+        return slice(max(end - count, 0), end)
+
+
+class CalendarRegistry:
+    """Builds each exchange calendar once per process"""
+
+    def __init__(self):
+        self._tables: dict[str, SessionTable] = {}
+        self._lock = threading.Lock()
+
+    def get(self, iso: str) -> SessionTable:
+        table = self._tables.get(iso)
+        if table is None:
+            with self._lock:
+                table = self._tables.get(iso)
+                if table is None:
+                    table = SessionTable.from_calendar(iso, xcals.get_calendar(iso))
+                    self._tables[iso] = table
+        return table
+
+
+calendar_registry = CalendarRegistry()
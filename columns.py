@@ -0,0 +1,13 @@
+import numpy as np
+
+
+def to_records(columns: dict, fields) -> list[dict]:
+    """Column arrays -> list of dicts, NaN as None"""
+    arrays = [columns[field].tolist() for field in fields]
+    return [
+        {
+            field: None if isinstance(v, float) and np.isnan(v) else v
+            for field, v in zip(fields, values)
+        }
+        for values in zip(*arrays)
+    ]
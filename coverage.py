@@ -0,0 +1,53 @@
+import numpy as np
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import HistoryCoverage
+
+DAY_SECONDS = 86400
+
+
+async def load_coverage(db: AsyncSession, ticker: str) -> np.ndarray:
+    """Covered spans for a ticker as an (n, 2) array sorted by start"""
+    stmt = (
+        select(HistoryCoverage.rangeStart, HistoryCoverage.rangeEnd)
+        .filter(HistoryCoverage.ticker == ticker)
+        .order_by(HistoryCoverage.rangeStart)
+    )
+    rows = (await db.execute(stmt)).all()
+    return np.array(rows, dtype=np.int64).reshape(-1, 2)
+
+
+def uncovered_sessions(sessions: np.ndarray, coverage: np.ndarray) -> np.ndarray:
+    """Sessions (sorted timestamps) that fall outside every covered span"""
+    if len(coverage) == 0:
+        return sessions
+    starts, ends = coverage[:, 0], coverage[:, 1]
+    idx = np.searchsorted(starts, sessions, side="right") - 1
+    covered = (idx >= 0) & (sessions <= ends[np.maximum(idx, 0)])
+    return sessions[~covered]
+
+
+async def record_coverage(db: AsyncSession, ticker: str, start: int, end: int):
+    """
+    Mark [start, end] as fetched, merging any spans it overlaps or touches
+    (starts within a day of) into a single row. Does not commit.
+    """
+    start, end = int(start), int(end)
+    stmt = select(HistoryCoverage).filter(
+        HistoryCoverage.ticker == ticker,
+        HistoryCoverage.rangeStart <= end + DAY_SECONDS,
+        HistoryCoverage.rangeEnd >= start - DAY_SECONDS,
+    )
+    overlapping = (await db.execute(stmt)).scalars().all()
+
+    if overlapping:
+        start = min(start, *(c.rangeStart for c in overlapping))
+        end = max(end, *(c.rangeEnd for c in overlapping))
+        await db.execute(
+            delete(HistoryCoverage).where(
+                HistoryCoverage.id.in_([c.id for c in overlapping])
+            )
+        )
+
+    db.add(HistoryCoverage(ticker=ticker, rangeStart=start, rangeEnd=end))
@@ -1,19 +1,91 @@
-from sqlalchemy import create_engine
+import os
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, make_url
 from sqlalchemy.orm import sessionmaker
 from models import Base
+from migrations import run_migrations
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from typing import AsyncGenerator
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///equisight-backend.db"
-ASYNC_SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///equisight-backend.db"
+# Any SQLite or PostgreSQL URL; the driver is picked per engine below
+DATABASE_URL = os.getenv("EQUISIGHT_DATABASE_URL", "sqlite:///equisight-backend.db")
+POOL_SIZE = int(os.getenv("EQUISIGHT_DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("EQUISIGHT_DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("EQUISIGHT_DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("EQUISIGHT_DB_POOL_RECYCLE", "1800"))
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# SQLite performance profile, applied to every new connection on both engines
+SQLITE_TUNING = os.getenv("EQUISIGHT_SQLITE_TUNING", "1") != "0"
+SQLITE_PRAGMAS = {
+    # Readers no longer block on the writer (and vice versa)
+    "journal_mode": "WAL",
+    # Durable across app crashes in WAL mode, fsyncs only at checkpoints
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    # Negative values are KiB, i.e. 64 MiB of page cache per connection
+    "cache_size": -64 * 1024,
+    "busy_timeout": 5000,
+}
+
+# Backend -> (sync driver, async driver)
+DRIVERS = {
+    "sqlite": ("sqlite", "sqlite+aiosqlite"),
+    "postgresql": ("postgresql+psycopg", "postgresql+asyncpg"),
+}
+
+
+def derive_urls(url: str) -> tuple[URL, URL]:
+    """Sync and async URLs for the same database, whatever driver `url` names"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in DRIVERS:
+        raise ValueError(f"Unsupported database backend: {backend}")
+    sync_driver, async_driver = DRIVERS[backend]
+    return url.set(drivername=sync_driver), url.set(drivername=async_driver)
+
+
+def engine_options(url: URL) -> dict:
+    options = {}
+    if url.get_backend_name() == "sqlite":
+        if url.get_dialect().driver == "pysqlite":
+            options["connect_args"] = {"check_same_thread": False}
+        # In-memory databases use a single-connection pool
+        if url.database in (None, "", ":memory:"):
+            return options
+    else:
+        options["pool_pre_ping"] = True
+    return options | {
+        "pool_size": POOL_SIZE,
+        "max_overflow": MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT,
+        "pool_recycle": POOL_RECYCLE,
+    }
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def create_engines(url: str, sqlite_tuning: bool = SQLITE_TUNING):
+    sync_url, async_url = derive_urls(url)
+    engine = create_engine(sync_url, **engine_options(sync_url))
+    async_engine = create_async_engine(async_url, **engine_options(async_url))
+    if sqlite_tuning and sync_url.get_backend_name() == "sqlite":
+        event.listen(engine, "connect", apply_sqlite_pragmas)
+        event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+    return engine, async_engine
+
+
+SQLALCHEMY_DATABASE_URL, ASYNC_SQLALCHEMY_DATABASE_URL = derive_urls(DATABASE_URL)
+
+engine, async_engine = create_engines(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Async enginge for FastAPI users
-async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL)
 async_session_maker = sessionmaker(
     async_engine, class_=AsyncSession, expire_on_commit=False
 )
@@ -21,6 +93,7 @@ async_session_maker = sessionmaker(
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
 
 
 def get_db():
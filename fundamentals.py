@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+from columns import to_records
+
+# Stored field -> (statement, yfinance row labels tried in order)
+METRIC_MAP = {
+    "revenue": ("income", ("Total Revenue",)),
+    "eps": ("income", ("Diluted EPS",)),
+    "ebitda": ("income", ("EBITDA",)),
+    "netIncome": ("income", ("Net Income",)),
+    "totalAssets": ("balance", ("Total Assets",)),
+    "totalLiabilities": (
+        "balance",
+        (
+            "Total Liab",
+            "Total Liabilities Net Minority Interest",
+            "Total Liabilities",
+        ),
+    ),
+    "shareholderEquity": ("balance", ("Stockholders Equity",)),
+    "longTermDebt": ("balance", ("Long Term Debt And Capital Lease Obligation",)),
+    "cashAndEquivalents": ("balance", ("Cash And Cash Equivalents",)),
+    "operatingCashFlow": ("cashflow", ("Operating Cash Flow",)),
+    "freeCashFlow": ("cashflow", ("Free Cash Flow",)),
+}
+# Only read to derive ratios
+INPUT_MAP = {
+    "grossProfit": ("income", ("Gross Profit",)),
+}
+RATIO_FIELDS = ("grossMargin", "roe", "roa", "debtToEquity")
+METRIC_FIELDS = (*METRIC_MAP, *RATIO_FIELDS)
+
+
+def _reindex(statement, labels, periods) -> pd.DataFrame:
+    if statement is None:
+        return pd.DataFrame(np.nan, index=labels, columns=periods)
+    statement = statement[~statement.index.duplicated()]
+    frame = statement.reindex(index=labels, columns=periods)
+    return frame.apply(pd.to_numeric, errors="coerce")
+
+
+def normalise_statements(statements: dict, periods) -> dict:
+    """
+    Float64 array per field in METRIC_MAP/INPUT_MAP, aligned with `periods`.
+
+    Each statement is reindexed once to the labels it provides. Fallback
+    chains are resolved for all periods at once by back-filling up the chain
+    so the first label with a value wins.
+    """
+    fields = METRIC_MAP | INPUT_MAP
+    frames = {}
+    for name, statement in statements.items():
+        labels = list(
+            dict.fromkeys(
+                label
+                for source, chain in fields.values()
+                if source == name
+                for label in chain
+            )
+        )
+        frames[name] = _reindex(statement, labels, periods)
+
+    metrics = {}
+    for field, (name, chain) in fields.items():
+        frame = frames.get(name)
+        if frame is None:
+            metrics[field] = np.full(len(periods), np.nan)
+            continue
+        metrics[field] = (
+            frame.loc[list(chain)].bfill().iloc[0].to_numpy(dtype=np.float64)
+        )
+    return metrics
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    return np.divide(
+        numerator,
+        denominator,
+        out=np.full(numerator.shape, np.nan),
+        where=(denominator != 0) & ~np.isnan(denominator),
+    )
+
+
+def derive_ratios(metrics: dict) -> dict:
+    return metrics | {
+        "grossMargin": _ratio(metrics["grossProfit"], metrics["revenue"]),
+        "roe": _ratio(metrics["netIncome"], metrics["shareholderEquity"]),
+        "roa": _ratio(metrics["netIncome"], metrics["totalAssets"]),
+        "debtToEquity": _ratio(
+            metrics["totalLiabilities"], metrics["shareholderEquity"]
+        ),
+    }
+
+
+def metric_rows(ticker: str, date_column: str, periods, statements: dict) -> list:
+    """
+    QuarterlyMetrics/AnnualMetrics rows for each of `periods` (statement
+    column Timestamps), with `date_column` as epoch seconds and NaN as None.
+    """
+    columns = derive_ratios(normalise_statements(statements, periods)) | {
+        "ticker": np.full(len(periods), ticker, dtype=object),
+        date_column: np.array([int(p.timestamp()) for p in periods], dtype=np.int64),
+    }
+    return to_records(columns, ("ticker", date_column, *METRIC_FIELDS))
@@ -0,0 +1,201 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import yfinance as yf
+
+from cache import shared_cache
+from upstream import BARS, UpstreamUnavailable, run_upstream
+
+# USD -> currency pairs fetched in every batch; others are added on demand
+BASE_CURRENCIES = (
+    "SGD",
+    "JPY",
+    "HKD",
+    "GBP",
+    "EUR",
+    "CNY",
+    "AUD",
+    "CAD",
+    "CHF",
+    "INR",
+    "KRW",
+    "MYR",
+)
+OPEN_TTL_SECONDS = 60
+CLOSED_TTL_SECONDS = 60 * 60
+
+
+def fx_market_open(now: datetime) -> bool:
+    """FX trades from Sunday 22:00 UTC to Friday 22:00 UTC"""
+    now = now.astimezone(timezone.utc)
+    weekday = now.weekday()
+    if weekday == 5:
+        return False
+    if weekday == 4:
+        return now.hour < 22
+    if weekday == 6:
+        return now.hour >= 22
+    return True
+
+
+def _download_usd_rates(currencies, market_open: bool) -> dict:
+    tickers = [f"USD{cur}=X" for cur in currencies]
+    period, interval = ("1d", "1m") if market_open else ("5d", "1d")
+    df = yf.download(
+        tickers, period=period, interval=interval, progress=False, threads=False
+    )
+    if df is None or df.empty:
+        return {}
+    closes = df["Close"].ffill().iloc[-1]
+    rates = {}
+    for cur, ticker in zip(currencies, tickers):
+        value = closes.get(ticker)
+        if value is not None and not np.isnan(value):
+            rates[cur] = float(value)
+    return rates
+
+
+class FxRateStore:
+    """
+    In-memory FX rates, stored as USD -> currency and triangulated for every
+    other pair (e.g. SGD -> JPY = USDJPY / USDSGD).
+
+    All pairs are refreshed together in one batched download. Rates live for
+    `open_ttl` while the FX market trades and `closed_ttl` over the weekend.
+    """
+
+    def __init__(
+        self,
+        currencies=BASE_CURRENCIES,
+        open_ttl: float = OPEN_TTL_SECONDS,
+        closed_ttl: float = CLOSED_TTL_SECONDS,
+        fetcher=_download_usd_rates,
+    ):
+        self.currencies = set(currencies)
+        self.open_ttl = open_ttl
+        self.closed_ttl = closed_ttl
+        self._fetcher = fetcher
+        self._usd_rates: dict[str, float] = {"USD": 1.0}
+        self._fetched_at: float | None = None
+        # Wall-clock time of the same fetch, comparable across processes
+        self._fetched_wall: float | None = None
+        self._ttl = open_ttl
+        self._lock = threading.Lock()
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._fetched_at is not None
+            and time.monotonic() - self._fetched_at < self._ttl
+        )
+
+    def _triangulate(self, fromCur: str, toCur: str) -> float | None:
+        fromRate = self._usd_rates.get(fromCur)
+        toRate = self._usd_rates.get(toCur)
+        if fromRate is None or toRate is None:
+            return None
+        return toRate / fromRate
+
+    def peek(self, fromCur: str, toCur: str) -> float | None:
+        """Rate from memory only, None if stale or unknown"""
+        fromCur, toCur = fromCur.upper(), toCur.upper()
+        if fromCur == toCur:
+            return 1.0
+        if not self._is_fresh():
+            return None
+        return self._triangulate(fromCur, toCur)
+
+    def rate(self, fromCur: str, toCur: str) -> float:
+        """Rate for any pair, refreshing all USD pairs first if needed (blocking)"""
+        rate = self.peek(fromCur, toCur)
+        if rate is not None:
+            return rate
+
+        fromCur, toCur = fromCur.upper(), toCur.upper()
+        with self._lock:
+            # Another thread may have refreshed while we waited
+            rate = self.peek(fromCur, toCur)
+            if rate is not None:
+                return rate
+            added = {fromCur, toCur} - self.currencies - {"USD"}
+            self.currencies |= added
+            complete = self.refresh()
+            # Don't keep requesting currencies upstream doesn't know
+            if complete:
+                self.currencies -= added - self._usd_rates.keys()
+
+        # After a failed refresh the previous (stale) rates are served
+        rate = self._triangulate(fromCur, toCur)
+        if rate is None:
+            if not complete:
+                raise UpstreamUnavailable(BARS)
+            raise KeyError(f"No exchange rate for {fromCur}/{toCur}")
+        return rate
+
+    def refresh(self) -> bool:
+        """
+        Fetch every USD pair; False if the answer was empty or lacked a pair
+        known before, in which case the previous rates are kept and stay stale
+        """
+        market_open = fx_market_open(datetime.now(timezone.utc))
+        rates = self._fetcher(sorted(self.currencies), market_open)
+        known = self._usd_rates.keys() - {"USD"}
+        if not rates or not known <= rates.keys():
+            self._usd_rates = {**self._usd_rates, **rates}
+            return False
+        self._usd_rates = {"USD": 1.0, **rates}
+        self._ttl = self.open_ttl if market_open else self.closed_ttl
+        self._fetched_at = time.monotonic()
+        self._fetched_wall = time.time()
+        return True
+
+    def snapshot(self) -> dict | None:
+        """The current USD rates in a form `load` accepts, None unless fresh"""
+        if not self._is_fresh():
+            return None
+        return {
+            "rates": self._usd_rates,
+            "fetchedAt": self._fetched_wall,
+            "ttl": self._ttl,
+        }
+
+    def load(self, snapshot: dict):
+        """Adopt rates fetched elsewhere (e.g. by another worker)"""
+        age = time.time() - snapshot["fetchedAt"]
+        self._usd_rates = {"USD": 1.0, **snapshot["rates"]}
+        self._ttl = snapshot["ttl"]
+        self._fetched_at = time.monotonic() - age
+        self._fetched_wall = snapshot["fetchedAt"]
+
+    def clear(self):
+        self._usd_rates = {"USD": 1.0}
+        self._fetched_at = None
+        self._fetched_wall = None
+
+
+fx_rates = FxRateStore()
+
+
+async def get_rate(fromCur: str, toCur: str) -> float:
+    """
+    Answer from memory when fresh, then from rates another worker shared,
+    otherwise refresh on the upstream pool and share the result
+    """
+    rate = fx_rates.peek(fromCur, toCur)
+    if rate is not None:
+        return rate
+
+    snapshot = await shared_cache.get("fx", "usd")
+    if snapshot is not None:
+        fx_rates.load(snapshot)
+        rate = fx_rates.peek(fromCur, toCur)
+        if rate is not None:
+            return rate
+
+    rate = await run_upstream(BARS, fx_rates.rate, fromCur, toCur)
+    snapshot = fx_rates.snapshot()
+    if snapshot is not None:
+        age = time.time() - snapshot["fetchedAt"]
+        await shared_cache.set("fx", "usd", snapshot, ttl=snapshot["ttl"] - age)
+    return rate
@@ -0,0 +1,83 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response, status
+
+from calendars import calendar_registry
+
+# Cache-Control max-age (seconds) per kind of data
+MARKET_OPEN_MAX_AGE = 60
+MARKET_CLOSED_MAX_AGE = 15 * 60
+CLOSED_RANGE_MAX_AGE = 24 * 60 * 60
+FUNDAMENTALS_MAX_AGE = 6 * 60 * 60
+NEWS_MAX_AGE = 5 * 60
+
+STALE_WARNING = '110 - "Response is Stale"'
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag from the values that identify a response's content"""
+    digest = hashlib.sha1(":".join(map(str, parts)).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def market_max_age(exchangeISO: str | None, now: int) -> int:
+    if exchangeISO is None:
+        return MARKET_OPEN_MAX_AGE
+    if calendar_registry.get(exchangeISO).is_open(now):
+        return MARKET_OPEN_MAX_AGE
+    return MARKET_CLOSED_MAX_AGE
+
+
+def cache_headers(etag: str, last_modified: int | None, max_age: int) -> dict:
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={max(max_age, 0)}"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(
+            datetime.fromtimestamp(last_modified, timezone.utc), usegmt=True
+        )
+    return headers
+
+
+def stale_headers() -> dict:
+    """Marks data served from storage because the upstream is failing"""
+    return {"Warning": STALE_WARNING, "Cache-Control": "private, no-cache"}
+
+
+def _weak_match(candidate: str, etag: str) -> bool:
+    return candidate.strip().removeprefix("W/") == etag.removeprefix("W/")
+
+
+def is_not_modified(request: Request, etag: str, last_modified: int | None) -> bool:
+    """
+    If-None-Match takes precedence; If-Modified-Since is only consulted
+    when the client sent no ETag (RFC 9110 13.2.2)
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return if_none_match.strip() == "*" or any(
+            _weak_match(candidate, etag) for candidate in if_none_match.split(",")
+        )
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified <= int(since.timestamp())
+
+
+def not_modified_response(
+    request: Request, etag: str, last_modified: int | None, max_age: int
+) -> Response | None:
+    """An empty 304 when the client's copy is current, otherwise None"""
+    if not is_not_modified(request, etag, last_modified):
+        return None
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=cache_headers(etag, last_modified, max_age),
+    )
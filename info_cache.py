@@ -0,0 +1,149 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+import yfinance as yf
+
+from cache import TieredCache, shared_cache
+from upstream import INFO, run_upstream, upstream_guard
+
+# Exchange, timezone, names and currency only change on corporate actions
+STATIC_TTL_SECONDS = 6 * 60 * 60
+# marketState, regularMarketPrice, previousClose move with the market
+LIVE_TTL_SECONDS = 30
+MAX_CACHED_SYMBOLS = 2048
+
+
+def _fetch_info(symbol: str) -> dict:
+    return yf.Ticker(symbol).info
+
+
+@dataclass
+class _Entry:
+    info: dict
+    fetched_at: float
+
+
+class TickerInfoCache:
+    """
+    Process-wide cache of yfinance `.info` dicts keyed by symbol.
+
+    Callers that only need static fields (e.g. `exchangeTimezoneName`) pass
+    `live=False` and accept entries up to `static_ttl` old; live callers
+    refetch once `live_ttl` has passed. Concurrent misses for the same symbol
+    share a single upstream fetch. Returned dicts are shared, do not mutate.
+
+    With a `shared` cache, misses first look for a fresh enough copy fetched
+    by another worker.
+
+    While the upstream is failing, `lookup` answers with the last known info
+    flagged as stale and the refetch carries on in the background.
+    """
+
+    def __init__(
+        self,
+        static_ttl: float = STATIC_TTL_SECONDS,
+        live_ttl: float = LIVE_TTL_SECONDS,
+        max_size: int = MAX_CACHED_SYMBOLS,
+        fetcher: Callable[[str], dict] = _fetch_info,
+        shared: TieredCache | None = None,
+    ):
+        self.static_ttl = static_ttl
+        self.live_ttl = live_ttl
+        self.max_size = max_size
+        self._fetcher = fetcher
+        self._shared = shared
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._inflight: dict[tuple, asyncio.Future] = {}
+
+    async def get(self, symbol: str, live: bool = True) -> dict:
+        return (await self.lookup(symbol, live))[0]
+
+    async def lookup(self, symbol: str, live: bool = True) -> tuple[dict, bool]:
+        """(info, stale), stale info only being served if the fetch can't be"""
+        symbol = symbol.upper()
+        ttl = self.live_ttl if live else self.static_ttl
+
+        entry = self._entries.get(symbol)
+        if entry is not None and time.monotonic() - entry.fetched_at < ttl:
+            self._entries.move_to_end(symbol)
+            return entry.info, False
+
+        # Live callers must not join a fetch that accepts static-age copies
+        flight = (symbol, live)
+        inflight = self._inflight.get(flight)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._fetch(symbol, ttl))
+            self._inflight[flight] = inflight
+
+            def _done(fut, flight=flight):
+                if self._inflight.get(flight) is fut:
+                    del self._inflight[flight]
+                # Background refreshes have nobody awaiting their errors
+                if not fut.cancelled():
+                    fut.exception()
+
+            inflight.add_done_callback(_done)
+
+        # Do not wait on a failing upstream when there is something to serve
+        if entry is not None and not upstream_guard.is_healthy(INFO):
+            return entry.info, True
+
+        try:
+            # Shield so one cancelled request does not cancel the shared fetch
+            return await asyncio.shield(inflight), False
+        except Exception:
+            stale = entry.info if entry is not None else await self._shared_copy(symbol)
+            if not stale:
+                raise
+            return stale, True
+
+    async def _shared_copy(self, symbol: str) -> dict | None:
+        """Any copy another worker fetched, however old"""
+        if self._shared is None:
+            return None
+        entry = await self._shared.get("info", symbol)
+        return entry["info"] if entry else None
+
+    async def _fetch(self, symbol: str, max_age: float) -> dict:
+        if self._shared is None:
+            info = await run_upstream(INFO, self._fetcher, symbol)
+            fetched_at = time.time()
+        else:
+            entry = await self._shared.get_or_load(
+                "info",
+                symbol,
+                lambda: self._fetch_entry(symbol),
+                ttl=self.static_ttl,
+                max_age=max_age,
+            )
+            info, fetched_at = (entry["info"], entry["fetchedAt"]) if entry else ({}, 0)
+        # yfinance returns an empty dict for unknown symbols, do not cache it
+        if info:
+            self._store(symbol, info, time.time() - fetched_at)
+        return info
+
+    async def _fetch_entry(self, symbol: str) -> dict | None:
+        info = await run_upstream(INFO, self._fetcher, symbol)
+        return {"info": info, "fetchedAt": time.time()} if info else None
+
+    def _store(self, symbol: str, info: dict, age: float = 0.0):
+        self._entries[symbol] = _Entry(info=info, fetched_at=time.monotonic() - age)
+        self._entries.move_to_end(symbol)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, symbol: str):
+        self._entries.pop(symbol.upper(), None)
+
+    def clear(self):
+        self._entries.clear()
+        self._inflight.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+ticker_info_cache = TickerInfoCache(shared=shared_cache)
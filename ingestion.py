@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cache import bars_tag, shared_cache
+
+# Rows per INSERT statement, keeps well below SQLite's bound parameter limit
+INSERT_BATCH_ROWS = 2000
+
+
+def epoch_seconds(index) -> np.ndarray:
+    """Vectorized DatetimeIndex -> int64 epoch seconds (naive treated as UTC)"""
+    if not isinstance(index, pd.DatetimeIndex):
+        index = pd.DatetimeIndex(index)
+    return index.as_unit("s").asi8
+
+
+def frame_to_columns(
+    df: pd.DataFrame, columns: dict, integer_columns: tuple = ("volume",)
+) -> dict:
+    """
+    Convert a yfinance history frame (DatetimeIndex) into column arrays.
+
+    `columns` maps model attribute -> DataFrame column, e.g.
+    `{"close": "Close", "volume": "Volume"}`. Rows with a missing value in
+    any requested column are dropped.
+    """
+    if df is None or df.empty:
+        empty = {name: np.empty(0) for name in columns}
+        return {"timestamp": np.empty(0, dtype=np.int64), **empty}
+
+    values = {name: df[src].to_numpy(dtype=np.float64) for name, src in columns.items()}
+    valid = np.ones(len(df), dtype=bool)
+    for arr in values.values():
+        valid &= ~np.isnan(arr)
+
+    result = {"timestamp": epoch_seconds(df.index)[valid]}
+    for name, arr in values.items():
+        arr = arr[valid]
+        result[name] = arr.astype(np.int64) if name in integer_columns else arr
+    return result
+
+
+def insert_for(db: AsyncSession):
+    """The dialect's INSERT, which supports ON CONFLICT"""
+    match db.bind.dialect.name:
+        case "postgresql":
+            return postgresql.insert
+        case _:
+            return sqlite.insert
+
+
+async def bulk_upsert(
+    db: AsyncSession, model, ticker: str, columns: dict, update_columns: tuple = ()
+) -> int:
+    """
+    Write column arrays for one ticker with one INSERT ... ON CONFLICT per
+    batch, relying on the (ticker, timestamp) unique index. Existing bars
+    have `update_columns` overwritten (e.g. a still-forming minute bar's
+    close), or are left untouched when it is empty. Does not commit.
+
+    Cached values derived from the ticker's bars are invalidated.
+    """
+    count = len(columns["timestamp"])
+    if count == 0:
+        return 0
+
+    keys = list(columns)
+    # ndarray.tolist() converts to Python scalars in C, no per-cell numpy boxing
+    arrays = [columns[key].tolist() for key in keys]
+    rows = [{"ticker": ticker, **dict(zip(keys, values))} for values in zip(*arrays)]
+
+    stmt = insert_for(db)(model)
+    if update_columns:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["ticker", "timestamp"],
+            set_={name: stmt.excluded[name] for name in update_columns},
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=["ticker", "timestamp"])
+
+    for start in range(0, count, INSERT_BATCH_ROWS):
+        await db.execute(stmt, rows[start : start + INSERT_BATCH_ROWS])
+    await shared_cache.invalidate(bars_tag(model, ticker))
+    return count
@@ -1,12 +1,29 @@
-from fastapi import FastAPI
+import math
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from database import init_db
 from auth import fastapi_users, cookie_auth_backend
 from schemas import UserCreate, UserRead, UserUpdate
-from routers import ticker, watchlist, forex
+from routers import ticker, watchlist, forex, export, metrics
+from metrics import MetricsMiddleware
+from refresher import REFRESHER_ENABLED, market_refresher
+from responses import JSONResponse
+from upstream import UpstreamUnavailable, upstream_executor
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if REFRESHER_ENABLED:
+        market_refresher.start()
+    yield
+    await market_refresher.stop()
+    upstream_executor.shutdown(wait=False)
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -14,10 +31,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets the frontend see that a response was served stale
+    expose_headers=["Warning"],
 )
+# Outermost, so request latency covers CORS handling too
+app.add_middleware(MetricsMiddleware)
 
 init_db()
 
+
+@app.exception_handler(UpstreamUnavailable)
+async def upstream_unavailable(request: Request, exc: UpstreamUnavailable):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(math.ceil(exc.retry_after), 1))},
+    )
+
+
 # Auth routes
 app.include_router(
     fastapi_users.get_auth_router(cookie_auth_backend),
@@ -56,3 +87,5 @@ async def root():
 app.include_router(ticker.router)
 app.include_router(watchlist.router)
 app.include_router(forex.router)
+app.include_router(export.router)
+app.include_router(metrics.router)
@@ -0,0 +1,194 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+# Sub-millisecond resolution for DB statements and JSON encoding
+FAST_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+
+REQUEST_SECONDS = Histogram(
+    "equisight_request_duration_seconds",
+    "HTTP request latency, until the last body byte is sent",
+    ["method", "route", "status"],
+)
+UPSTREAM_SECONDS = Histogram(
+    "equisight_upstream_call_duration_seconds",
+    "Time spent running a yfinance call on the upstream pool (queueing excluded)",
+    ["call", "route", "outcome"],
+)
+DB_SECONDS = Histogram(
+    "equisight_db_duration_seconds",
+    "Time spent in a DB statement (by statement type) or in a session commit",
+    ["operation", "route"],
+    buckets=FAST_BUCKETS,
+)
+SERIALIZATION_SECONDS = Histogram(
+    "equisight_serialization_duration_seconds",
+    "Time spent encoding response bodies",
+    ["route"],
+    buckets=FAST_BUCKETS,
+)
+CACHE_LOOKUPS = Counter(
+    "equisight_cache_lookups_total",
+    "Cache lookups by cache and result (hit or miss)",
+    ["cache", "result"],
+)
+CIRCUIT_STATE = Gauge(
+    "equisight_upstream_circuit_state",
+    "Upstream circuit breaker state by endpoint type (0 closed, 1 half open, 2 open)",
+    ["kind"],
+)
+CIRCUIT_STATES = {"closed": 0, "half_open": 1, "open": 2}
+UPSTREAM_POOL = {
+    "queued": Gauge(
+        "equisight_upstream_queued_calls",
+        "Upstream calls waiting for a worker thread",
+    ),
+    "active": Gauge(
+        "equisight_upstream_active_calls",
+        "Upstream calls currently running",
+    ),
+    "peakQueued": Gauge(
+        "equisight_upstream_peak_queued_calls",
+        "Deepest upstream backlog since startup",
+    ),
+}
+
+# Scope of the request being handled, so timers deep in the stack can label
+# themselves with its route
+_request_scope: ContextVar[dict | None] = ContextVar("request_scope", default=None)
+
+
+def route_of(scope: dict | None) -> str:
+    """Route template (e.g. /ticker/{ticker}/history), never the raw path"""
+    if scope is None:
+        return "background"
+    route = scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+def current_route() -> str:
+    return route_of(_request_scope.get())
+
+
+def record_cache(cache: str, hits: int = 0, misses: int = 0):
+    if hits:
+        CACHE_LOOKUPS.labels(cache, "hit").inc(hits)
+    if misses:
+        CACHE_LOOKUPS.labels(cache, "miss").inc(misses)
+
+
+def record_lookup(cache: str, hit: bool):
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+
+@contextmanager
+def serialization_timer():
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        SERIALIZATION_SECONDS.labels(current_route()).observe(
+            time.perf_counter() - start
+        )
+
+
+def observe_upstream(call: str, route: str, seconds: float, ok: bool):
+    UPSTREAM_SECONDS.labels(call, route, "ok" if ok else "error").observe(seconds)
+
+
+def observe_circuit(kind: str, state: str):
+    CIRCUIT_STATE.labels(kind).set(CIRCUIT_STATES[state])
+
+
+def export_upstream_pool(stats):
+    """Read the upstream pool's queue depth (`stats()`) on every scrape"""
+    for name, gauge in UPSTREAM_POOL.items():
+        gauge.set_function(lambda name=name: stats()[name])
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route request latency"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        token = _request_scope.set(scope)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUEST_SECONDS.labels(
+                scope["method"], route_of(scope), str(status_code)
+            ).observe(time.perf_counter() - start)
+            _request_scope.reset(token)
+
+
+# Every engine (sync, async, and test engines alike) reports its statements
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("metrics_start")
+    if not starts:
+        return
+    operation = statement.lstrip().split(None, 1)[0].lower() if statement else "other"
+    DB_SECONDS.labels(operation, current_route()).observe(
+        time.perf_counter() - starts.pop()
+    )
+
+
+@event.listens_for(Engine, "handle_error")
+def _execute_failed(context):
+    conn = context.connection
+    if conn is not None and conn.info.get("metrics_start"):
+        conn.info["metrics_start"].pop()
+
+
+# Commit time includes the flush it triggers
+@event.listens_for(Session, "before_commit")
+def _before_commit(session):
+    session.info["metrics_commit_start"] = time.perf_counter()
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    start = session.info.pop("metrics_commit_start", None)
+    if start is not None:
+        DB_SECONDS.labels("commit", current_route()).observe(
+            time.perf_counter() - start
+        )
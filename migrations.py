@@ -0,0 +1,80 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+TIME_SERIES_TABLES = ("ticker_entries", "intraday_entries", "intraweek_entries")
+# Stored report periods, by their period-end column
+METRICS_TABLES = {
+    "quarterly_metrics": "quarterEndDate",
+    "annual_metrics": "yearEndDate",
+}
+
+
+# Collapse duplicate bars (keeping the latest write) so the composite
+# (ticker, timestamp) unique index can replace the single-column indexes
+def _unique_time_series(conn: Connection):
+    for table in TIME_SERIES_TABLES:
+        conn.execute(
+            text(
+                f"DELETE FROM {table} WHERE id NOT IN "
+                f"(SELECT MAX(id) FROM {table} GROUP BY ticker, timestamp)"
+            )
+        )
+        conn.execute(text(f"DROP INDEX IF EXISTS ix_{table}_ticker"))
+        conn.execute(text(f"DROP INDEX IF EXISTS ix_{table}_timestamp"))
+        conn.execute(
+            text(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS ix_{table}_ticker_timestamp "
+                f"ON {table} (ticker, timestamp)"
+            )
+        )
+
+
+# Collapse report periods stored twice by concurrent first requests, then
+# make (ticker, period end) unique so inserts can skip existing periods
+def _unique_metrics(conn: Connection):
+    for table, column in METRICS_TABLES.items():
+        if not inspect(conn).has_table(table):
+            continue
+        conn.execute(
+            text(
+                f"DELETE FROM {table} WHERE id NOT IN "
+                f'(SELECT MAX(id) FROM {table} GROUP BY ticker, "{column}")'
+            )
+        )
+        conn.execute(
+            text(
+                # Quoted so Postgres keeps the model's mixed-case name
+                # instead of folding it into a second, lowercase index
+                f'CREATE UNIQUE INDEX IF NOT EXISTS "ix_{table}_ticker_{column}" '
+                f'ON {table} (ticker, "{column}")'
+            )
+        )
+
+
+# Applied in order, each exactly once per database
+MIGRATIONS = [
+    ("0001_unique_time_series", _unique_time_series),
+    ("0002_unique_metrics", _unique_metrics),
+]
+
+
+def run_migrations(engine: Engine):
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE IF NOT EXISTS schema_migrations "
+                "(name VARCHAR PRIMARY KEY)"
+            )
+        )
+        applied = set(
+            conn.execute(text("SELECT name FROM schema_migrations")).scalars()
+        )
+        for name, migration in MIGRATIONS:
+            if name in applied:
+                continue
+            migration(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (name) VALUES (:name)"),
+                {"name": name},
+            )
+            print(f"Applied migration {name}.")
@@ -5,6 +5,7 @@ from sqlalchemy import (
     Float,
     BigInteger,
     ForeignKey,
+    Index,
     UniqueConstraint,
 )
 from sqlalchemy.orm import DeclarativeBase, relationship
@@ -55,27 +56,53 @@ class TickerPositions(Base):
 class TickerEntry(Base):
     __tablename__ = "ticker_entries"
     id = Column(Integer, primary_key=True, index=True)
-    ticker = Column(String, index=True)
-    timestamp = Column(BigInteger, index=True)
+    ticker = Column(String)
+    timestamp = Column(BigInteger)
     close = Column(Float)
     volume = Column(Integer)
 
+    __table_args__ = (
+        Index("ix_ticker_entries_ticker_timestamp", "ticker", "timestamp", unique=True),
+    )
+
 
 class Intraday(Base):
     __tablename__ = "intraday_entries"
     id = Column(Integer, primary_key=True, index=True)
-    ticker = Column(String, index=True)
-    timestamp = Column(BigInteger, index=True)
+    ticker = Column(String)
+    timestamp = Column(BigInteger)
     close = Column(Float)
 
+    __table_args__ = (
+        Index(
+            "ix_intraday_entries_ticker_timestamp", "ticker", "timestamp", unique=True
+        ),
+    )
+
 
 class Intraweek(Base):
     __tablename__ = "intraweek_entries"
     id = Column(Integer, primary_key=True, index=True)
-    ticker = Column(String, index=True)
-    timestamp = Column(BigInteger, index=True)
+    ticker = Column(String)
+    timestamp = Column(BigInteger)
     close = Column(Float)
 
+    __table_args__ = (
+        Index(
+            "ix_intraweek_entries_ticker_timestamp", "ticker", "timestamp", unique=True
+        ),
+    )
+
+
+# Contiguous [rangeStart, rangeEnd] spans of daily sessions already fetched
+# into ticker_entries, in the same local-midnight timestamps as the bars
+class HistoryCoverage(Base):
+    __tablename__ = "history_coverage"
+    id = Column(Integer, primary_key=True, index=True)
+    ticker = Column(String, index=True)
+    rangeStart = Column(BigInteger)
+    rangeEnd = Column(BigInteger)
+
 
 class TickerInfo(Base):
     __tablename__ = "ticker_info"
@@ -106,6 +133,15 @@ class QuarterlyMetrics(Base):
     roa = Column(Float, nullable=True)
     debtToEquity = Column(Float, nullable=True)
 
+    __table_args__ = (
+        Index(
+            "ix_quarterly_metrics_ticker_quarterEndDate",
+            "ticker",
+            "quarterEndDate",
+            unique=True,
+        ),
+    )
+
 
 class AnnualMetrics(Base):
     __tablename__ = "annual_metrics"
@@ -128,3 +164,20 @@ class AnnualMetrics(Base):
     roe = Column(Float, nullable=True)
     roa = Column(Float, nullable=True)
     debtToEquity = Column(Float, nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ix_annual_metrics_ticker_yearEndDate", "ticker", "yearEndDate", unique=True
+        ),
+    )
+
+
+class FundamentalsSchedule(Base):
+    __tablename__ = "fundamentals_schedule"
+    id = Column(Integer, primary_key=True, index=True)
+    ticker = Column(String)
+    period = Column(String)  # "quarterly" / "yearly"
+    lastChecked = Column(BigInteger)
+    nextExpected = Column(BigInteger)
+
+    __table_args__ = (UniqueConstraint("ticker", "period", name="_ticker_period_uc"),)
@@ -0,0 +1,75 @@
+import numpy as np
+
+
+def aggregate_positions(tickers, directions, quantities, unit_costs) -> dict:
+    """
+    Net BUY/SELL positions per ticker in one pass of NumPy bincounts.
+
+    Average cost is the quantity-weighted cost of all BUYs; realized P&L
+    is SELL proceeds less that average cost. Returns column arrays keyed
+    by field, aligned with the sorted unique `tickers`.
+    """
+    symbols, inverse = np.unique(np.asarray(tickers, dtype=str), return_inverse=True)
+    count = len(symbols)
+    quantities = np.asarray(quantities, dtype=np.float64)
+    unit_costs = np.asarray(unit_costs, dtype=np.float64)
+    buys = np.asarray(directions) == "BUY"
+    notional = quantities * unit_costs
+
+    buy_qty = np.bincount(
+        inverse, weights=np.where(buys, quantities, 0), minlength=count
+    )
+    sell_qty = np.bincount(
+        inverse, weights=np.where(buys, 0, quantities), minlength=count
+    )
+    buy_cost = np.bincount(
+        inverse, weights=np.where(buys, notional, 0), minlength=count
+    )
+    sell_proceeds = np.bincount(
+        inverse, weights=np.where(buys, 0, notional), minlength=count
+    )
+
+    average_cost = np.divide(
+        buy_cost, buy_qty, out=np.full(count, np.nan), where=buy_qty > 0
+    )
+    quantity = buy_qty - sell_qty
+
+    return {
+        "ticker": symbols,
+        "quantity": quantity,
+        "averageCost": average_cost,
+        "costBasis": quantity * average_cost,
+        "realizedPnl": sell_proceeds - sell_qty * average_cost,
+    }
+
+
+def value_holdings(holdings: dict, prices, rates) -> dict:
+    """
+    Add last price, market value and unrealized P&L (local currency) plus
+    the local -> base `rates` used for totals (NaN where unknown).
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    market_value = holdings["quantity"] * prices
+    return holdings | {
+        "lastPrice": prices,
+        "marketValue": market_value,
+        "unrealizedPnl": market_value - holdings["costBasis"],
+        "exchangeRate": np.asarray(rates, dtype=np.float64),
+    }
+
+
+def portfolio_totals(valued: dict) -> dict:
+    """Base-currency totals; holdings without a price or rate are skipped"""
+    rates = valued["exchangeRate"]
+    return {
+        "totalMarketValue": _nansum(valued["marketValue"] * rates),
+        "totalCostBasis": _nansum(valued["costBasis"] * rates),
+        "totalUnrealizedPnl": _nansum(valued["unrealizedPnl"] * rates),
+        "totalRealizedPnl": _nansum(valued["realizedPnl"] * rates),
+    }
+
+
+def _nansum(values: np.ndarray):
+    if values.size == 0 or np.isnan(values).all():
+        return None
+    return float(np.nansum(values))
@@ -0,0 +1,139 @@
+import asyncio
+import os
+import time
+from collections import defaultdict
+
+from sqlalchemy import select
+
+from calendars import calendar_registry
+from database import async_session_maker
+from info_cache import ticker_info_cache
+from ingestion import bulk_upsert, frame_to_columns
+from models import Intraday, Intraweek, TickerInfo, UserWatchlist
+from services import download_bars, getExchangeISO
+from upstream import BARS, run_upstream
+
+REFRESHER_ENABLED = os.getenv("EQUISIGHT_REFRESHER", "1") != "0"
+# 1m bars for Intraday
+INTRADAY_INTERVAL_SECONDS = int(os.getenv("EQUISIGHT_REFRESH_INTERVAL", "60"))
+# 1h bars for Intraweek
+INTRAWEEK_INTERVAL_SECONDS = 15 * 60
+
+# Bar model -> (yfinance period, yfinance interval, refresh interval)
+REFRESH_SPECS = {
+    Intraday: ("1d", "1m", INTRADAY_INTERVAL_SECONDS),
+    Intraweek: ("5d", "1h", INTRAWEEK_INTERVAL_SECONDS),
+}
+
+
+class MarketDataRefresher:
+    """
+    Keeps Intraday/Intraweek bars for watched tickers current while their
+    exchange is in session, so the endpoints can answer from the DB.
+
+    Watched tickers are grouped by exchange (via TickerInfo's timezone) and
+    each group is refreshed with one multi-symbol download per bar size.
+    """
+
+    def __init__(self, session_maker=async_session_maker):
+        self._session_maker = session_maker
+        self._refreshed_at: dict[tuple, float] = {}
+        self._group_refreshed_at: dict[tuple, float] = {}
+        self._task: asyncio.Task | None = None
+
+    def is_fresh(self, ticker: str, model) -> bool:
+        """True if `ticker`'s `model` bars were refreshed within two intervals"""
+        refreshed = self._refreshed_at.get((model, ticker.upper()))
+        interval = REFRESH_SPECS[model][2]
+        return refreshed is not None and time.monotonic() - refreshed < 2 * interval
+
+    async def watched_by_exchange(self, db) -> dict[str, list[str]]:
+        stmt = (
+            select(UserWatchlist.ticker, TickerInfo.exchangeTimezoneName)
+            .outerjoin(TickerInfo, TickerInfo.ticker == UserWatchlist.ticker)
+            .distinct()
+        )
+        rows = (await db.execute(stmt)).all()
+
+        groups = defaultdict(list)
+        for ticker, tznStr in rows:
+            if tznStr is None:
+                # One ticker's failed lookup must not hold up the others
+                try:
+                    info = await ticker_info_cache.get(ticker, live=False)
+                except Exception as e:
+                    print(f"Skipping {ticker}, its exchange is unknown: {e}")
+                    continue
+                tznStr = info.get("exchangeTimezoneName")
+                if tznStr is None:
+                    continue
+                db.add(TickerInfo(ticker=ticker, exchangeTimezoneName=tznStr))
+                await db.commit()
+            exchangeISO = getExchangeISO(tznStr)
+            if exchangeISO is not None and ticker not in groups[exchangeISO]:
+                groups[exchangeISO].append(ticker)
+        return groups
+
+    def _in_session(self, exchangeISO: str, now: int) -> bool:
+        table = calendar_registry.get(exchangeISO)
+        # Keep going briefly after the close to pick up the final bars
+        grace = 2 * INTRADAY_INTERVAL_SECONDS
+        return table.is_open(now) or table.previous_close(now) > now - grace
+
+    async def refresh_once(self, now: int | None = None):
+        now = int(time.time()) if now is None else now
+        async with self._session_maker() as db:
+            groups = await self.watched_by_exchange(db)
+            for exchangeISO, tickers in groups.items():
+                if not self._in_session(exchangeISO, now):
+                    continue
+                for model, (period, interval, every) in REFRESH_SPECS.items():
+                    last = self._group_refreshed_at.get((model, exchangeISO))
+                    if last is not None and time.monotonic() - last < every:
+                        continue
+                    # One exchange's failure must not starve the others
+                    try:
+                        await self._refresh_group(db, model, tickers, period, interval)
+                    except Exception as e:
+                        await db.rollback()
+                        print(
+                            f"Error refreshing {model.__tablename__} for {exchangeISO}: {e}"
+                        )
+                        continue
+                    self._group_refreshed_at[(model, exchangeISO)] = time.monotonic()
+
+    async def _refresh_group(self, db, model, tickers, period, interval):
+        frames = await run_upstream(BARS, download_bars, tickers, period, interval)
+        for ticker, df in frames.items():
+            columns = frame_to_columns(df, {"close": "Close"})
+            await bulk_upsert(db, model, ticker, columns, ("close",))
+        await db.commit()
+
+        refreshed = time.monotonic()
+        for ticker in frames:
+            self._refreshed_at[(model, ticker)] = refreshed
+        print(f"Refreshed {model.__tablename__} for {len(frames)} tickers.")
+
+    async def run(self):
+        while True:
+            try:
+                await self.refresh_once()
+            except Exception as e:
+                print(f"Error refreshing market data: {e}")
+            await asyncio.sleep(INTRADAY_INTERVAL_SECONDS)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+market_refresher = MarketDataRefresher()
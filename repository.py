@@ -0,0 +1,139 @@
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Rows fetched per round trip when streaming
+STREAM_CHUNK_ROWS = 1000
+
+# Field -> dtype of its column array
+COLUMN_DTYPES = {"timestamp": np.int64, "close": np.float64, "volume": np.int64}
+
+
+def _column_array(field: str, values) -> np.ndarray:
+    try:
+        return np.array(values, dtype=COLUMN_DTYPES.get(field))
+    except (TypeError, ValueError):
+        # NULLs in an integer column
+        return np.array(values, dtype=object)
+
+
+def rows_to_columns(rows, fields) -> dict:
+    """Row tuples -> {field: array}"""
+    values = list(zip(*rows)) if rows else [()] * len(fields)
+    return {field: _column_array(field, v) for field, v in zip(fields, values)}
+
+
+def _range_stmt(model, ticker: str, fields, start=None, end=None):
+    stmt = select(*(getattr(model, field) for field in fields)).where(
+        model.ticker == ticker
+    )
+    if start is not None:
+        stmt = stmt.where(model.timestamp >= start)
+    if end is not None:
+        stmt = stmt.where(model.timestamp <= end)
+    return stmt.order_by(model.timestamp.desc())
+
+
+async def bar_rows(db, model, ticker: str, fields, start=None, end=None) -> list:
+    """
+    `fields` of `model` bars for `ticker` with start <= timestamp <= end,
+    newest first, as Row tuples (no ORM entities are built)
+    """
+    result = await db.execute(_range_stmt(model, ticker, fields, start, end))
+    return result.tuples().all()
+
+
+async def stream_bar_rows(
+    bind, model, ticker: str, fields, start=None, end=None, chunk_rows=STREAM_CHUNK_ROWS
+):
+    """
+    As bar_rows, but yielded in lists of up to `chunk_rows` from a
+    server-side cursor, so memory stays flat however long the range.
+
+    Uses its own session on `bind` since it outlives the request's session.
+    """
+    stmt = _range_stmt(model, ticker, fields, start, end).execution_options(
+        yield_per=chunk_rows
+    )
+    async with AsyncSession(bind) as session:
+        result = await session.stream(stmt)
+        async for rows in result.tuples().partitions():
+            yield rows
+
+
+async def bar_columns(db, model, ticker: str, fields, start=None, end=None) -> dict:
+    """As bar_rows, but one NumPy array per field"""
+    return rows_to_columns(
+        await bar_rows(db, model, ticker, fields, start, end), fields
+    )
+
+
+async def bar_columns_many(db, model, tickers, fields, start=None, end=None) -> dict:
+    """{ticker: {field: array}} for several tickers in one query"""
+    stmt = select(model.ticker, *(getattr(model, field) for field in fields)).where(
+        model.ticker.in_(list(tickers))
+    )
+    if start is not None:
+        stmt = stmt.where(model.timestamp >= start)
+    if end is not None:
+        stmt = stmt.where(model.timestamp <= end)
+    stmt = stmt.order_by(model.ticker, model.timestamp.desc())
+    rows = (await db.execute(stmt)).tuples().all()
+    columns = rows_to_columns(rows, ("ticker", *fields))
+
+    # Rows arrive grouped by ticker, so each ticker is one run: split every
+    # column at the first row of each run
+    names = columns.pop("ticker")
+    starts = np.sort(np.unique(names, return_index=True)[1])
+    pieces = {field: np.split(values, starts[1:]) for field, values in columns.items()}
+    found = {
+        str(names[start]): {field: pieces[field][i] for field in fields}
+        for i, start in enumerate(starts)
+    }
+    empty = rows_to_columns([], fields)
+    return {ticker: found.get(ticker, empty) for ticker in tickers}
+
+
+async def bar_validator(db, model, ticker: str, start=None, end=None) -> tuple:
+    """
+    (count, newest timestamp, *checksums) over the range in one aggregate
+    query; changes whenever a bar in the range is added or rewritten. The
+    checksums are the sums of closes (and volumes, where the model has
+    them), plus closes weighted by timestamp so offsetting rewrites of two
+    bars still show.
+    """
+    checksums = [
+        func.sum(model.close),
+        func.sum(model.close * (model.timestamp % 1000003)),
+    ]
+    if hasattr(model, "volume"):
+        checksums += [
+            func.sum(model.volume),
+            func.sum(model.volume * (model.timestamp % 1000003)),
+        ]
+    stmt = select(func.count(), func.max(model.timestamp), *checksums).where(
+        model.ticker == ticker
+    )
+    if start is not None:
+        stmt = stmt.where(model.timestamp >= start)
+    if end is not None:
+        stmt = stmt.where(model.timestamp <= end)
+    return tuple((await db.execute(stmt)).one())
+
+
+async def latest_timestamp(db, model, ticker: str, start=None) -> int | None:
+    """Newest stored bar timestamp (at or after `start`), None if there is none"""
+    stmt = select(func.max(model.timestamp)).where(model.ticker == ticker)
+    if start is not None:
+        stmt = stmt.where(model.timestamp >= start)
+    return (await db.execute(stmt)).scalar()
+
+
+async def latest_timestamps(db, model, tickers) -> dict:
+    """{ticker: newest stored bar timestamp} for tickers with any bars"""
+    stmt = (
+        select(model.ticker, func.max(model.timestamp))
+        .where(model.ticker.in_(list(tickers)))
+        .group_by(model.ticker)
+    )
+    return dict((await db.execute(stmt)).tuples().all())
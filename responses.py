@@ -0,0 +1,90 @@
+import json
+from typing import Any
+
+import numpy as np
+from fastapi import responses
+
+from metrics import serialization_timer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+ORJSON_OPTIONS = (
+    orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+)
+
+
+def _to_builtin(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class JSONResponse(responses.JSONResponse):
+    """The stock JSONResponse, with its encoding time recorded"""
+
+    def render(self, content: Any) -> bytes:
+        with serialization_timer():
+            return super().render(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse encoded with orjson, which also writes NumPy arrays
+    directly. Falls back to the stdlib encoder when orjson is missing.
+    """
+
+    def render(self, content: Any) -> bytes:
+        with serialization_timer():
+            if orjson is not None:
+                return orjson.dumps(content, option=ORJSON_OPTIONS)
+            return json.dumps(
+                content,
+                ensure_ascii=False,
+                allow_nan=False,
+                separators=(",", ":"),
+                default=_to_builtin,
+            ).encode("utf-8")
+
+
+def dump_json(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+    return json.dumps(content, separators=(",", ":"), default=_to_builtin).encode()
+
+
+def load_json(data: bytes):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+async def ndjson_stream(ticker: str, fields, chunks):
+    """One JSON object per line for each bar in the row-tuple `chunks`"""
+    async for rows in chunks:
+        with serialization_timer():
+            chunk = b"".join(
+                dump_json({"ticker": ticker} | dict(zip(fields, row))) + b"\n"
+                for row in rows
+            )
+        yield chunk
+
+
+def time_series_payload(ticker: str, columns: dict, columnar: bool):
+    """
+    Bars from {field: array} columns, as a list of row dicts, or when
+    `columnar` as {"ticker": ..., field: [...]} so keys and the ticker
+    aren't repeated per bar.
+    """
+    if columnar:
+        return {"ticker": ticker} | {
+            field: values if values.dtype != object else values.tolist()
+            for field, values in columns.items()
+        }
+    fields = list(columns)
+    values = [column.tolist() for column in columns.values()]
+    return [{"ticker": ticker} | dict(zip(fields, row)) for row in zip(*values)]
@@ -0,0 +1,156 @@
+import asyncio
+from datetime import date, datetime, time, timedelta, timezone
+from io import BytesIO
+from typing import Literal
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from auth import current_active_user
+from database import get_async_session
+from models import TickerEntry, TickerInfo, User
+from repository import bar_columns_many
+from routers.ticker import parse_symbols
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional "export" extra
+    pa = None
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+EXPORT_FIELDS = ("timestamp", "close", "volume")
+MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+# Longest range one export may span
+MAX_EXPORT_DAYS = 366 * 30
+
+
+def day_bounds(start: date, end: date, tz) -> tuple[int, int]:
+    """First and last second of the range in the exchange's timezone, where
+    bars are stored at local midnight"""
+    start_ts = datetime.combine(start, time(), tzinfo=tz).timestamp()
+    end_ts = datetime.combine(end + timedelta(days=1), time(), tzinfo=tz).timestamp()
+    return int(start_ts), int(end_ts) - 1
+
+
+def history_table(bars: dict) -> "pa.Table":
+    """
+    One Arrow table from {ticker: {field: array}} built column-wise: each
+    field is a single concatenation and the ticker column is dictionary
+    encoded from per-ticker run lengths.
+    """
+    tickers = list(bars)
+    lengths = [len(columns["timestamp"]) for columns in bars.values()]
+
+    def concat(field):
+        arrays = [columns[field] for columns in bars.values()]
+        if any(a.dtype == object for a in arrays):
+            return [v for a in arrays for v in a.tolist()]
+        return np.concatenate(arrays) if arrays else np.array([])
+
+    indices = np.repeat(np.arange(len(tickers), dtype=np.int32), lengths)
+    return pa.table(
+        {
+            "ticker": pa.DictionaryArray.from_arrays(indices, pa.array(tickers)),
+            "timestamp": pa.array(
+                concat("timestamp").astype(np.int64), pa.timestamp("s", tz="UTC")
+            ),
+            "close": pa.array(concat("close"), pa.float64()),
+            "volume": pa.array(concat("volume"), pa.int64()),
+        }
+    )
+
+
+def serialize_table(table: "pa.Table", format: str) -> bytes:
+    sink = BytesIO()
+    if format == "parquet":
+        pq.write_table(table, sink, compression="zstd")
+    else:
+        with ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue()
+
+
+def export_payload(bars: dict, format: str) -> bytes:
+    return serialize_table(history_table(bars), format)
+
+
+# Usage: /export/history?symbols=AAPL,MSFT&start=2015-01-01&end=2025-01-01&format=parquet
+@router.get("/history")
+async def export_history(
+    symbols: str = Query(..., description="Comma-separated ticker symbols"),
+    start: str | None = Query(
+        None, description="Start date in YYYY-MM-DD (exchange local)"
+    ),
+    end: str | None = Query(
+        None, description="End date in YYYY-MM-DD (exchange local)"
+    ),
+    format: Literal["arrow", "parquet"] = Query("arrow"),
+    db: Session = Depends(get_async_session),
+    user: User = Depends(current_active_user),
+):
+    if pa is None:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Export requires pyarrow (install the 'export' extra).",
+        )
+    tickers = parse_symbols(symbols)
+    try:
+        end_day = (
+            datetime.strptime(end, "%Y-%m-%d").date()
+            if end
+            else datetime.now(timezone.utc).date()
+        )
+        start_day = (
+            datetime.strptime(start, "%Y-%m-%d").date()
+            if start
+            else end_day - timedelta(days=MAX_EXPORT_DAYS)
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Dates must be YYYY-MM-DD.",
+        )
+    if (end_day - start_day).days > MAX_EXPORT_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Export at most {MAX_EXPORT_DAYS} days at a time.",
+        )
+
+    # Bars are stored at exchange-local midnight, so each exchange's tickers
+    # are read with that exchange's day bounds
+    stmt = select(TickerInfo.ticker, TickerInfo.exchangeTimezoneName).filter(
+        TickerInfo.ticker.in_(tickers)
+    )
+    timezones = dict((await db.execute(stmt)).tuples().all())
+    groups = {}
+    for ticker in tickers:
+        groups.setdefault(timezones.get(ticker) or "UTC", []).append(ticker)
+
+    # Cached data only; /ticker/{ticker}/history fills the cache
+    found = {}
+    for tznStr, group in groups.items():
+        start_ts, end_ts = day_bounds(start_day, end_day, ZoneInfo(tznStr))
+        found.update(
+            await bar_columns_many(
+                db, TickerEntry, group, EXPORT_FIELDS, start_ts, end_ts
+            )
+        )
+    bars = {ticker: found[ticker] for ticker in tickers}
+    # Building and compressing the table is CPU bound
+    content = await asyncio.to_thread(export_payload, bars, format)
+
+    filename = f"history.{format}"
+    return Response(
+        content=content,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Query
 from auth import current_active_user
 from models import User
-from services import getForex
+from fx import get_rate
+from responses import JSONResponse
 
 router = APIRouter(tags=["forex"])
 
@@ -16,6 +16,11 @@ async def forex(
 ):
     fromCur = fromCur.upper()
     toCur = toCur.upper()
-    exchangeRate = getForex(fromCur, toCur)
+    try:
+        exchangeRate = await get_rate(fromCur, toCur)
+    except KeyError:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown currency pair {fromCur}/{toCur}"
+        )
     result = {"fromCurrency": fromCur, "toCurrency": toCur, "forexRate": exchangeRate}
     return JSONResponse(content=result)
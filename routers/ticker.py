@@ -1,41 +1,343 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 import yfinance as yf
-import numpy as np
-import exchange_calendars as xcals
 import asyncio
+import time
+from typing import Literal
 
 import schemas
-from database import get_async_session, get_db
+from database import get_async_session
 from auth import current_active_user
+from calendars import calendar_registry
+from coverage import DAY_SECONDS, load_coverage, record_coverage, uncovered_sessions
+from info_cache import ticker_info_cache
+from metrics import record_cache, record_lookup
+from cache import bars_tag, shared_cache
+from http_cache import (
+    CLOSED_RANGE_MAX_AGE,
+    FUNDAMENTALS_MAX_AGE,
+    NEWS_MAX_AGE,
+    cache_headers,
+    make_etag,
+    market_max_age,
+    not_modified_response,
+    stale_headers,
+)
+from repository import (
+    bar_columns,
+    bar_columns_many,
+    bar_validator,
+    latest_timestamp,
+    latest_timestamps,
+    stream_bar_rows,
+)
+from responses import (
+    FastJSONResponse,
+    JSONResponse,
+    ndjson_stream,
+    time_series_payload,
+)
+from ingestion import bulk_upsert, epoch_seconds, frame_to_columns
+from upstream import BARS, NEWS, UpstreamUnavailable, run_upstream, upstream_guard
+from refresher import market_refresher
 from models import User, TickerInfo, TickerEntry, Intraday, Intraweek
 from services import (
+    ANNUAL_REPORTS,
+    QUARTERLY_REPORTS,
     get_and_store_quarterly_metrics,
     get_and_store_annual_metrics,
+    report_validator,
     getExchangeHours,
     getExchangeISO,
+    getExchangeSessions,
     getHoursWeek,
+    download_bars,
 )
 
 router = APIRouter(prefix="/ticker", tags=["ticker"])
 
+MAX_BATCH_SYMBOLS = 50
+
+SeriesFormat = Literal["rows", "columnar"]
+FORMAT_DESCRIPTION = (
+    "rows: list of bar objects; columnar: one array per field, much smaller "
+    "and faster for long ranges"
+)
+HistoryFormat = Literal["rows", "columnar", "ndjson"]
+HISTORY_FORMAT_DESCRIPTION = (
+    FORMAT_DESCRIPTION + "; ndjson: one bar per line, streamed for very long ranges"
+)
+
+# Bar fetches moved off the request path while the upstream is failing,
+# by (table, ticker)
+background_refreshes: dict[tuple, asyncio.Task] = {}
+
+
+def parse_symbols(symbols: str) -> list[str]:
+    tickers = list(
+        dict.fromkeys(s.strip().upper() for s in symbols.split(",") if s.strip())
+    )
+    if not tickers or len(tickers) > MAX_BATCH_SYMBOLS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Provide between 1 and {MAX_BATCH_SYMBOLS} symbols.",
+        )
+    return tickers
+
+
+async def store_timezones(db, infos: dict):
+    stmt = select(TickerInfo.ticker).filter(TickerInfo.ticker.in_(list(infos)))
+    known = set((await db.execute(stmt)).scalars().all())
+    record_cache("ticker_info", hits=len(known), misses=len(infos) - len(known))
+    for ticker, info in infos.items():
+        if ticker not in known and info.get("exchangeTimezoneName"):
+            db.add(
+                TickerInfo(
+                    ticker=ticker, exchangeTimezoneName=info["exchangeTimezoneName"]
+                )
+            )
+    await db.commit()
+
+
+async def store_bars(db, model, ticker: str, df):
+    columns = frame_to_columns(df, {"close": "Close"})
+    await bulk_upsert(db, model, ticker, columns, ("close",))
+    await db.commit()
+
+
+async def refresh_bars(db, model, ticker: str, fetch, *args) -> bool:
+    """
+    Fetch `model` bars with `fetch(*args)` and store them. False if the
+    stored bars are all there is: the fetch failed, or the upstream is
+    failing and the fetch was handed to a background task.
+    """
+    if not upstream_guard.is_healthy(BARS):
+        refresh_in_background(db.bind, model, ticker, fetch, *args)
+        return False
+    try:
+        df = await run_upstream(BARS, fetch, *args)
+    except Exception as e:
+        print(f"Error fetching {model.__tablename__} bars for {ticker}: {e}")
+        return False
+    await store_bars(db, model, ticker, df)
+    return True
+
+
+def refresh_in_background(bind, model, ticker: str, fetch, *args):
+    key = (model.__tablename__, ticker)
+    if key in background_refreshes:
+        return
+
+    async def refresh():
+        try:
+            df = await run_upstream(BARS, fetch, *args)
+            async with AsyncSession(bind) as db:
+                await store_bars(db, model, ticker, df)
+        except Exception as e:
+            print(f"Background refresh of {key} failed: {e}")
+
+    task = asyncio.create_task(refresh())
+    background_refreshes[key] = task
+    task.add_done_callback(lambda _: background_refreshes.pop(key, None))
+
+
+async def market_info(db, ticker: str) -> tuple[dict, bool]:
+    """
+    (info, stale) for the intraday routes. Without any info from the
+    upstream, the stored timezone and the exchange calendar stand in for
+    exchangeTimezoneName and marketState.
+    """
+    try:
+        return await ticker_info_cache.lookup(ticker)
+    except Exception:
+        stmt = select(TickerInfo.exchangeTimezoneName).filter(
+            TickerInfo.ticker == ticker
+        )
+        tznStr = (await db.execute(stmt)).scalars().first()
+        exchangeISO = getExchangeISO(tznStr) if tznStr else None
+        if exchangeISO is None:
+            raise
+        isOpen = calendar_registry.get(exchangeISO).is_open(int(time.time()))
+        info = {
+            "exchangeTimezoneName": tznStr,
+            "marketState": "REGULAR" if isOpen else "CLOSED",
+        }
+        return info, True
+
+
+# Batch routes must be registered before /{ticker}/... so "batch" is not
+# taken as a symbol.
+# Usage: /batch/info?symbols=AAPL,MSFT
+@router.get("/batch/info", response_model=schemas.BatchTickerInfoResponse)
+async def batch_info(
+    response: Response,
+    symbols: str = Query(..., description="Comma-separated ticker symbols"),
+    db: Session = Depends(get_async_session),
+    user: User = Depends(current_active_user),
+):
+    tickers = parse_symbols(symbols)
+    # Concurrent misses run in parallel on the upstream pool
+    results = await asyncio.gather(
+        *(ticker_info_cache.lookup(t) for t in tickers), return_exceptions=True
+    )
+
+    valid = {}
+    invalid = []
+    # Upstream failures are not the ticker's fault, only an empty info is
+    unavailable = []
+    stale = False
+    for ticker, result in zip(tickers, results):
+        if isinstance(result, Exception):
+            print(f"Error fetching info for {ticker}: {result}")
+            unavailable.append(ticker)
+            continue
+        info, infoStale = result
+        try:
+            valid[ticker] = (info, schemas.TickerInfo(**info))
+        except Exception:
+            invalid.append(ticker)
+            continue
+        stale = stale or infoStale
+    if stale:
+        response.headers.update(stale_headers())
+
+    await store_timezones(db, {t: info for t, (info, _) in valid.items()})
+
+    return schemas.BatchTickerInfoResponse(
+        tickers={t: parsed for t, (_, parsed) in valid.items()},
+        invalid=invalid,
+        unavailable=unavailable,
+    )
+
+
+# Usage: /batch/intraday?symbols=AAPL,MSFT
+@router.get("/batch/intraday")
+async def batch_intraday(
+    symbols: str = Query(..., description="Comma-separated ticker symbols"),
+    db: Session = Depends(get_async_session),
+    user: User = Depends(current_active_user),
+):
+    tickers = parse_symbols(symbols)
+    results = await asyncio.gather(
+        *(ticker_info_cache.lookup(t, live=False) for t in tickers),
+        return_exceptions=True,
+    )
+    infos = {}
+    stale = False
+    for ticker, result in zip(tickers, results):
+        if not isinstance(result, Exception):
+            infos[ticker], infoStale = result
+            stale = stale or infoStale
+
+    # Without info from the upstream, the stored timezone will do
+    failed = [t for t in tickers if t not in infos]
+    if failed:
+        stmt = select(TickerInfo.ticker, TickerInfo.exchangeTimezoneName).filter(
+            TickerInfo.ticker.in_(failed)
+        )
+        for ticker, tznStr in (await db.execute(stmt)).all():
+            infos[ticker] = {"exchangeTimezoneName": tznStr}
+            stale = True
+
+    # Most recent session that has opened for each symbol's exchange; this is
+    # today's session while the market is open, the last one otherwise
+    now = int(time.time())
+    windows = {}
+    invalid = []
+    unavailable = []
+    for ticker in tickers:
+        if ticker not in infos:
+            unavailable.append(ticker)
+            continue
+        exchangeISO = getExchangeISO(infos[ticker].get("exchangeTimezoneName"))
+        if exchangeISO is None:
+            invalid.append(ticker)
+            continue
+        exchange = calendar_registry.get(exchangeISO)
+        idx = exchange.latest_open_index(now)
+        windows[ticker] = (int(exchange.opens[idx]), int(exchange.closes[idx]))
+
+    if windows:
+        # One query for the newest stored bar of every symbol
+        latest = await latest_timestamps(db, Intraday, windows)
+
+        outdated = [
+            ticker
+            for ticker, (marketOpen, marketClose) in windows.items()
+            if not market_refresher.is_fresh(ticker, Intraday)
+            and (latest.get(ticker) or 0) < min(marketClose, now) - 60
+        ]
+
+        # One multi-symbol download for everything not already current;
+        # watched symbols are also kept current by the refresher
+        if outdated:
+            try:
+                frames = await run_upstream(BARS, download_bars, outdated, "1d", "1m")
+            except Exception as e:
+                print(f"Error downloading intraday bars for {outdated}: {e}")
+                stale = True
+            else:
+                for ticker, df in frames.items():
+                    columns = frame_to_columns(df, {"close": "Close"})
+                    await bulk_upsert(db, Intraday, ticker, columns, ("close",))
+                await db.commit()
+
+        bars = await bar_columns_many(
+            db,
+            Intraday,
+            windows,
+            ("timestamp", "close"),
+            min(o for o, _ in windows.values()),
+        )
+    else:
+        bars = {}
+
+    result = {}
+    for ticker, (marketOpen, marketClose) in windows.items():
+        session = bars[ticker]["timestamp"] >= marketOpen
+        result[ticker] = {
+            "marketOpen": marketOpen,
+            "marketClose": marketClose,
+            "intraday": time_series_payload(
+                ticker, {k: v[session] for k, v in bars[ticker].items()}, False
+            ),
+        }
+
+    return FastJSONResponse(
+        content={"intraday": result, "invalid": invalid, "unavailable": unavailable},
+        headers=stale_headers() if stale else None,
+    )
+
 
 @router.get("/{ticker}/info")
 async def info(
     ticker: str,
+    response: Response,
     db: Session = Depends(get_async_session),
     user: User = Depends(current_active_user),
 ):
+    ticker = ticker.upper()
+    # Upstream failures are not the ticker's fault, only an empty info is
     try:
-        info = yf.Ticker(ticker).info
+        info, stale = await ticker_info_cache.lookup(ticker)
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        print(f"Error fetching info for {ticker}: {e}")
+        raise UpstreamUnavailable("info")
+    if stale:
+        response.headers.update(stale_headers())
 
+    try:
         stmt = select(TickerInfo).filter(TickerInfo.ticker == ticker)
         result = await db.execute(stmt)
         exists = result.scalars().first()
+        record_lookup("ticker_info", exists is not None)
 
         if not exists:
             # For caching of timezone info
@@ -60,6 +362,7 @@ async def info(
 @router.get("/{ticker}/history")
 async def history(
     ticker: str,
+    request: Request,
     start: str = Query(
         (datetime.today() - timedelta(days=30)).strftime("%Y-%m-%d"),
         description="Start date in YYYY-MM-DD",
@@ -67,133 +370,155 @@ async def history(
     end: str = Query(
         datetime.today().strftime("%Y-%m-%d"), description="End date in YYYY-MM-DD"
     ),
+    format: HistoryFormat = Query("rows", description=HISTORY_FORMAT_DESCRIPTION),
     db: Session = Depends(get_async_session),
     user: User = Depends(current_active_user),
 ):
     ticker = ticker.upper()
 
-    stmt = select(TickerInfo).filter(TickerInfo.ticker == ticker)
-    result = await db.execute(stmt)
-    present = result.scalars().first()
+    stmt = select(TickerInfo.exchangeTimezoneName).filter(TickerInfo.ticker == ticker)
+    tznStr = (await db.execute(stmt)).scalars().first()
+    record_lookup("ticker_info", tznStr is not None)
 
-    if present:
-        tz = ZoneInfo(present.exchangeTimezoneName)
-    else:
-        info = yf.Ticker(ticker).info
-        data = {"ticker": ticker, "exchangeTimezoneName": info["exchangeTimezoneName"]}
+    if tznStr is None:
+        info = await ticker_info_cache.get(ticker, live=False)
+        tznStr = info["exchangeTimezoneName"]
+        data = {"ticker": ticker, "exchangeTimezoneName": tznStr}
         db.add(TickerInfo(**data))
         await db.commit()
-        tz = ZoneInfo(info["exchangeTimezoneName"])
+    tz = ZoneInfo(tznStr)
 
     start_date = int(
         datetime.strptime(start, "%Y-%m-%d").replace(tzinfo=tz).timestamp()
     )
     end_date = int(datetime.strptime(end, "%Y-%m-%d").replace(tzinfo=tz).timestamp())
 
-    # 1. Query for existing data in the requested range
-    cached_stmt = (
-        select(TickerEntry)
-        .filter(
+    # 1. Work out which trading days are missing from the cache
+    exchangeISO = getExchangeISO(tznStr)
+    sessions = getExchangeSessions(exchangeISO, start, end) if exchangeISO else None
+    coveredEnd = None
+    rangeClosed = False
+    now = int(datetime.now(timezone.utc).timestamp())
+
+    if sessions is not None:
+        # Expected sessions come from the exchange calendar, so a range that
+        # is already covered costs no upstream call
+        expected = sessions["sessions"][sessions["opens"] <= now]
+        coverage = await load_coverage(db, ticker)
+        missing_timestamps = uncovered_sessions(expected, coverage).tolist()
+
+        # Only sessions that have closed can be marked as covered
+        complete = sessions["sessions"][sessions["closes"] <= now]
+        if complete.size:
+            coveredEnd = min(end_date, int(complete[-1]))
+        rangeClosed = complete.size == sessions["sessions"].size
+    else:
+        # Exchange calendar unavailable, ask yfinance which trading days exist
+        cached_stmt = select(TickerEntry.timestamp).filter(
             TickerEntry.ticker == ticker,
             TickerEntry.timestamp >= start_date,
             TickerEntry.timestamp <= end_date,
         )
-        .order_by(TickerEntry.timestamp.desc())
-    )
-
-    cached_result = await db.execute(cached_stmt)
-    cached_entries = cached_result.scalars().all()
-
-    # 2. Check if we have all dates in the requested range
-    cached_dates = {e.timestamp for e in cached_entries}
-
-    def get_yf_history_timestamps():
-        hist = yf.Ticker(ticker).history(start=start_date, end=end_date + 86400)
-        return hist.index.astype(np.int64) // 10**9
-
-    yf_timestamps = await asyncio.to_thread(get_yf_history_timestamps)
-
-    trading_days = set(yf_timestamps)
-    missing_timestamps = sorted(trading_days - cached_dates)
+        cached_dates = set((await db.execute(cached_stmt)).scalars().all())
+
+        def get_yf_history_timestamps():
+            hist = yf.Ticker(ticker).history(start=start_date, end=end_date + 86400)
+            return epoch_seconds(hist.index)
+
+        try:
+            yf_timestamps = await run_upstream(BARS, get_yf_history_timestamps)
+            missing_timestamps = sorted(set(yf_timestamps.tolist()) - cached_dates)
+        except Exception as e:
+            print(f"Error listing trading days for {ticker}: {e}")
+            missing_timestamps = None
+
+    # 2. Fetch only the span of missing days from yfinance; if it fails the
+    # stored bars are served, marked stale
+    df = None
+    if missing_timestamps:
+        fetch_start = missing_timestamps[0]
+        fetch_end = missing_timestamps[-1]
+
+        def get_missing_data():
+            return yf.Ticker(ticker).history(start=fetch_start, end=fetch_end + 86400)
+
+        try:
+            df = await run_upstream(BARS, get_missing_data)
+        except Exception as e:
+            print(f"Error fetching history for {ticker}: {e}")
+    # yfinance answers transient errors with an empty frame
+    fetched = df is not None and not df.empty
+    stale = missing_timestamps is None or (bool(missing_timestamps) and not fetched)
+
+    if fetched:
+        # 3. Store new data in DB
+        columns = frame_to_columns(df, {"close": "Close", "volume": "Volume"})
+        await bulk_upsert(db, TickerEntry, ticker, columns, ("close", "volume"))
+        # Sessions after the newest returned bar's day are not covered, so
+        # a truncated answer is completed on the next request
+        if coveredEnd is not None:
+            newest = int(columns["timestamp"].max()) + DAY_SECONDS - 1
+            await record_coverage(db, ticker, start_date, min(coveredEnd, newest))
+        await db.commit()
 
-    if not missing_timestamps:
-        # All data is cached, return it
-        result = [
-            {
-                "ticker": e.ticker,
-                "timestamp": e.timestamp,
-                "close": e.close,
-                "volume": e.volume,
-            }
-            for e in cached_entries
-        ]
-        print("success")
-        result = {"history": result}
-        return JSONResponse(content=result)
-
-    # 3. Fetch only missing data from yfinance
-    fetch_start = missing_timestamps[0]
-    fetch_end = missing_timestamps[-1]
-
-    def get_missing_data():
-        df = yf.Ticker(ticker).history(start=fetch_start, end=fetch_end + 86400)
-        return df.reset_index()
-
-    df = await asyncio.to_thread(get_missing_data)
-
-    # 4. Store new data in DB
-    for _, row in df.iterrows():
-        row_date = int(row["Date"].timestamp())
-        if row_date in missing_timestamps:
-            exists_stmt = select(TickerEntry).filter_by(
-                ticker=ticker, timestamp=row_date
-            )
-            exists_result = await db.execute(exists_stmt)
-            if not exists_result.scalars().first():
-                db_entry = TickerEntry(
-                    ticker=ticker,
-                    timestamp=row_date,
-                    close=float(row["Close"]),
-                    volume=int(row["Volume"]),
-                )
-                db.add(db_entry)
-    await db.commit()
+    # 4. Skip the read and serialization if the client's copy is current
+    count, latest, *checksums = await bar_validator(
+        db, TickerEntry, ticker, start_date, end_date
+    )
+    etag = make_etag(
+        "history", ticker, start_date, end_date, format, count, latest, *checksums
+    )
+    # Bars of sessions that have all closed no longer change. An open
+    # session's bar is rewritten in place, so the newest timestamp is only a
+    # valid Last-Modified once the range is closed; until then only the ETag
+    # (which checksums close and volume) validates
+    maxAge = CLOSED_RANGE_MAX_AGE if rangeClosed else market_max_age(exchangeISO, now)
+    lastModified = latest if rangeClosed else None
+    notModified = not_modified_response(request, etag, lastModified, maxAge)
+    if notModified is not None:
+        return notModified
+    headers = cache_headers(etag, lastModified, maxAge)
+    if stale:
+        headers.update(stale_headers())
 
     # 5. Return all data for the requested period
-    all_entries_stmt = (
-        select(TickerEntry)
-        .filter(
-            TickerEntry.ticker == ticker,
-            TickerEntry.timestamp >= start_date,
-            TickerEntry.timestamp <= end_date,
+    fields = ("timestamp", "close", "volume")
+    if format == "ndjson":
+        chunks = stream_bar_rows(
+            db.bind, TickerEntry, ticker, fields, start_date, end_date
         )
-        .order_by(TickerEntry.timestamp.desc())
+        return StreamingResponse(
+            ndjson_stream(ticker, fields, chunks),
+            media_type="application/x-ndjson",
+            headers=headers,
+        )
+
+    async def load_history():
+        bars = await bar_columns(db, TickerEntry, ticker, fields, start_date, end_date)
+        return time_series_payload(ticker, bars, format == "columnar")
+
+    # The ETag already pins the range's content, the tag lets ingestion
+    # retire superseded payloads
+    result = await shared_cache.get_or_load(
+        "history",
+        etag,
+        load_history,
+        ttl=maxAge,
+        tag=bars_tag(TickerEntry, ticker),
     )
-    all_entries_result = await db.execute(all_entries_stmt)
-    all_entries = all_entries_result.scalars().all()
-
-    result = [
-        {
-            "ticker": e.ticker,
-            "timestamp": e.timestamp,
-            "close": e.close,
-            "volume": e.volume,
-        }
-        for e in all_entries
-    ]
-    result = {"history": result}
-    return JSONResponse(content=result)
+    return FastJSONResponse(content={"history": result}, headers=headers)
 
 
 @router.get("/{ticker}/intraday")
 async def intraday(
     ticker: str,
+    format: SeriesFormat = Query("rows", description=FORMAT_DESCRIPTION),
     db: Session = Depends(get_async_session),
     user: User = Depends(current_active_user),
 ):
     ticker = ticker.upper()
 
-    info = await asyncio.to_thread(lambda: yf.Ticker(ticker).info)
+    info, stale = await market_info(db, ticker)
 
     marketState = info["marketState"]
     tznStr = info["exchangeTimezoneName"]
@@ -204,126 +529,79 @@ async def intraday(
     dayStr = currentTime.strftime("%Y-%m-%d")
     exchangeISO = getExchangeISO(tznStr)
     exchangeHours = getExchangeHours(exchangeISO, dayStr)
-    exchange = xcals.get_calendar(exchangeISO)
+    exchange = calendar_registry.get(exchangeISO)
 
     # Check if Market is closed, if so return most recent intraday data
     if marketState != "REGULAR":
         # last trading day's hours
-        lastClose = int(exchange.previous_close(currentTime).timestamp())
-        lastOpen = int(exchange.previous_open(currentTime).timestamp())
+        nowTs = int(currentTime.timestamp())
+        lastClose = exchange.previous_close(nowTs)
+        lastOpen = exchange.previous_open(nowTs)
 
-        closedDb_stmt = (
-            select(Intraday)
-            .filter(Intraday.ticker == ticker, Intraday.timestamp >= lastOpen)
-            .order_by(Intraday.timestamp.desc())
-        )
-        closedDb_res = await db.execute(closedDb_stmt)
-        closedDb = closedDb_res.scalars().first()
+        closedDb = await latest_timestamp(db, Intraday, ticker, lastOpen)
 
         def get_history_data(start_time=None):
             if start_time:
-                return (
-                    yf.Ticker(ticker)
-                    .history(start=start_time + 1, interval="1m")
-                    .reset_index()
-                )
-            return yf.Ticker(ticker).history(period="1d", interval="1m").reset_index()
-
-        df = await asyncio.to_thread(
-            get_history_data, closedDb.timestamp if closedDb else None
-        )
-
-        for _, row in df.iterrows():
-            row_date = int(row["Datetime"].timestamp())
-            db_entry = Intraday(
-                ticker=ticker, timestamp=row_date, close=float(row["Close"])
-            )
-            db.add(db_entry)
-        await db.commit()
+                return yf.Ticker(ticker).history(start=start_time + 1, interval="1m")
+            return yf.Ticker(ticker).history(period="1d", interval="1m")
 
-        all_entries_stmt = (
-            select(Intraday)
-            .filter(Intraday.ticker == ticker, Intraday.timestamp >= lastOpen)
-            .order_by(Intraday.timestamp.desc())
-        )
-        all_entries_res = await db.execute(all_entries_stmt)
-        all_entries = all_entries_res.scalars().all()
+        # Last session's closing bar already stored, nothing left to fetch
+        if not closedDb or closedDb < lastClose - 60:
+            if not await refresh_bars(db, Intraday, ticker, get_history_data, closedDb):
+                stale = True
 
-        result = [
-            {"ticker": e.ticker, "timestamp": e.timestamp, "close": e.close}
-            for e in all_entries
-        ]
-        return JSONResponse(
+        bars = await bar_columns(db, Intraday, ticker, ("timestamp", "close"), lastOpen)
+        result = time_series_payload(ticker, bars, format == "columnar")
+        return FastJSONResponse(
             content={
                 "marketOpen": lastOpen,
                 "marketClose": lastClose,
                 "intraday": result,
-            }
+            },
+            headers=stale_headers() if stale else None,
         )
 
     # Market is Open
-    present_stmt = (
-        select(Intraday)
-        .filter(Intraday.ticker == ticker)
-        .order_by(Intraday.timestamp.desc())
-    )
-    present_res = await db.execute(present_stmt)
-    present = present_res.scalars().first()
+    present = await latest_timestamp(db, Intraday, ticker)
 
     def get_open_market_history(latest_timestamp=None):
         if latest_timestamp and exchangeHours["openTimestamp"] <= latest_timestamp:
-            return (
-                yf.Ticker(ticker)
-                .history(start=(latest_timestamp + 1), interval="1m")
-                .reset_index()
+            return yf.Ticker(ticker).history(
+                start=(latest_timestamp + 1), interval="1m"
             )
-        return yf.Ticker(ticker).history(period="1d", interval="1m").reset_index()
+        return yf.Ticker(ticker).history(period="1d", interval="1m")
 
-    df = await asyncio.to_thread(
-        get_open_market_history, present.timestamp if present else None
-    )
+    # Watched tickers are kept current by the background refresher
+    if not market_refresher.is_fresh(ticker, Intraday):
+        if not await refresh_bars(
+            db, Intraday, ticker, get_open_market_history, present
+        ):
+            stale = True
 
-    for _, row in df.iterrows():
-        row_date = int(row["Datetime"].timestamp())
-        db_entry = Intraday(
-            ticker=ticker, timestamp=row_date, close=float(row["Close"])
-        )
-        db.add(db_entry)
-    await db.commit()
-
-    all_entries_stmt = (
-        select(Intraday)
-        .filter(
-            Intraday.ticker == ticker,
-            Intraday.timestamp >= exchangeHours["openTimestamp"],
-        )
-        .order_by(Intraday.timestamp.desc())
+    bars = await bar_columns(
+        db, Intraday, ticker, ("timestamp", "close"), exchangeHours["openTimestamp"]
     )
-    all_entries_res = await db.execute(all_entries_stmt)
-    all_entries = all_entries_res.scalars().all()
-
-    result = [
-        {"ticker": e.ticker, "timestamp": e.timestamp, "close": e.close}
-        for e in all_entries
-    ]
-    return JSONResponse(
+    result = time_series_payload(ticker, bars, format == "columnar")
+    return FastJSONResponse(
         content={
             "marketOpen": exchangeHours["openTimestamp"],
             "marketClose": exchangeHours["closeTimestamp"],
             "intraday": result,
-        }
+        },
+        headers=stale_headers() if stale else None,
     )
 
 
 @router.get("/{ticker}/intraweek")
 async def intraweek(
     ticker: str,
+    format: SeriesFormat = Query("rows", description=FORMAT_DESCRIPTION),
     db: Session = Depends(get_async_session),
     user: User = Depends(current_active_user),
 ):
     ticker = ticker.upper()
 
-    info = await asyncio.to_thread(lambda: yf.Ticker(ticker).info)
+    info, stale = await market_info(db, ticker)
 
     marketState = info["marketState"]
     tznStr = info["exchangeTimezoneName"]
@@ -337,120 +615,100 @@ async def intraweek(
 
     # Check if Market is closed, if so return most recent intraweek data
     if marketState != "REGULAR":
-        closedDb_stmt = (
-            select(Intraweek)
-            .filter(Intraweek.ticker == ticker, Intraweek.timestamp >= oldestOpen)
-            .order_by(Intraweek.timestamp.desc())
-        )
-        closedDb_res = await db.execute(closedDb_stmt)
-        closedDb = closedDb_res.scalars().first()
+        closedDb = await latest_timestamp(db, Intraweek, ticker, oldestOpen)
 
         # Define the synchronous yfinance call as a helper function
         def get_history_data(start_time=None):
             if start_time:
-                return (
-                    yf.Ticker(ticker)
-                    .history(start=start_time + 3599, interval="1h")
-                    .reset_index()
-                )
-            return yf.Ticker(ticker).history(period="5d", interval="1h").reset_index()
+                return yf.Ticker(ticker).history(start=start_time + 3599, interval="1h")
+            return yf.Ticker(ticker).history(period="5d", interval="1h")
 
-        # Run the yfinance call in a separate thread
-        df = await asyncio.to_thread(
-            get_history_data, closedDb.timestamp if closedDb else None
-        )
-
-        for _, row in df.iterrows():
-            row_date = int(row["Datetime"].timestamp())
-            db_entry = Intraweek(
-                ticker=ticker, timestamp=row_date, close=float(row["Close"])
-            )
-            db.add(db_entry)
-        await db.commit()
+        # Run the yfinance call on the upstream pool, unless the last
+        # session's closing bar is already stored
+        if not closedDb or closedDb < latestClose - 3600:
+            if not await refresh_bars(
+                db, Intraweek, ticker, get_history_data, closedDb
+            ):
+                stale = True
 
         # Fetch all entries for the week to return
-        all_entries_stmt = (
-            select(Intraweek)
-            .filter(Intraweek.ticker == ticker, Intraweek.timestamp >= oldestOpen)
-            .order_by(Intraweek.timestamp.desc())
+        bars = await bar_columns(
+            db, Intraweek, ticker, ("timestamp", "close"), oldestOpen
         )
-        all_entries_res = await db.execute(all_entries_stmt)
-        all_entries = all_entries_res.scalars().all()
-
-        result = [
-            {"ticker": e.ticker, "timestamp": e.timestamp, "close": e.close}
-            for e in all_entries
-        ]
-        return JSONResponse(
+        result = time_series_payload(ticker, bars, format == "columnar")
+        return FastJSONResponse(
             content={
                 "oldestOpen": oldestOpen,
                 "latestClose": latestClose,
                 "intraweek": result,
-            }
+            },
+            headers=stale_headers() if stale else None,
         )
 
     # Market is Open
-    present_stmt = (
-        select(Intraweek)
-        .filter(Intraweek.ticker == ticker)
-        .order_by(Intraweek.timestamp.desc())
-    )
-    present_res = await db.execute(present_stmt)
-    present = present_res.scalars().first()
+    present = await latest_timestamp(db, Intraweek, ticker)
 
     # Define the synchronous yfinance call as a helper function
     def get_open_market_history(latest_timestamp=None):
         if latest_timestamp and oldestOpen <= latest_timestamp:
             # Ensure no duplicates (threshold is 3599 for 1h interval)
-            return (
-                yf.Ticker(ticker)
-                .history(start=(latest_timestamp + 3599), interval="1h")
-                .reset_index()
+            return yf.Ticker(ticker).history(
+                start=(latest_timestamp + 3599), interval="1h"
             )
-        return yf.Ticker(ticker).history(period="5d", interval="1h").reset_index()
+        return yf.Ticker(ticker).history(period="5d", interval="1h")
 
-    # Run the yfinance call in a separate thread
-    df = await asyncio.to_thread(
-        get_open_market_history, present.timestamp if present else None
-    )
-
-    for _, row in df.iterrows():
-        row_date = int(row["Datetime"].timestamp())
-        db_entry = Intraweek(
-            ticker=ticker, timestamp=row_date, close=float(row["Close"])
-        )
-        db.add(db_entry)
-    await db.commit()
+    # Run the yfinance call on the upstream pool, unless the background
+    # refresher is keeping this ticker current
+    if not market_refresher.is_fresh(ticker, Intraweek):
+        if not await refresh_bars(
+            db, Intraweek, ticker, get_open_market_history, present
+        ):
+            stale = True
 
     # Fetch all entries for the week to return
-    all_entries_stmt = (
-        select(Intraweek)
-        .filter(Intraweek.ticker == ticker, Intraweek.timestamp >= oldestOpen)
-        .order_by(Intraweek.timestamp.desc())
-    )
-    all_entries_res = await db.execute(all_entries_stmt)
-    all_entries = all_entries_res.scalars().all()
-
-    result = [
-        {"ticker": e.ticker, "timestamp": e.timestamp, "close": e.close}
-        for e in all_entries
-    ]
-    return JSONResponse(
+    bars = await bar_columns(db, Intraweek, ticker, ("timestamp", "close"), oldestOpen)
+    result = time_series_payload(ticker, bars, format == "columnar")
+    return FastJSONResponse(
         content={
             "oldestOpen": oldestOpen,
             "latestClose": latestClose,
             "intraweek": result,
-        }
+        },
+        headers=stale_headers() if stale else None,
     )
 
 
+async def report_precondition(request: Request, db, ticker: str, spec):
+    """
+    (304 response or None, max-age) for a reports request. While no new
+    filing is due the stored periods are the answer, so a matching client
+    copy is confirmed without calling the reports service.
+    """
+    now = int(time.time())
+    latest, nextExpected = await report_validator(db, ticker, spec)
+    if nextExpected is None or now >= nextExpected:
+        return None, 0
+    maxAge = min(nextExpected - now, FUNDAMENTALS_MAX_AGE)
+    if latest is None:
+        return None, maxAge
+    etag = make_etag(spec.label, ticker, latest)
+    return not_modified_response(request, etag, latest, maxAge), maxAge
+
+
 @router.get("/{ticker}/quarterly-reports")
 async def quarterly_reports(
     ticker: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_async_session),
     user: User = Depends(current_active_user),
 ):
     ticker = ticker.upper()
+    notModified, maxAge = await report_precondition(
+        request, db, ticker, QUARTERLY_REPORTS
+    )
+    if notModified is not None:
+        return notModified
+
     try:
         ticker_data_obj = yf.Ticker(ticker)
     except Exception as e:
@@ -463,7 +721,7 @@ async def quarterly_reports(
             status_code=400,
         )
 
-    quarterly_reports_data = get_and_store_quarterly_metrics(
+    quarterly_reports_data = await get_and_store_quarterly_metrics(
         ticker_data_obj, ticker, db
     )
 
@@ -477,18 +735,31 @@ async def quarterly_reports(
             status_code=404,
         )
 
+    latest = max(
+        report[QUARTERLY_REPORTS.date_column] for report in quarterly_reports_data
+    )
+    etag = make_etag(QUARTERLY_REPORTS.label, ticker, latest)
+    notModified = not_modified_response(request, etag, latest, maxAge)
+    if notModified is not None:
+        return notModified
     return JSONResponse(
-        content={"ticker": ticker, "quarterlyReports": quarterly_reports_data}
+        content={"ticker": ticker, "quarterlyReports": quarterly_reports_data},
+        headers=cache_headers(etag, latest, maxAge),
     )
 
 
 @router.get("/{ticker}/annual-reports")
 async def annual_reports(
     ticker: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_async_session),
     user: User = Depends(current_active_user),
 ):
     ticker = ticker.upper()
+    notModified, maxAge = await report_precondition(request, db, ticker, ANNUAL_REPORTS)
+    if notModified is not None:
+        return notModified
+
     try:
         ticker_data_obj = yf.Ticker(ticker)
     except Exception as e:
@@ -501,7 +772,9 @@ async def annual_reports(
             status_code=400,
         )
 
-    annual_reports_data = get_and_store_annual_metrics(ticker_data_obj, ticker, db)
+    annual_reports_data = await get_and_store_annual_metrics(
+        ticker_data_obj, ticker, db
+    )
 
     if not annual_reports_data:
         return JSONResponse(
@@ -513,8 +786,14 @@ async def annual_reports(
             status_code=404,
         )
 
+    latest = max(report[ANNUAL_REPORTS.date_column] for report in annual_reports_data)
+    etag = make_etag(ANNUAL_REPORTS.label, ticker, latest)
+    notModified = not_modified_response(request, etag, latest, maxAge)
+    if notModified is not None:
+        return notModified
     return JSONResponse(
-        content={"ticker": ticker, "annualReports": annual_reports_data}
+        content={"ticker": ticker, "annualReports": annual_reports_data},
+        headers=cache_headers(etag, latest, maxAge),
     )
 
 
@@ -522,6 +801,7 @@ async def annual_reports(
 @router.get("/{ticker}/news")
 async def news(
     ticker: str,
+    request: Request,
     count: int = Query(10, description="Number of articles"),
     user: User = Depends(current_active_user),
 ):
@@ -530,8 +810,13 @@ async def news(
     def get_news_sync():
         return yf.Ticker(ticker).get_news(count)
 
-    # Fetch News & Press Releases (List of Dicts)
-    news_list = await asyncio.to_thread(get_news_sync)
+    async def load_news():
+        return await run_upstream(NEWS, get_news_sync)
+
+    # Fetch News & Press Releases (List of Dicts), shared between workers
+    news_list = await shared_cache.get_or_load(
+        "news", f"{ticker}:{count}", load_news, ttl=NEWS_MAX_AGE
+    )
 
     # Process the data (Flatten the dictionary and obtain desired fields)
     def flatten(data):
@@ -566,6 +851,17 @@ async def news(
     for news in news_list:
         result.append(flatten(news))
 
+    # Validators from the article ids and publish times
+    etag = make_etag(
+        "news", ticker, count, *(f"{a['id']}@{a['timestamp']}" for a in result)
+    )
+    latest = max((a["timestamp"] for a in result), default=None)
+    notModified = not_modified_response(request, etag, latest, NEWS_MAX_AGE)
+    if notModified is not None:
+        return notModified
+
     result = {"ticker": ticker, "articles": result}
 
-    return JSONResponse(content=result)
+    return JSONResponse(
+        content=result, headers=cache_headers(etag, latest, NEWS_MAX_AGE)
+    )
@@ -1,12 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-import yfinance as yf
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 import schemas
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete
 from database import get_async_session
 from datetime import datetime
-from models import User, UserWatchlist, TickerPositions
+from models import User, UserWatchlist, TickerPositions, TickerInfo
 from auth import current_active_user
+from info_cache import ticker_info_cache
+from fx import get_rate
+from metrics import record_lookup
+from columns import to_records
+from portfolio import aggregate_positions, portfolio_totals, value_holdings
 
 
 router = APIRouter(prefix="/users/me/watchlist", tags=["watchlist"])
@@ -28,6 +35,88 @@ async def get_user_watchlist(
     )
 
 
+# Must be registered before /{ticker_symbol} so "snapshot" is not a symbol
+# Usage: /snapshot?currency=SGD (totals in base currency)
+@router.get(
+    "/snapshot",
+    response_model=schemas.WatchlistSnapshotResponse,
+)
+async def get_watchlist_snapshot(
+    currency: Optional[str] = Query(None, description="Base currency for totals"),
+    db: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(current_active_user),
+):
+    stmt = select(
+        TickerPositions.ticker,
+        TickerPositions.direction,
+        TickerPositions.quantity,
+        TickerPositions.unitCost,
+    ).where(TickerPositions.user_id == current_user.id)
+    rows = (await db.execute(stmt)).all()
+
+    if not rows:
+        return schemas.WatchlistSnapshotResponse(
+            identifier=current_user.email,
+            baseCurrency=currency.upper() if currency else None,
+            holdings=[],
+            totalMarketValue=None,
+            totalCostBasis=None,
+            totalUnrealizedPnl=None,
+            totalRealizedPnl=None,
+        )
+
+    holdings = aggregate_positions(*zip(*rows))
+
+    # Last prices come from the shared info cache
+    tickers = holdings["ticker"].tolist()
+    infos = await asyncio.gather(
+        *(ticker_info_cache.get(t) for t in tickers), return_exceptions=True
+    )
+    infos = [info if isinstance(info, dict) else {} for info in infos]
+    prices = [info.get("regularMarketPrice", float("nan")) for info in infos]
+    currencies = [info.get("currency") for info in infos]
+
+    if currency:
+        currency = currency.upper()
+        rates = {}
+        for cur in set(filter(None, currencies)):
+            try:
+                rates[cur] = await get_rate(cur, currency)
+            except Exception as e:
+                print(f"Error fetching {cur}{currency} rate: {e}")
+        rate_list = [rates.get(cur, float("nan")) for cur in currencies]
+    elif len(set(currencies)) == 1:
+        # Single currency portfolio, totals need no conversion
+        rate_list = [1.0] * len(tickers)
+    else:
+        rate_list = [float("nan")] * len(tickers)
+
+    valued = value_holdings(holdings, prices, rate_list)
+    records = to_records(
+        valued,
+        [
+            "ticker",
+            "quantity",
+            "averageCost",
+            "costBasis",
+            "realizedPnl",
+            "lastPrice",
+            "marketValue",
+            "unrealizedPnl",
+            "exchangeRate",
+        ],
+    )
+    for record, cur in zip(records, currencies):
+        record["currency"] = cur
+
+    return schemas.WatchlistSnapshotResponse(
+        identifier=current_user.email,
+        baseCurrency=currency,
+        holdings=records,
+        **portfolio_totals(valued),
+    )
+
+
 @router.post(
     "/{ticker_symbol}",
     status_code=status.HTTP_201_CREATED,
@@ -51,7 +140,7 @@ async def add_ticker_to_watchlist(
         )
 
     try:
-        yf.Ticker(ticker).info
+        info = await ticker_info_cache.get(ticker, live=False)
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -60,6 +149,14 @@ async def add_ticker_to_watchlist(
 
     new_watchlist_entry = UserWatchlist(user_id=current_user.id, ticker=ticker)
     db.add(new_watchlist_entry)
+
+    # Cache the timezone so the background refresher can group by exchange
+    tznStr = info.get("exchangeTimezoneName")
+    stmt_info = select(TickerInfo).where(TickerInfo.ticker == ticker)
+    known = (await db.execute(stmt_info)).scalars().first() is not None
+    record_lookup("ticker_info", known)
+    if tznStr and not known:
+        db.add(TickerInfo(ticker=ticker, exchangeTimezoneName=tznStr))
     await db.commit()
     return {"message": f"Ticker {ticker} added to watchlist."}
 
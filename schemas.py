@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, Literal, List
+from typing import Optional, Literal, List, Dict
 from fastapi_users import schemas
 
 
@@ -23,6 +23,29 @@ class WatchlistTickersResponse(BaseModel):
     tickers: List[str]
 
 
+class HoldingSnapshot(BaseModel):
+    ticker: str
+    quantity: float
+    averageCost: Optional[float]
+    costBasis: Optional[float]
+    realizedPnl: Optional[float]
+    currency: Optional[str]
+    lastPrice: Optional[float]
+    marketValue: Optional[float]
+    unrealizedPnl: Optional[float]
+    exchangeRate: Optional[float]
+
+
+class WatchlistSnapshotResponse(BaseModel):
+    identifier: str
+    baseCurrency: Optional[str]
+    holdings: List[HoldingSnapshot]
+    totalMarketValue: Optional[float]
+    totalCostBasis: Optional[float]
+    totalUnrealizedPnl: Optional[float]
+    totalRealizedPnl: Optional[float]
+
+
 class PositionCreate(BaseModel):
     direction: Literal["BUY", "SELL"]
     quantity: float = Field(gt=0)
@@ -57,3 +80,10 @@ class TickerInfo(BaseModel):
     # sector: Optional[str] = None
     # industry: Optional[str] = None
     # longBusinessSummary: Optional[str]
+
+
+class BatchTickerInfoResponse(BaseModel):
+    tickers: Dict[str, TickerInfo]
+    invalid: List[str]
+    # Symbols the upstream could not answer for right now
+    unavailable: List[str] = []
@@ -1,11 +1,18 @@
+import asyncio
+import time
+from dataclasses import dataclass
 import yfinance as yf
 import pandas as pd
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from models import QuarterlyMetrics, AnnualMetrics
-import numpy as np
-import exchange_calendars as xcals
-from datetime import datetime
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import QuarterlyMetrics, AnnualMetrics, FundamentalsSchedule
+from calendars import calendar_registry
+from coverage import DAY_SECONDS
+from fundamentals import metric_rows
+from ingestion import insert_for
+from metrics import record_cache
+from fx import fx_rates
+from upstream import FUNDAMENTALS, run_upstream
 
 
 # Exchange ISO
@@ -25,472 +32,310 @@ def getExchangeISO(tzn):
 
 # Exchange Timezone
 def getExchangeHours(iso, dayStr):
-    calendar = xcals.get_calendar(iso)
-    schedule = calendar.schedule
-    dayTimes = schedule.loc[dayStr] if dayStr in schedule.index else None
+    table = calendar_registry.get(iso)
+    idx = table.session_index(dayStr)
     openTs = None
     closeTs = None
-    if dayTimes is not None:
-        openTs = int(dayTimes["open"].timestamp())
-        closeTs = int(dayTimes["close"].timestamp())
+    if idx is not None:
+        openTs = int(table.opens[idx])
+        closeTs = int(table.closes[idx])
     return {"openTimestamp": openTs, "closeTimestamp": closeTs}
 
 
-def getHoursWeek(iso, now):
-    xc = xcals.get_calendar(iso)
-    day = now.date()
-
-    latest_session = None
-    # Today is trading day
-    if xc.is_session(day):
-        mkt_open_tdy = xc.session_open(day)
-
-        if now < mkt_open_tdy:
-            latest_session = xc.previous_session(day)
-        else:
-            latest_session = day
+# Sessions between two YYYY-MM-DD dates, keyed by local midnight (the
+# timestamp yfinance gives daily bars), with open/close in epoch seconds.
+# None if the range falls outside the calendar's bounds.
+def getExchangeSessions(iso, startStr, endStr):
+    table = calendar_registry.get(iso)
+    if not table.covers(startStr, endStr):
+        return None
+    window = table.sessions_between(startStr, endStr)
+    return {
+        "sessions": table.midnights[window],
+        "opens": table.opens[window],
+        "closes": table.closes[window],
+    }
 
-    # Today is not trading day
-    else:
-        latest_session = xc.date_to_session(day, direction="previous")
 
-    if latest_session is not None:
-        past_five_trading_days = xc.sessions_window(latest_session, -5)
+# Open of the oldest and close of the latest of the past 5 trading days
+def getHoursWeek(iso, now):
+    table = calendar_registry.get(iso)
+    window = table.last_sessions(5, int(now.timestamp()))
+    return {
+        "oldestOpen": int(table.opens[window][0]),
+        "latestClose": int(table.closes[window][-1]),
+    }
 
-    oldest_day = past_five_trading_days[0]
-    latest_day = past_five_trading_days[-1]
-    oldest_open = xc.schedule.loc[oldest_day]["open"]
-    latest_close = xc.schedule.loc[latest_day]["close"]
 
+# One multi-symbol yfinance download split into a frame per symbol
+def download_bars(symbols, period, interval):
+    symbols = list(symbols)
+    if not symbols:
+        return {}
+    df = yf.download(
+        symbols,
+        period=period,
+        interval=interval,
+        group_by="ticker",
+        auto_adjust=True,
+        ignore_tz=False,
+        progress=False,
+        threads=False,
+    )
+    if df is None or df.empty:
+        return {}
+    if not isinstance(df.columns, pd.MultiIndex):
+        return {symbols[0]: df}
+    downloaded = set(df.columns.get_level_values(0))
     return {
-        "oldestOpen": int(oldest_open.timestamp()),
-        "latestClose": int(latest_close.timestamp()),
+        symbol: df[symbol].dropna(how="all")
+        for symbol in symbols
+        if symbol in downloaded
     }
 
 
 # Foreign Exchange Rates relative to SGD
 def getForex(fromCur, toCur):
-    if fromCur.upper() == toCur.upper():
-        return 1.00
-    ticker = f"{fromCur.upper()}{toCur.upper()}=X"
-    marketState = yf.Ticker(ticker).info["marketState"]
-    if marketState != "REGULAR":
-        price = yf.Ticker(ticker).history(period="1d").iloc[0, 3]
-        return price
-    price = (
-        yf.Ticker(ticker)
-        .history(start=int(datetime.now().timestamp()) - 600, interval="1m")
-        .iloc[-1, 3]
-    )
-    return price
+    # Triangulated from the shared USD rate store, refreshing it if stale
+    return fx_rates.rate(fromCur, toCur)
 
 
-# Convert NaN to None
-def safe_get_metric(statement_series, key):
-    value = statement_series.get(key)
-    if value is None:
-        return None
-    if isinstance(value, float) and np.isnan(value):
-        return None
-    return value
+# Reads one statement property; named after it so upstream metrics show
+# which statement was slow or failed
+def statement_getter(name: str):
+    def get_statement(ticker_obj: yf.Ticker):
+        return getattr(ticker_obj, name)
 
+    get_statement.__name__ = name
+    return get_statement
 
-def get_and_store_quarterly_metrics(
-    ticker_obj: yf.Ticker, ticker_symbol: str, db: Session
-):
-    # Peek at yfinance to get the latest quarter date
-    try:
-        cashflow_peek = ticker_obj.quarterly_cashflow
-        if cashflow_peek.empty:
-            print(f"No quarterly data available from yfinance for {ticker_symbol}.")
-            return []
-
-        latest_yf_quarter = cashflow_peek.columns[0]
-        if not isinstance(latest_yf_quarter, pd.Timestamp):
-            print(
-                f"Warning: Latest quarter column {latest_yf_quarter} is not a Timestamp."
-            )
-            latest_yf_quarter_unix = None
-        else:
-            latest_yf_quarter_unix = int(latest_yf_quarter.timestamp())
-
-    except Exception as e:
-        print(f"Error peeking at yfinance data for {ticker_symbol}: {e}")
-        return []
 
-    # Check if this latest quarter is already in db
-    if latest_yf_quarter_unix is not None:
-        latest_in_db = (
-            db.query(QuarterlyMetrics)
-            .filter_by(ticker=ticker_symbol, quarterEndDate=latest_yf_quarter_unix)
-            .first()
+# Download financial statements concurrently on the upstream pool
+async def fetch_statements(ticker_obj: yf.Ticker, *names: str) -> list:
+    return await asyncio.gather(
+        *(
+            run_upstream(FUNDAMENTALS, statement_getter(name), ticker_obj)
+            for name in names
         )
-
-        if latest_in_db:
-            print(
-                f"Latest report for {ticker_symbol} (quarter ending {latest_yf_quarter.strftime('%Y-%m-%d')}) found in DB. Using cached data."
-            )
-
-            # Fetch up to 4 most recent quarters from DB
-            cached_reports = (
-                db.query(QuarterlyMetrics)
-                .filter_by(ticker=ticker_symbol)
-                .order_by(desc(QuarterlyMetrics.quarterEndDate))
-                .limit(4)
-                .all()
-            )
-
-            # Convert to list of dictionaries
-            all_quarters_metrics_data = []
-            for report in cached_reports:
-                metrics_dict = {
-                    column.name: getattr(report, column.name)
-                    for column in QuarterlyMetrics.__table__.columns
-                    if column.name != "id"
-                }
-                all_quarters_metrics_data.append(metrics_dict)
-
-            return all_quarters_metrics_data
-
-    # Latest quarter not in DB, proceed with yfinance fetch and store
-    print(
-        f"Latest report for {ticker_symbol} not in DB. Fetching from yfinance and updating cache."
     )
 
-    try:
-        income_q_df = ticker_obj.quarterly_income_stmt
-        balance_q_df = ticker_obj.quarterly_balance_sheet
-        cashflow_q_df = ticker_obj.quarterly_cashflow
-    except Exception as e:
-        print(
-            f"Error fetching financial statements for {ticker_symbol} from yfinance: {e}"
-        )
-        return []
 
-    all_quarters_metrics_data = []
-    num_quarters_to_process = min(len(income_q_df.columns), 4)
-    new_data_added = False
+# Newest `limit` period-end columns of a yfinance statement
+def statement_periods(statement: pd.DataFrame, limit: int = 4) -> list:
+    return [c for c in statement.columns[:limit] if isinstance(c, pd.Timestamp)]
 
-    for i in range(num_quarters_to_process):
-        quarter_timestamp_col = income_q_df.columns[i]
 
-        if not isinstance(quarter_timestamp_col, pd.Timestamp):
-            print(
-                f"Warning: Column {quarter_timestamp_col} is not a Timestamp. Skipping."
-            )
-            continue
+def metrics_dict(report, model) -> dict:
+    return {
+        column.name: getattr(report, column.name)
+        for column in model.__table__.columns
+        if column.name != "id"
+    }
 
-        quarter_end_date_unix = int(quarter_timestamp_col.timestamp())
 
-        # Check if this specific quarter already exists in DB
-        existing_metrics = (
-            db.query(QuarterlyMetrics)
-            .filter_by(ticker=ticker_symbol, quarterEndDate=quarter_end_date_unix)
-            .first()
+# Stored metrics for `dates` in one IN (...) query, keyed by period end date
+async def load_cached_metrics(
+    db: AsyncSession, model, date_column: str, ticker_symbol: str, dates
+) -> dict:
+    date_attr = getattr(model, date_column)
+    reports = (
+        await db.execute(
+            select(model).where(model.ticker == ticker_symbol, date_attr.in_(dates))
         )
+    ).scalars()
+    return {
+        getattr(report, date_column): metrics_dict(report, model) for report in reports
+    }
 
-        if existing_metrics:
-            # Use existing data from DB
-            metrics_dict = {
-                column.name: getattr(existing_metrics, column.name)
-                for column in QuarterlyMetrics.__table__.columns
-                if column.name != "id"
-            }
-            all_quarters_metrics_data.append(metrics_dict)
-            continue
-
-        # Process new quarter data from yfinance
-        print(
-            f"Processing new quarter {quarter_timestamp_col.strftime('%Y-%m-%d')} for {ticker_symbol}."
-        )
 
-        income_statement = income_q_df[quarter_timestamp_col]
-        balance_sheet = balance_q_df[quarter_timestamp_col]
-        cash_flow_statement = cashflow_q_df[quarter_timestamp_col]
-
-        revenue = safe_get_metric(income_statement, "Total Revenue")
-        eps = safe_get_metric(income_statement, "Diluted EPS")
-        ebitda = safe_get_metric(income_statement, "EBITDA")
-        net_income = safe_get_metric(income_statement, "Net Income")
-        gross_profit = safe_get_metric(income_statement, "Gross Profit")
-
-        total_assets = safe_get_metric(balance_sheet, "Total Assets")
-        total_liabilities = None
-        total_liabilities_keys = [
-            "Total Liab",
-            "Total Liabilities Net Minority Interest",
-            "Total Liabilities",
-        ]
-        for key in total_liabilities_keys:
-            val = safe_get_metric(balance_sheet, key)
-            if val is not None:
-                total_liabilities = val
-                break
-
-        shareholder_equity = safe_get_metric(balance_sheet, "Stockholders Equity")
-        long_term_debt = safe_get_metric(
-            balance_sheet, "Long Term Debt And Capital Lease Obligation"
+async def load_latest_metrics(
+    db: AsyncSession, model, date_column: str, ticker_symbol: str, limit: int = 4
+) -> list:
+    reports = (
+        await db.execute(
+            select(model)
+            .filter_by(ticker=ticker_symbol)
+            .order_by(getattr(model, date_column).desc())
+            .limit(limit)
         )
-        cash_and_equivalents = safe_get_metric(
-            balance_sheet, "Cash And Cash Equivalents"
+    ).scalars()
+    return [metrics_dict(report, model) for report in reports]
+
+
+@dataclass(frozen=True)
+class ReportSpec:
+    model: type
+    date_column: str
+    # Statement name (as in fundamentals.METRIC_MAP) -> yfinance attribute
+    statements: dict
+    # Statement downloaded first to find the latest periods
+    peek: str
+    label: str
+    # Period end -> when the next period's filing is expected
+    report_lag: int
+
+
+QUARTERLY_REPORTS = ReportSpec(
+    model=QuarterlyMetrics,
+    date_column="quarterEndDate",
+    statements={
+        "income": "quarterly_income_stmt",
+        "balance": "quarterly_balance_sheet",
+        "cashflow": "quarterly_cashflow",
+    },
+    peek="cashflow",
+    label="quarterly",
+    # Next quarter end plus ~5 weeks to file the 10-Q
+    report_lag=(91 + 35) * DAY_SECONDS,
+)
+ANNUAL_REPORTS = ReportSpec(
+    model=AnnualMetrics,
+    date_column="yearEndDate",
+    statements={
+        "income": "income_stmt",
+        "balance": "balance_sheet",
+        "cashflow": "cashflow",
+    },
+    peek="income",
+    label="yearly",
+    # Next fiscal year end plus ~2 months to file the 10-K
+    report_lag=(365 + 60) * DAY_SECONDS,
+)
+# Once a filing is overdue, peek at most this often
+RECHECK_SECONDS = DAY_SECONDS
+
+
+def next_report_expected(latest_period_end: int, spec: ReportSpec, now: int) -> int:
+    return max(latest_period_end + spec.report_lag, now + RECHECK_SECONDS)
+
+
+# Record the peek and when the next filing should appear. An upsert, since
+# concurrent first requests for a ticker race to create the row.
+async def update_schedule(
+    db: AsyncSession, ticker_symbol: str, spec: ReportSpec, now: int, dates
+):
+    stmt = insert_for(db)(FundamentalsSchedule).values(
+        ticker=ticker_symbol,
+        period=spec.label,
+        lastChecked=now,
+        nextExpected=next_report_expected(max(dates), spec, now),
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["ticker", "period"],
+            set_={
+                "lastChecked": stmt.excluded.lastChecked,
+                "nextExpected": stmt.excluded.nextExpected,
+            },
         )
+    )
 
-        operating_cf = safe_get_metric(cash_flow_statement, "Operating Cash Flow")
-        free_cash_flow = safe_get_metric(cash_flow_statement, "Free Cash Flow")
 
-        # Derived metrics
-        gross_margin = (
-            (gross_profit / revenue)
-            if gross_profit is not None and revenue is not None and revenue != 0
-            else None
+async def report_validator(db: AsyncSession, ticker_symbol: str, spec: ReportSpec):
+    """(latest stored period end, next expected filing) in one round trip"""
+    date_attr = getattr(spec.model, spec.date_column)
+    stmt = select(
+        select(func.max(date_attr))
+        .where(spec.model.ticker == ticker_symbol)
+        .scalar_subquery(),
+        select(FundamentalsSchedule.nextExpected)
+        .filter_by(ticker=ticker_symbol, period=spec.label)
+        .scalar_subquery(),
+    )
+    return tuple((await db.execute(stmt)).one())
+
+
+async def get_and_store_metrics(
+    ticker_obj: yf.Ticker, ticker_symbol: str, db: AsyncSession, spec: ReportSpec
+):
+    now = int(time.time())
+    schedule = (
+        await db.execute(
+            select(FundamentalsSchedule).filter_by(
+                ticker=ticker_symbol, period=spec.label
+            )
         )
+    ).scalar_one_or_none()
 
-        debt_to_equity = (
-            (total_liabilities / shareholder_equity)
-            if total_liabilities is not None
-            and shareholder_equity is not None
-            and shareholder_equity != 0
-            else None
+    # No new filing expected yet, answer from the DB alone
+    if schedule is not None and now < schedule.nextExpected:
+        cached_reports = await load_latest_metrics(
+            db, spec.model, spec.date_column, ticker_symbol
         )
+        if cached_reports:
+            record_cache(spec.model.__tablename__, hits=len(cached_reports))
+            return cached_reports
 
-        current_quarter_data = {
-            "ticker": ticker_symbol,
-            "quarterEndDate": quarter_end_date_unix,
-            "revenue": revenue,
-            "eps": eps,
-            "ebitda": ebitda,
-            "netIncome": net_income,
-            "totalAssets": total_assets,
-            "totalLiabilities": total_liabilities,
-            "shareholderEquity": shareholder_equity,
-            "longTermDebt": long_term_debt,
-            "cashAndEquivalents": cash_and_equivalents,
-            "operatingCashFlow": operating_cf,
-            "freeCashFlow": free_cash_flow,
-            "grossMargin": gross_margin,
-            "roe": None,
-            "roa": None,
-            "debtToEquity": debt_to_equity,
-        }
-
-        # Store in DB
-        db_entry = QuarterlyMetrics(**current_quarter_data)
-        db.add(db_entry)
-        new_data_added = True
-
-        all_quarters_metrics_data.append(current_quarter_data)
-
-    # Only commit if new data was added
-    if new_data_added:
-        try:
-            db.commit()
-            print(f"Committed new quarterly metrics to DB for {ticker_symbol}.")
-        except Exception as e:
-            db.rollback()
-            print(f"Error committing quarterly metrics to DB for {ticker_symbol}: {e}")
-
-    return all_quarters_metrics_data
-
-
-def get_and_store_annual_metrics(
-    ticker_obj: yf.Ticker, ticker_symbol: str, db: Session
-):
-    # Peek at yfinance to get the latest year date
+    # Peek at yfinance to get the latest periods
     try:
-        income_peek = ticker_obj.income_stmt
-        if income_peek.empty:
-            print(f"No yearly data available from yfinance for {ticker_symbol}.")
-            return []
-
-        latest_yf_year = income_peek.columns[0]
-        if not isinstance(latest_yf_year, pd.Timestamp):
-            print(f"Warning: Latest year column {latest_yf_year} is not a Timestamp.")
-            latest_yf_year_unix = None
-        else:
-            latest_yf_year_unix = int(latest_yf_year.timestamp())
-
+        (peek_df,) = await fetch_statements(ticker_obj, spec.statements[spec.peek])
     except Exception as e:
         print(f"Error peeking at yfinance data for {ticker_symbol}: {e}")
-        return []
-
-    # Check if this latest year is already in db
-    if latest_yf_year_unix is not None:
-        latest_in_db = (
-            db.query(AnnualMetrics)
-            .filter_by(ticker=ticker_symbol, yearEndDate=latest_yf_year_unix)
-            .first()
+        # Serve what is stored until the upstream recovers
+        return await load_latest_metrics(
+            db, spec.model, spec.date_column, ticker_symbol
         )
+    if peek_df is None or peek_df.empty:
+        print(f"No {spec.label} data available from yfinance for {ticker_symbol}.")
+        return []
 
-        if latest_in_db:
-            print(
-                f"Latest report for {ticker_symbol} (year ending {latest_yf_year.strftime('%Y-%m-%d')}) found in DB. Using cached data."
-            )
-
-            # Fetch up to 4 most recent years from DB
-            cached_reports = (
-                db.query(AnnualMetrics)
-                .filter_by(ticker=ticker_symbol)
-                .order_by(desc(AnnualMetrics.yearEndDate))
-                .limit(4)
-                .all()
-            )
-
-            # Convert to list of dictionaries
-            all_years_metrics_data = []
-            for report in cached_reports:
-                metrics_dict = {
-                    column.name: getattr(report, column.name)
-                    for column in AnnualMetrics.__table__.columns
-                    if column.name != "id"
-                }
-                all_years_metrics_data.append(metrics_dict)
-
-            return all_years_metrics_data
+    # One lookup for every candidate period
+    periods = statement_periods(peek_df)
+    period_dates = [int(p.timestamp()) for p in periods]
+    cached = await load_cached_metrics(
+        db, spec.model, spec.date_column, ticker_symbol, period_dates
+    )
+    missing = [p for p, d in zip(periods, period_dates) if d not in cached]
+    record_cache(spec.model.__tablename__, hits=len(cached), misses=len(missing))
+    if not missing:
+        print(f"Latest reports for {ticker_symbol} found in DB. Using cached data.")
+        if period_dates:
+            await update_schedule(db, ticker_symbol, spec, now, period_dates)
+            await db.commit()
+        return [cached[d] for d in period_dates]
 
-    # Latest year not in DB, proceed with yfinance fetch and store
     print(
-        f"Latest report for {ticker_symbol} not in DB. Fetching from yfinance and updating cache."
+        f"Latest reports for {ticker_symbol} not in DB. Fetching from yfinance and updating cache."
     )
 
+    # The peeked statement is reused; only the other two are fetched
+    others = {k: v for k, v in spec.statements.items() if k != spec.peek}
     try:
-        income_q_df = ticker_obj.income_stmt
-        balance_q_df = ticker_obj.balance_sheet
-        cashflow_q_df = ticker_obj.cashflow
+        frames = await fetch_statements(ticker_obj, *others.values())
     except Exception as e:
         print(
             f"Error fetching financial statements for {ticker_symbol} from yfinance: {e}"
         )
         return []
+    statements = dict(zip(others, frames)) | {spec.peek: peek_df}
+
+    rows = metric_rows(ticker_symbol, spec.date_column, missing, statements)
+    # A concurrent first request may have stored the same periods already
+    await db.execute(
+        insert_for(db)(spec.model)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=["ticker", spec.date_column])
+    )
+    cached.update((row[spec.date_column], row) for row in rows)
+    await update_schedule(db, ticker_symbol, spec, now, period_dates)
 
-    metrics_data = []
-    num_years_to_process = min(len(income_q_df.columns), 4)
-    new_data_added = False
-
-    for i in range(num_years_to_process):
-        year_timestamp_col = income_q_df.columns[i]
-
-        if not isinstance(year_timestamp_col, pd.Timestamp):
-            print(f"Warning: Column {year_timestamp_col} is not a Timestamp. Skipping.")
-            continue
-
-        year_end_date_unix = int(year_timestamp_col.timestamp())
+    try:
+        await db.commit()
+        print(f"Committed new {spec.label} metrics to DB for {ticker_symbol}.")
+    except Exception as e:
+        await db.rollback()
+        print(f"Error committing {spec.label} metrics to DB for {ticker_symbol}: {e}")
 
-        # Check if this specific year already exists in DB
-        existing_metrics = (
-            db.query(AnnualMetrics)
-            .filter_by(ticker=ticker_symbol, yearEndDate=year_end_date_unix)
-            .first()
-        )
+    return [cached[d] for d in period_dates]
 
-        if existing_metrics:
-            # Use existing data from DB
-            metrics_dict = {
-                column.name: getattr(existing_metrics, column.name)
-                for column in AnnualMetrics.__table__.columns
-                if column.name != "id"
-            }
-            metrics_data.append(metrics_dict)
-            continue
-
-        # Process new year data from yfinance
-        print(
-            f"Processing new year {year_timestamp_col.strftime('%Y-%m-%d')} for {ticker_symbol}."
-        )
 
-        income_statement = income_q_df[year_timestamp_col]
-        balance_sheet = balance_q_df[year_timestamp_col]
-        cash_flow_statement = cashflow_q_df[year_timestamp_col]
-
-        revenue = safe_get_metric(income_statement, "Total Revenue")
-        eps = safe_get_metric(income_statement, "Diluted EPS")
-        ebitda = safe_get_metric(income_statement, "EBITDA")
-        net_income = safe_get_metric(income_statement, "Net Income")
-        gross_profit = safe_get_metric(income_statement, "Gross Profit")
-
-        total_assets = safe_get_metric(balance_sheet, "Total Assets")
-        total_liabilities = None
-        total_liabilities_keys = [
-            "Total Liab",
-            "Total Liabilities Net Minority Interest",
-            "Total Liabilities",
-        ]
-        for key in total_liabilities_keys:
-            val = safe_get_metric(balance_sheet, key)
-            if val is not None:
-                total_liabilities = val
-                break
-
-        shareholder_equity = safe_get_metric(balance_sheet, "Stockholders Equity")
-        long_term_debt = safe_get_metric(
-            balance_sheet, "Long Term Debt And Capital Lease Obligation"
-        )
-        cash_and_equivalents = safe_get_metric(
-            balance_sheet, "Cash And Cash Equivalents"
-        )
+async def get_and_store_quarterly_metrics(
+    ticker_obj: yf.Ticker, ticker_symbol: str, db: AsyncSession
+):
+    return await get_and_store_metrics(ticker_obj, ticker_symbol, db, QUARTERLY_REPORTS)
 
-        operating_cf = safe_get_metric(cash_flow_statement, "Operating Cash Flow")
-        free_cash_flow = safe_get_metric(cash_flow_statement, "Free Cash Flow")
 
-        # Derived metrics
-        gross_margin = (
-            (gross_profit / revenue)
-            if gross_profit is not None and revenue is not None and revenue != 0
-            else None
-        )
-        roe = (
-            (net_income / shareholder_equity)
-            if net_income is not None
-            and shareholder_equity is not None
-            and shareholder_equity != 0
-            else None
-        )
-        roa = (
-            (net_income / total_assets)
-            if net_income is not None and total_assets is not None and total_assets != 0
-            else None
-        )
-        debt_to_equity = (
-            (total_liabilities / shareholder_equity)
-            if total_liabilities is not None
-            and shareholder_equity is not None
-            and shareholder_equity != 0
-            else None
-        )
-
-        current_year_data = {
-            "ticker": ticker_symbol,
-            "yearEndDate": year_end_date_unix,
-            "revenue": revenue,
-            "eps": eps,
-            "ebitda": ebitda,
-            "netIncome": net_income,
-            "totalAssets": total_assets,
-            "totalLiabilities": total_liabilities,
-            "shareholderEquity": shareholder_equity,
-            "longTermDebt": long_term_debt,
-            "cashAndEquivalents": cash_and_equivalents,
-            "operatingCashFlow": operating_cf,
-            "freeCashFlow": free_cash_flow,
-            "grossMargin": gross_margin,
-            "roe": roe,
-            "roa": roa,
-            "debtToEquity": debt_to_equity,
-        }
-
-        # Store in DB
-        db_entry = AnnualMetrics(**current_year_data)
-        db.add(db_entry)
-        new_data_added = True
-
-        metrics_data.append(current_year_data)
-
-    # Only commit if new data was added
-    if new_data_added:
-        try:
-            db.commit()
-            print(f"Committed new yearly metrics to DB for {ticker_symbol}.")
-        except Exception as e:
-            db.rollback()
-            print(f"Error committing yearly metrics to DB for {ticker_symbol}: {e}")
-
-    return metrics_data
+async def get_and_store_annual_metrics(
+    ticker_obj: yf.Ticker, ticker_symbol: str, db: AsyncSession
+):
+    return await get_and_store_metrics(ticker_obj, ticker_symbol, db, ANNUAL_REPORTS)
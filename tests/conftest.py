@@ -17,6 +17,10 @@ from auth import current_active_user
 from unittest.mock import MagicMock
 import pandas as pd
 from auth import CustomPasswordHelper
+from info_cache import ticker_info_cache
+from fx import fx_rates
+from cache import shared_cache
+from upstream import upstream_guard
 
 
 # Async database session
@@ -50,6 +54,20 @@ async def async_test_db():
     await engine.dispose()
 
 
+# Process-wide caches must not leak upstream results between tests
+@pytest.fixture(autouse=True)
+async def clear_caches():
+    ticker_info_cache.clear()
+    fx_rates.clear()
+    await shared_cache.clear()
+    upstream_guard.reset()
+    yield
+    ticker_info_cache.clear()
+    fx_rates.clear()
+    await shared_cache.clear()
+    upstream_guard.reset()
+
+
 # async test client for asynchronous tests
 @pytest.fixture(scope="function")
 async def async_client():
@@ -0,0 +1,203 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from cache import (
+    MemoryBackend,
+    SQLiteBackend,
+    TieredCache,
+    bars_tag,
+    create_backend,
+    shared_cache,
+)
+from info_cache import TickerInfoCache
+from ingestion import bulk_upsert
+from models import TickerEntry
+from tests.test_info_cache import FakeFetcher
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBackend()
+    return SQLiteBackend(str(tmp_path / "cache.db"))
+
+
+class TestBackends:
+    async def test_get_set_delete(self, backend):
+        assert await backend.get("k") is None
+        await backend.set("k", b"value", ttl=60)
+        assert await backend.get("k") == b"value"
+        await backend.delete("k")
+        assert await backend.get("k") is None
+
+    async def test_expiry(self, backend):
+        await backend.set("k", b"value", ttl=0.01)
+        await asyncio.sleep(0.02)
+        assert await backend.get("k") is None
+
+    async def test_incr(self, backend):
+        assert await backend.incr("n") == 1
+        assert await backend.incr("n") == 2
+        assert await backend.get("n") == b"2"
+
+    def test_create_backend(self, tmp_path):
+        assert create_backend("") is None
+        assert isinstance(create_backend("memory://"), MemoryBackend)
+        assert isinstance(
+            create_backend(f"sqlite:///{tmp_path / 'cache.db'}"), SQLiteBackend
+        )
+        with pytest.raises(ValueError):
+            create_backend("ftp://cache")
+
+
+class TestMemoryBackend:
+    async def test_least_recently_used_evicted(self):
+        backend = MemoryBackend(max_entries=2)
+        await backend.set("a", b"1", ttl=60)
+        await backend.set("b", b"2", ttl=60)
+        await backend.get("a")
+        await backend.set("c", b"3", ttl=60)
+        assert len(backend) == 2
+        assert await backend.get("a") == b"1"
+        assert await backend.get("b") is None
+
+    async def test_expired_entries_swept(self, mocker):
+        mocker.patch("cache.PURGE_EVERY", 2)
+        backend = MemoryBackend()
+        await backend.set("unread", b"1", ttl=0.01)
+        await asyncio.sleep(0.02)
+        await backend.set("k", b"2", ttl=60)
+        assert len(backend) == 1
+
+    async def test_counters_are_never_evicted(self):
+        backend = MemoryBackend(max_entries=1)
+        await backend.incr("tag")
+        await backend.set("a", b"1", ttl=60)
+        await backend.set("b", b"2", ttl=60)
+        assert await backend.incr("tag") == 2
+
+
+class TestTieredCache:
+    async def test_workers_share_l2(self, tmp_path):
+        path = str(tmp_path / "cache.db")
+        worker1 = TieredCache(SQLiteBackend(path))
+        worker2 = TieredCache(SQLiteBackend(path))
+
+        await worker1.set("news", "AAPL", [{"id": "a"}], ttl=60)
+        assert await worker2.get("news", "AAPL") == [{"id": "a"}]
+        assert worker2.stats()["l2Hits"] == 1
+
+        # Served from L1 afterwards
+        assert await worker2.get("news", "AAPL") == [{"id": "a"}]
+        assert worker2.stats()["l1Hits"] == 1
+
+    async def test_max_age(self):
+        cache = TieredCache(MemoryBackend())
+        await cache.set("fx", "usd", {"SGD": 1.35}, ttl=60)
+        await asyncio.sleep(0.02)
+        assert await cache.get("fx", "usd", max_age=60) == {"SGD": 1.35}
+        assert await cache.get("fx", "usd", max_age=0.01) is None
+
+    async def test_numpy_values_round_trip_as_lists(self):
+        writer = TieredCache(l2 := MemoryBackend())
+        reader = TieredCache(l2)
+        await writer.set("history", "k", {"close": np.array([1.5, 2.5])}, ttl=60)
+        assert await reader.get("history", "k") == {"close": [1.5, 2.5]}
+
+    async def test_get_or_load_shares_one_load(self):
+        cache = TieredCache(MemoryBackend())
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"value": 1}
+
+        results = await asyncio.gather(
+            *(cache.get_or_load("ns", "k", loader, ttl=60) for _ in range(50))
+        )
+        assert len(calls) == 1
+        assert all(r == {"value": 1} for r in results)
+
+    async def test_none_is_not_stored(self):
+        cache = TieredCache(MemoryBackend())
+        calls = []
+
+        async def loader():
+            calls.append(1)
+
+        await cache.get_or_load("ns", "k", loader, ttl=60)
+        await cache.get_or_load("ns", "k", loader, ttl=60)
+        assert len(calls) == 2
+
+    async def test_invalidate_tag_reaches_other_workers(self):
+        l2 = MemoryBackend()
+        worker1 = TieredCache(l2, l1_ttl=0.01)
+        worker2 = TieredCache(l2, l1_ttl=0.01)
+        tag = bars_tag(TickerEntry, "AAPL")
+
+        await worker1.set("history", "k", [1], ttl=60, tag=tag)
+        assert await worker2.get("history", "k", tag=tag) == [1]
+
+        await worker1.invalidate(tag)
+        assert await worker1.get("history", "k", tag=tag) is None
+        # Other workers notice once their L1 copy of the generation lapses
+        await asyncio.sleep(0.02)
+        assert await worker2.get("history", "k", tag=tag) is None
+
+        # Untagged values and other tickers are untouched
+        await worker1.set("news", "k", [2], ttl=60)
+        await worker1.invalidate(bars_tag(TickerEntry, "MSFT"))
+        assert await worker2.get("news", "k") == [2]
+
+    async def test_invalidate_without_l2(self):
+        cache = TieredCache(l1_ttl=0.01)
+        await cache.set("history", "k", [1], ttl=60, tag="t")
+        await cache.invalidate("t")
+        await asyncio.sleep(0.02)
+        assert await cache.get("history", "k", tag="t") is None
+
+    async def test_version_is_part_of_the_key(self, mocker):
+        l2 = MemoryBackend()
+        await TieredCache(l2).set("news", "k", [1], ttl=60)
+        mocker.patch("cache.CACHE_VERSION", 2)
+        assert await TieredCache(l2).get("news", "k") is None
+
+
+class TestSharedUsers:
+    async def test_info_fetched_once_across_workers(self):
+        l2 = MemoryBackend()
+        fetcher = FakeFetcher()
+        worker1 = TickerInfoCache(fetcher=fetcher, shared=TieredCache(l2))
+        worker2 = TickerInfoCache(fetcher=fetcher, shared=TieredCache(l2))
+
+        info = await worker1.get("AAPL")
+        assert await worker2.get("AAPL") == info
+        assert fetcher.calls == ["AAPL"]
+
+    async def test_info_live_age_is_kept_across_workers(self):
+        l2 = MemoryBackend()
+        fetcher = FakeFetcher()
+        worker1 = TickerInfoCache(
+            live_ttl=0.01, fetcher=fetcher, shared=TieredCache(l2)
+        )
+        worker2 = TickerInfoCache(
+            live_ttl=0.01, fetcher=fetcher, shared=TieredCache(l2)
+        )
+
+        await worker1.get("AAPL")
+        await asyncio.sleep(0.02)
+        await worker2.get("AAPL", live=False)
+        assert len(fetcher.calls) == 1
+        await worker2.get("AAPL")
+        assert len(fetcher.calls) == 2
+
+    async def test_ingestion_invalidates_bars(self, async_test_db):
+        tag = bars_tag(TickerEntry, "AAPL")
+        await shared_cache.set("history", "k", [1], ttl=60, tag=tag)
+
+        columns = {"timestamp": np.array([1, 2]), "close": np.array([1.0, 2.0])}
+        await bulk_upsert(async_test_db, TickerEntry, "AAPL", columns)
+        assert await shared_cache.get("history", "k", tag=tag) is None
@@ -0,0 +1,85 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import exchange_calendars as xcals
+import pandas as pd
+
+from calendars import calendar_registry
+from services import getExchangeHours, getExchangeSessions, getHoursWeek
+
+
+def ts(value: str) -> int:
+    return int(pd.Timestamp(value).timestamp())
+
+
+class TestCalendarRegistry:
+    def test_calendar_built_once(self):
+        assert calendar_registry.get("XNYS") is calendar_registry.get("XNYS")
+
+    def test_previous_open_close_match_exchange_calendars(self):
+        table = calendar_registry.get("XNYS")
+        calendar = xcals.get_calendar("XNYS")
+
+        for minute in (
+            "2025-06-02 15:00:00+00:00",  # Monday, in session
+            "2025-06-02 21:00:00+00:00",  # Monday, after close
+            "2025-06-07 12:00:00+00:00",  # Saturday
+        ):
+            t = pd.Timestamp(minute)
+            assert table.previous_open(ts(minute)) == int(
+                calendar.previous_open(t).timestamp()
+            )
+            assert table.previous_close(ts(minute)) == int(
+                calendar.previous_close(t).timestamp()
+            )
+
+    def test_is_open(self):
+        table = calendar_registry.get("XNYS")
+
+        assert table.is_open(ts("2025-06-02 15:00:00+00:00"))
+        assert not table.is_open(ts("2025-06-02 21:00:00+00:00"))
+        assert not table.is_open(ts("2025-06-07 15:00:00+00:00"))
+
+
+class TestExchangeHelpers:
+    def test_exchange_hours(self):
+        hours = getExchangeHours("XNYS", "2025-06-02")
+        assert hours == {
+            "openTimestamp": ts("2025-06-02 13:30:00+00:00"),
+            "closeTimestamp": ts("2025-06-02 20:00:00+00:00"),
+        }
+
+    def test_exchange_hours_on_holiday(self):
+        hours = getExchangeHours("XNYS", "2025-07-04")
+        assert hours == {"openTimestamp": None, "closeTimestamp": None}
+
+    def test_hours_week_matches_sessions_window(self):
+        calendar = xcals.get_calendar("XNYS")
+        now = datetime(2025, 6, 9, 8, 0, tzinfo=ZoneInfo("America/New_York"))
+
+        hours = getHoursWeek("XNYS", now)
+
+        # Before Monday's open, so the window ends on the previous Friday
+        window = calendar.sessions_window("2025-06-06", -5)
+        assert hours == {
+            "oldestOpen": int(calendar.session_open(window[0]).timestamp()),
+            "latestClose": int(calendar.session_close(window[-1]).timestamp()),
+        }
+
+    def test_exchange_sessions_are_local_midnights(self):
+        sessions = getExchangeSessions("XNYS", "2025-06-30", "2025-07-07")
+
+        expected = [
+            "2025-06-30",
+            "2025-07-01",
+            "2025-07-02",
+            "2025-07-03",
+            "2025-07-07",
+        ]
+        assert sessions["sessions"].tolist() == [
+            ts(f"{day} 00:00:00-04:00") for day in expected
+        ]
+        assert len(sessions["opens"]) == len(expected)
+
+    def test_exchange_sessions_outside_calendar(self):
+        assert getExchangeSessions("XNYS", "1990-01-01", "1990-02-01") is None
@@ -0,0 +1,48 @@
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from coverage import (
+    DAY_SECONDS,
+    load_coverage,
+    record_coverage,
+    uncovered_sessions,
+)
+
+
+def days(*offsets):
+    return np.array([o * DAY_SECONDS for o in offsets], dtype=np.int64)
+
+
+class TestUncoveredSessions:
+    def test_no_coverage(self):
+        sessions = days(1, 2, 3)
+        uncovered = uncovered_sessions(sessions, np.empty((0, 2)))
+        assert uncovered.tolist() == sessions.tolist()
+
+    def test_gaps_between_spans(self):
+        sessions = days(1, 2, 3, 4, 5, 6)
+        coverage = np.array([days(1, 2), days(5, 5)])
+
+        assert uncovered_sessions(sessions, coverage).tolist() == days(3, 4, 6).tolist()
+
+
+class TestRecordCoverage:
+    async def test_overlapping_and_adjacent_spans_merge(
+        self, async_test_db: AsyncSession
+    ):
+        await record_coverage(async_test_db, "AAPL", *days(1, 3))
+        await record_coverage(async_test_db, "AAPL", *days(10, 12))
+        await async_test_db.commit()
+
+        # Touches the first span and overlaps the second
+        await record_coverage(async_test_db, "AAPL", *days(4, 11))
+        await async_test_db.commit()
+
+        coverage = await load_coverage(async_test_db, "AAPL")
+        assert coverage.tolist() == [days(1, 12).tolist()]
+
+    async def test_spans_are_per_ticker(self, async_test_db: AsyncSession):
+        await record_coverage(async_test_db, "AAPL", *days(1, 3))
+        await async_test_db.commit()
+
+        assert len(await load_coverage(async_test_db, "MSFT")) == 0
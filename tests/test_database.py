@@ -0,0 +1,100 @@
+import pytest
+from sqlalchemy import text
+
+from database import SQLITE_PRAGMAS, create_engines, derive_urls, engine_options
+
+
+class TestDeriveUrls:
+    @pytest.mark.parametrize(
+        "url, sync_driver, async_driver",
+        [
+            ("sqlite:///equisight.db", "sqlite", "sqlite+aiosqlite"),
+            ("sqlite+aiosqlite:///equisight.db", "sqlite", "sqlite+aiosqlite"),
+            (
+                "postgresql://u:p@db/equisight",
+                "postgresql+psycopg",
+                "postgresql+asyncpg",
+            ),
+            (
+                "postgresql+asyncpg://u:p@db/equisight",
+                "postgresql+psycopg",
+                "postgresql+asyncpg",
+            ),
+        ],
+    )
+    def test_sync_and_async_drivers(self, url, sync_driver, async_driver):
+        sync_url, async_url = derive_urls(url)
+
+        assert sync_url.drivername == sync_driver
+        assert async_url.drivername == async_driver
+        # Everything but the driver is shared
+        assert sync_url.set(drivername="x") == async_url.set(drivername="x")
+
+    def test_unsupported_backend(self):
+        with pytest.raises(ValueError):
+            derive_urls("mysql://u:p@db/equisight")
+
+
+class TestEngineOptions:
+    def test_postgres_pool_settings(self):
+        sync_url, async_url = derive_urls("postgresql://u:p@db/equisight")
+
+        for url in (sync_url, async_url):
+            options = engine_options(url)
+            assert options["pool_pre_ping"] is True
+            assert {"pool_size", "max_overflow", "pool_recycle"} <= options.keys()
+
+    def test_sqlite_file_and_memory(self):
+        sync_url, async_url = derive_urls("sqlite:///equisight.db")
+        assert engine_options(sync_url)["connect_args"] == {"check_same_thread": False}
+        assert "connect_args" not in engine_options(async_url)
+
+        memory_url, _ = derive_urls("sqlite://")
+        assert "pool_size" not in engine_options(memory_url)
+
+
+class TestCreateEngines:
+    async def test_engines_share_one_database(self, tmp_path):
+        engine, async_engine = create_engines(f"sqlite:///{tmp_path / 'test.db'}")
+
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE t (x INTEGER)"))
+            conn.execute(text("INSERT INTO t VALUES (42)"))
+
+        async with async_engine.connect() as conn:
+            assert (await conn.execute(text("SELECT x FROM t"))).scalar() == 42
+
+        await async_engine.dispose()
+        engine.dispose()
+
+
+class TestSqliteTuning:
+    async def test_pragmas_applied_on_both_engines(self, tmp_path):
+        engine, async_engine = create_engines(
+            f"sqlite:///{tmp_path / 'test.db'}", sqlite_tuning=True
+        )
+
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert (
+                conn.execute(text("PRAGMA busy_timeout")).scalar()
+                == (SQLITE_PRAGMAS["busy_timeout"])
+            )
+        async with async_engine.connect() as conn:
+            assert (await conn.execute(text("PRAGMA cache_size"))).scalar() == (
+                SQLITE_PRAGMAS["cache_size"]
+            )
+            assert (await conn.execute(text("PRAGMA synchronous"))).scalar() == 1
+
+        await async_engine.dispose()
+        engine.dispose()
+
+    def test_tuning_can_be_disabled(self, tmp_path):
+        engine, _ = create_engines(
+            f"sqlite:///{tmp_path / 'test.db'}", sqlite_tuning=False
+        )
+
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+        engine.dispose()
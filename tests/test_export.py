@@ -0,0 +1,106 @@
+import io
+
+import numpy as np
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import routers.export
+from ingestion import bulk_upsert
+from models import TickerEntry, TickerInfo
+
+# The "export" extra is optional
+pa = pytest.importorskip("pyarrow")
+ipc = pytest.importorskip("pyarrow.ipc")
+pq = pytest.importorskip("pyarrow.parquet")
+
+DAY = 86400
+START = 1_735_689_600  # 2025-01-01 UTC
+
+
+async def store_history(db: AsyncSession, ticker: str, days: int):
+    columns = {
+        "timestamp": START + DAY * np.arange(days),
+        "close": 100.0 + np.arange(days),
+        "volume": 1000 + np.arange(days),
+    }
+    await bulk_upsert(db, TickerEntry, ticker, columns)
+    await db.commit()
+
+
+class TestExportHistory:
+    async def test_arrow_stream(
+        self, authenticated_client: AsyncClient, async_test_db: AsyncSession
+    ):
+        await store_history(async_test_db, "AAPL", 3)
+        await store_history(async_test_db, "MSFT", 2)
+
+        response = await authenticated_client.get(
+            "/export/history?symbols=aapl,MSFT,TSLA"
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+
+        table = ipc.open_stream(response.content).read_all()
+        assert table.column_names == ["ticker", "timestamp", "close", "volume"]
+        assert table.schema.field("timestamp").type == pa.timestamp("s", tz="UTC")
+        assert table["ticker"].to_pylist() == ["AAPL"] * 3 + ["MSFT"] * 2
+        assert table["close"].to_pylist() == [102.0, 101.0, 100.0, 101.0, 100.0]
+
+    async def test_parquet_with_date_range(
+        self, authenticated_client: AsyncClient, async_test_db: AsyncSession
+    ):
+        await store_history(async_test_db, "AAPL", 5)
+
+        response = await authenticated_client.get(
+            "/export/history?symbols=AAPL&start=2025-01-02&end=2025-01-03"
+            "&format=parquet"
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        frame = pq.read_table(io.BytesIO(response.content)).to_pandas()
+        assert frame["volume"].tolist() == [1002, 1001]
+        assert str(frame["timestamp"].iloc[-1]) == "2025-01-02 00:00:00+00:00"
+
+    async def test_range_uses_exchange_local_days(
+        self, authenticated_client: AsyncClient, async_test_db: AsyncSession
+    ):
+        # Tokyo bars are stored at local midnight, 15:00 UTC the day before
+        tokyo = START - 9 * 3600
+        async_test_db.add(
+            TickerInfo(ticker="7203.T", exchangeTimezoneName="Asia/Tokyo")
+        )
+        columns = {
+            "timestamp": tokyo + DAY * np.arange(4),
+            "close": 100.0 + np.arange(4),
+            "volume": 1000 + np.arange(4),
+        }
+        await bulk_upsert(async_test_db, TickerEntry, "7203.T", columns)
+        await async_test_db.commit()
+
+        response = await authenticated_client.get(
+            "/export/history?symbols=7203.T&start=2025-01-02&end=2025-01-03"
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        table = ipc.open_stream(response.content).read_all()
+        assert table["volume"].to_pylist() == [1002, 1001]
+
+    async def test_range_is_capped(self, authenticated_client: AsyncClient):
+        response = await authenticated_client.get(
+            "/export/history?symbols=AAPL&start=1900-01-01&end=2025-01-01"
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    async def test_invalid_dates(self, authenticated_client: AsyncClient):
+        response = await authenticated_client.get(
+            "/export/history?symbols=AAPL&start=01/02/2025"
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    async def test_without_pyarrow(self, authenticated_client: AsyncClient, mocker):
+        mocker.patch.object(routers.export, "pa", None)
+
+        response = await authenticated_client.get("/export/history?symbols=AAPL")
+        assert response.status_code == status.HTTP_501_NOT_IMPLEMENTED
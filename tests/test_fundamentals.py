@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+from fundamentals import METRIC_FIELDS, metric_rows, normalise_statements
+from services import (
+    ANNUAL_REPORTS,
+    QUARTERLY_REPORTS,
+    RECHECK_SECONDS,
+    next_report_expected,
+)
+
+PERIODS = list(pd.to_datetime(["2024-12-31", "2024-09-30"]))
+
+
+def frame(rows: dict) -> pd.DataFrame:
+    return pd.DataFrame(rows, index=PERIODS).T
+
+
+class TestNormaliseStatements:
+    def test_total_liabilities_fallback_chain(self):
+        balance = frame(
+            {
+                "Total Liab": [np.nan, 10.0],
+                "Total Liabilities Net Minority Interest": [20.0, 30.0],
+                "Total Liabilities": [40.0, 50.0],
+            }
+        )
+        metrics = normalise_statements({"balance": balance}, PERIODS)
+
+        # First label with a value wins, per period
+        np.testing.assert_array_equal(metrics["totalLiabilities"], [20.0, 10.0])
+
+    def test_missing_rows_and_statements_are_nan(self):
+        income = frame({"Total Revenue": [100.0, None]})
+        metrics = normalise_statements({"income": income, "cashflow": None}, PERIODS)
+
+        np.testing.assert_array_equal(metrics["revenue"], [100.0, np.nan])
+        assert np.isnan(metrics["freeCashFlow"]).all()
+        assert np.isnan(metrics["totalAssets"]).all()
+
+
+class TestMetricRows:
+    def test_rows_with_ratios(self):
+        statements = {
+            "income": frame(
+                {
+                    "Total Revenue": [200.0, 100.0],
+                    "Gross Profit": [50.0, 40.0],
+                    "Net Income": [20.0, 10.0],
+                }
+            ),
+            "balance": frame(
+                {
+                    "Total Assets": [400.0, 0.0],
+                    "Total Liabilities": [300.0, 150.0],
+                    "Stockholders Equity": [100.0, 0.0],
+                }
+            ),
+            "cashflow": frame({"Free Cash Flow": [5.0, 6.0]}),
+        }
+
+        rows = metric_rows("AAPL", "quarterEndDate", PERIODS, statements)
+
+        assert list(rows[0]) == ["ticker", "quarterEndDate", *METRIC_FIELDS]
+        assert rows[0]["ticker"] == "AAPL"
+        assert rows[0]["quarterEndDate"] == int(PERIODS[0].timestamp())
+        assert rows[0]["grossMargin"] == 0.25
+        assert rows[0]["roe"] == 0.2
+        assert rows[0]["roa"] == 0.05
+        assert rows[0]["debtToEquity"] == 3.0
+        assert rows[0]["eps"] is None
+        # Zero denominators give None rather than inf
+        assert rows[1]["roe"] is None
+        assert rows[1]["roa"] is None
+        assert rows[1]["debtToEquity"] is None
+        assert rows[1]["freeCashFlow"] == 6.0
+
+
+class TestNextReportExpected:
+    def test_expected_after_next_period_filing(self):
+        period_end = int(PERIODS[0].timestamp())
+        now = period_end + 30 * 86400
+
+        quarterly = next_report_expected(period_end, QUARTERLY_REPORTS, now)
+        annual = next_report_expected(period_end, ANNUAL_REPORTS, now)
+        assert now + 90 * 86400 < quarterly < annual
+
+    def test_overdue_filing_rechecks_daily(self):
+        period_end = int(PERIODS[0].timestamp())
+        now = period_end + 365 * 86400
+
+        assert next_report_expected(period_end, QUARTERLY_REPORTS, now) == (
+            now + RECHECK_SECONDS
+        )
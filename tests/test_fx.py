@@ -0,0 +1,176 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from cache import shared_cache
+from fx import FxRateStore, fx_market_open, fx_rates
+from upstream import UpstreamUnavailable
+
+USD_RATES = {"SGD": 1.35, "JPY": 150.0, "GBP": 0.8, "HKD": 7.8}
+
+
+class FakeFetcher:
+    def __init__(self, rates=USD_RATES, delay: float = 0.0):
+        self.rates = rates
+        self.delay = delay
+        self.calls = []
+
+    def __call__(self, currencies, market_open):
+        self.calls.append(list(currencies))
+        time.sleep(self.delay)
+        return {cur: self.rates[cur] for cur in currencies if cur in self.rates}
+
+
+class TestFxRateStore:
+    def test_cross_rates_are_triangulated_from_one_fetch(self):
+        fetcher = FakeFetcher()
+        store = FxRateStore(currencies=("SGD", "JPY", "GBP", "HKD"), fetcher=fetcher)
+
+        assert store.rate("SGD", "JPY") == pytest.approx(150.0 / 1.35)
+        assert store.rate("HKD", "GBP") == pytest.approx(0.8 / 7.8)
+        assert store.rate("JPY", "USD") == pytest.approx(1 / 150.0)
+        assert store.rate("usd", "sgd") == pytest.approx(1.35)
+        assert len(fetcher.calls) == 1
+
+    def test_same_currency_needs_no_fetch(self):
+        fetcher = FakeFetcher()
+        store = FxRateStore(fetcher=fetcher)
+
+        assert store.rate("SGD", "sgd") == 1.0
+        assert fetcher.calls == []
+
+    def test_peek_never_fetches(self):
+        fetcher = FakeFetcher()
+        store = FxRateStore(currencies=("SGD",), fetcher=fetcher)
+
+        assert store.peek("USD", "SGD") is None
+        store.refresh()
+        assert store.peek("USD", "SGD") == pytest.approx(1.35)
+        assert len(fetcher.calls) == 1
+
+    def test_stale_rates_refetch(self):
+        fetcher = FakeFetcher()
+        store = FxRateStore(
+            currencies=("SGD",), open_ttl=0.01, closed_ttl=0.01, fetcher=fetcher
+        )
+
+        store.rate("USD", "SGD")
+        time.sleep(0.02)
+        assert store.peek("USD", "SGD") is None
+        store.rate("USD", "SGD")
+        assert len(fetcher.calls) == 2
+
+    def test_unknown_currency_is_added_to_the_batch(self):
+        fetcher = FakeFetcher()
+        store = FxRateStore(currencies=("SGD",), fetcher=fetcher)
+
+        store.rate("USD", "SGD")
+        assert store.rate("SGD", "JPY") == pytest.approx(150.0 / 1.35)
+        assert fetcher.calls[-1] == ["JPY", "SGD"]
+
+    def test_unavailable_currency_raises(self):
+        store = FxRateStore(currencies=("SGD",), fetcher=FakeFetcher())
+
+        with pytest.raises(KeyError):
+            store.rate("SGD", "XYZ")
+        assert store.currencies == {"SGD"}
+
+    @pytest.mark.parametrize("answer", [{}, {"SGD": 1.4}])
+    def test_failed_refresh_keeps_previous_rates(self, answer):
+        fetcher = FakeFetcher()
+        store = FxRateStore(
+            currencies=("SGD", "JPY"), open_ttl=0.01, closed_ttl=0.01, fetcher=fetcher
+        )
+        store.rate("SGD", "JPY")
+        time.sleep(0.02)
+
+        # An empty or partial answer doesn't replace good rates
+        fetcher.rates = answer
+        assert store.rate("USD", "JPY") == pytest.approx(150.0)
+        assert store.peek("USD", "JPY") is None
+        assert store.snapshot() is None
+
+    def test_no_rates_at_all_is_upstream_unavailable(self):
+        store = FxRateStore(currencies=("SGD",), fetcher=FakeFetcher(rates={}))
+
+        with pytest.raises(UpstreamUnavailable):
+            store.rate("USD", "SGD")
+        assert store.snapshot() is None
+
+    async def test_concurrent_refreshes_share_one_fetch(self):
+        fetcher = FakeFetcher(delay=0.05)
+        store = FxRateStore(currencies=("SGD", "JPY"), fetcher=fetcher)
+
+        results = await asyncio.gather(
+            *(asyncio.to_thread(store.rate, "SGD", "JPY") for _ in range(8))
+        )
+
+        assert len(fetcher.calls) == 1
+        assert all(r == results[0] for r in results)
+
+
+class TestFxMarketOpen:
+    @pytest.mark.parametrize(
+        "ts, expected",
+        [
+            (datetime(2025, 6, 4, 12, tzinfo=timezone.utc), True),  # Wednesday
+            (datetime(2025, 6, 6, 21, 59, tzinfo=timezone.utc), True),  # Friday
+            (datetime(2025, 6, 6, 22, 0, tzinfo=timezone.utc), False),
+            (datetime(2025, 6, 7, 12, tzinfo=timezone.utc), False),  # Saturday
+            (datetime(2025, 6, 8, 21, 59, tzinfo=timezone.utc), False),  # Sunday
+            (datetime(2025, 6, 8, 22, 0, tzinfo=timezone.utc), True),
+        ],
+    )
+    def test_weekend_close(self, ts, expected):
+        assert fx_market_open(ts) is expected
+
+
+class TestForexEndpoint:
+    async def test_forex_answers_from_memory(self, authenticated_client, mocker):
+        fetcher = FakeFetcher()
+        mocker.patch.object(fx_rates, "_fetcher", fetcher)
+
+        first = await authenticated_client.get("/forex?fromCur=sgd&toCur=jpy")
+        second = await authenticated_client.get("/forex?fromCur=HKD&toCur=GBP")
+
+        assert first.status_code == 200
+        assert first.json() == {
+            "fromCurrency": "SGD",
+            "toCurrency": "JPY",
+            "forexRate": pytest.approx(150.0 / 1.35),
+        }
+        assert second.json()["forexRate"] == pytest.approx(0.8 / 7.8)
+        assert len(fetcher.calls) == 1
+
+    async def test_forex_unknown_currency(self, authenticated_client, mocker):
+        mocker.patch.object(fx_rates, "_fetcher", FakeFetcher())
+
+        response = await authenticated_client.get("/forex?fromCur=SGD&toCur=XYZ")
+
+        assert response.status_code == 400
+
+    async def test_forex_adopts_rates_shared_by_another_worker(
+        self, authenticated_client, mocker
+    ):
+        fetcher = FakeFetcher()
+        mocker.patch.object(fx_rates, "_fetcher", fetcher)
+        await authenticated_client.get("/forex?fromCur=SGD&toCur=JPY")
+
+        # A fresh worker's store is empty, but the shared cache has the rates
+        fx_rates.clear()
+        response = await authenticated_client.get("/forex?fromCur=HKD&toCur=GBP")
+
+        assert response.json()["forexRate"] == pytest.approx(0.8 / 7.8)
+        assert len(fetcher.calls) == 1
+
+    async def test_forex_empty_download_is_unavailable(
+        self, authenticated_client, mocker
+    ):
+        mocker.patch.object(fx_rates, "_fetcher", FakeFetcher(rates={}))
+
+        response = await authenticated_client.get("/forex?fromCur=SGD&toCur=JPY")
+
+        assert response.status_code == 503
+        assert await shared_cache.get("fx", "usd") is None
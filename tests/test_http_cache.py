@@ -0,0 +1,215 @@
+from fastapi import Request, status
+from httpx import AsyncClient
+
+from http_cache import (
+    cache_headers,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+)
+from tests.test_ticker import make_statements
+
+
+def make_request(headers: dict) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        }
+    )
+
+
+class TestConditionalHelpers:
+    def test_etag_is_weak_and_stable(self):
+        etag = make_etag("history", "AAPL", 1, 2)
+        assert etag.startswith('W/"')
+        assert etag == make_etag("history", "AAPL", 1, 2)
+        assert etag != make_etag("history", "AAPL", 1, 3)
+
+    def test_cache_headers(self):
+        headers = cache_headers('W/"abc"', 0, 60)
+        assert headers["ETag"] == 'W/"abc"'
+        assert headers["Cache-Control"] == "private, max-age=60"
+        assert headers["Last-Modified"] == "Thu, 01 Jan 1970 00:00:00 GMT"
+        assert "Last-Modified" not in cache_headers('W/"abc"', None, 60)
+
+    def test_if_none_match(self):
+        etag = make_etag("x")
+        assert is_not_modified(make_request({"If-None-Match": etag}), etag, None)
+        assert is_not_modified(
+            make_request({"If-None-Match": f'"other", {etag.removeprefix("W/")}'}),
+            etag,
+            None,
+        )
+        assert is_not_modified(make_request({"If-None-Match": "*"}), etag, None)
+        assert not is_not_modified(make_request({"If-None-Match": '"other"'}), etag, 0)
+
+    def test_if_none_match_takes_precedence(self):
+        request = make_request(
+            {
+                "If-None-Match": '"other"',
+                "If-Modified-Since": "Thu, 01 Jan 2099 00:00:00 GMT",
+            }
+        )
+        assert not is_not_modified(request, make_etag("x"), 0)
+
+    def test_if_modified_since(self):
+        etag = make_etag("x")
+        since = make_request({"If-Modified-Since": "Thu, 01 Jan 1970 00:01:00 GMT"})
+        assert is_not_modified(since, etag, 60)
+        assert not is_not_modified(since, etag, 61)
+        assert not is_not_modified(since, etag, None)
+        assert not is_not_modified(
+            make_request({"If-Modified-Since": "yesterday"}), etag, 0
+        )
+
+    def test_not_modified_response(self):
+        etag = make_etag("x")
+        assert not_modified_response(make_request({}), etag, 0, 60) is None
+        response = not_modified_response(
+            make_request({"If-None-Match": etag}), etag, 0, 60
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.headers["etag"] == etag
+        assert response.body == b""
+
+
+class TestConditionalEndpoints:
+    async def test_history_revalidation(
+        self, authenticated_client: AsyncClient, mock_yfinance
+    ):
+        url = "/ticker/AAPL/history?start=2023-01-01&end=2023-01-05"
+        response = await authenticated_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        etag = response.headers["etag"]
+        # A fully closed range can be cached for a long time
+        assert response.headers["cache-control"] == "private, max-age=86400"
+
+        response = await authenticated_client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+        last_modified = response.headers["last-modified"]
+        response = await authenticated_client.get(
+            url, headers={"If-Modified-Since": last_modified}
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        # Each representation has its own validator
+        response = await authenticated_client.get(
+            url + "&format=columnar", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"] != etag
+
+    async def test_open_range_has_no_last_modified(
+        self, authenticated_client: AsyncClient, mock_yfinance, mocker
+    ):
+        import time
+
+        from services import getExchangeSessions
+
+        # The range's last session is still trading
+        def open_sessions(*args):
+            sessions = getExchangeSessions(*args)
+            sessions["closes"] = sessions["closes"].copy()
+            sessions["closes"][-1] = int(time.time()) + 3600
+            return sessions
+
+        mocker.patch("routers.ticker.getExchangeSessions", side_effect=open_sessions)
+        url = "/ticker/AAPL/history?start=2023-01-01&end=2023-01-05"
+        response = await authenticated_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["history"]
+        assert "last-modified" not in response.headers
+
+        # If-Modified-Since alone can't confirm a bar rewritten in place
+        response = await authenticated_client.get(
+            url, headers={"If-Modified-Since": "Thu, 01 Jan 2099 00:00:00 GMT"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        response = await authenticated_client.get(
+            url, headers={"If-None-Match": response.headers["etag"]}
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    async def test_volume_rewrite_changes_etag(
+        self, authenticated_client: AsyncClient, async_test_db, mock_yfinance
+    ):
+        from sqlalchemy import select
+
+        from models import TickerEntry
+
+        url = "/ticker/AAPL/history?start=2023-01-01&end=2023-01-05"
+        response = await authenticated_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        etag = response.headers["etag"]
+
+        # Only the volume of one bar is rewritten
+        bar = (
+            await async_test_db.execute(
+                select(TickerEntry)
+                .where(TickerEntry.ticker == "AAPL")
+                .order_by(TickerEntry.timestamp.desc())
+                .limit(1)
+            )
+        ).scalar_one()
+        bar.volume += 1
+        await async_test_db.commit()
+
+        response = await authenticated_client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"] != etag
+
+    async def test_quarterly_reports_revalidation_skips_service(
+        self, authenticated_client: AsyncClient, mock_yfinance
+    ):
+        ticker_instance = mock_yfinance["ticker_instance"]
+        (
+            ticker_instance.quarterly_income_stmt,
+            ticker_instance.quarterly_balance_sheet,
+            ticker_instance.quarterly_cashflow,
+        ) = make_statements(["2024-09-30", "2024-06-30", "2024-03-31", "2023-12-31"])
+        response = await authenticated_client.get("/ticker/AAPL/quarterly-reports")
+        assert response.status_code == status.HTTP_200_OK
+        etag = response.headers["etag"]
+        assert "max-age=" in response.headers["cache-control"]
+
+        constructed = mock_yfinance["ticker_constructor"].call_count
+        response = await authenticated_client.get(
+            "/ticker/AAPL/quarterly-reports", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert mock_yfinance["ticker_constructor"].call_count == constructed
+
+    async def test_news_revalidation(
+        self, authenticated_client: AsyncClient, mock_yfinance
+    ):
+        article = {
+            "content": {
+                "id": "abc",
+                "title": "Title",
+                "provider": {"displayName": "Provider"},
+                "summary": "Summary",
+                "pubDate": "2024-01-02T03:04:05Z",
+            }
+        }
+        mock_yfinance["ticker_instance"].get_news.return_value = [article]
+
+        response = await authenticated_client.get("/ticker/AAPL/news")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["cache-control"] == "private, max-age=300"
+        etag = response.headers["etag"]
+
+        response = await authenticated_client.get(
+            "/ticker/AAPL/news", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        article["content"]["id"] = "def"
+        response = await authenticated_client.get(
+            "/ticker/AAPL/news", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == status.HTTP_200_OK
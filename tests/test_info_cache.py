@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from info_cache import TickerInfoCache
+from upstream import INFO, UpstreamUnavailable, upstream_guard
+
+
+class FakeFetcher:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+        self.failing = False
+
+    def __call__(self, symbol: str) -> dict:
+        with self._lock:
+            self.calls.append(symbol)
+        time.sleep(self.delay)
+        if self.failing:
+            raise RuntimeError("429 Too Many Requests")
+        if symbol == "INVALID":
+            return {}
+        return {
+            "symbol": symbol,
+            "exchangeTimezoneName": "America/New_York",
+            "marketState": "REGULAR",
+            "regularMarketPrice": 100.0 + len(self.calls),
+        }
+
+
+class TestTickerInfoCache:
+    async def test_concurrent_misses_share_one_fetch(self):
+        fetcher = FakeFetcher(delay=0.05)
+        cache = TickerInfoCache(fetcher=fetcher)
+
+        results = await asyncio.gather(*(cache.get("aapl") for _ in range(200)))
+
+        assert fetcher.calls == ["AAPL"]
+        assert all(r is results[0] for r in results)
+
+    async def test_live_ttl_expires_before_static_ttl(self):
+        fetcher = FakeFetcher()
+        cache = TickerInfoCache(static_ttl=60, live_ttl=0.01, fetcher=fetcher)
+
+        await cache.get("AAPL")
+        await asyncio.sleep(0.02)
+
+        # Static lookups still hit the cache
+        await cache.get("AAPL", live=False)
+        assert len(fetcher.calls) == 1
+
+        # Live lookups refetch
+        await cache.get("AAPL")
+        assert len(fetcher.calls) == 2
+
+    async def test_lru_eviction(self):
+        fetcher = FakeFetcher()
+        cache = TickerInfoCache(max_size=2, fetcher=fetcher)
+
+        await cache.get("AAPL")
+        await cache.get("MSFT")
+        await cache.get("AAPL")
+        await cache.get("GOOGL")
+
+        assert len(cache) == 2
+        await cache.get("AAPL")
+        assert fetcher.calls == ["AAPL", "MSFT", "GOOGL"]
+        await cache.get("MSFT")
+        assert fetcher.calls == ["AAPL", "MSFT", "GOOGL", "MSFT"]
+
+    async def test_empty_info_not_cached(self):
+        fetcher = FakeFetcher()
+        cache = TickerInfoCache(fetcher=fetcher)
+
+        assert await cache.get("INVALID") == {}
+        assert await cache.get("INVALID") == {}
+        assert len(fetcher.calls) == 2
+
+
+class TestStaleInfo:
+    async def test_failed_refetch_serves_stale(self):
+        fetcher = FakeFetcher()
+        cache = TickerInfoCache(live_ttl=0.01, fetcher=fetcher)
+        info = await cache.get("AAPL")
+        await asyncio.sleep(0.02)
+
+        fetcher.failing = True
+        assert await cache.lookup("AAPL") == (info, True)
+
+    async def test_open_circuit_serves_stale_and_refreshes_in_background(self):
+        fetcher = FakeFetcher(delay=0.05)
+        cache = TickerInfoCache(live_ttl=0.01, fetcher=fetcher)
+        info = await cache.get("AAPL")
+        await asyncio.sleep(0.02)
+
+        breaker = upstream_guard.breaker(INFO)
+        for _ in range(breaker.min_calls):
+            breaker.record(0.0, False)
+        breaker.cooldown = 0
+
+        # Answered without waiting for the (probe) fetch
+        assert await cache.lookup("AAPL") == (info, True)
+        assert len(fetcher.calls) == 1
+        await asyncio.sleep(0.1)
+        assert len(fetcher.calls) == 2
+        assert upstream_guard.is_healthy(INFO)
+
+    async def test_nothing_to_serve_raises(self):
+        fetcher = FakeFetcher()
+        fetcher.failing = True
+        cache = TickerInfoCache(fetcher=fetcher)
+        with pytest.raises(RuntimeError):
+            await cache.get("AAPL")
+
+        breaker = upstream_guard.breaker(INFO)
+        for _ in range(breaker.min_calls):
+            breaker.record(0.0, False)
+        with pytest.raises(UpstreamUnavailable):
+            await cache.get("AAPL")
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ingestion import bulk_upsert, frame_to_columns
+from models import Intraday, TickerEntry
+
+
+def make_minute_bars(count: int) -> pd.DataFrame:
+    index = pd.date_range(
+        "2025-06-02 09:30", periods=count, freq="min", tz="America/New_York"
+    )
+    df = pd.DataFrame(
+        {"Close": np.linspace(100.0, 101.0, count), "Volume": np.arange(count)},
+        index=index,
+    )
+    df.index.name = "Datetime"
+    return df
+
+
+class TestFrameToColumns:
+    def test_timestamps_are_epoch_seconds(self):
+        df = make_minute_bars(3)
+
+        columns = frame_to_columns(df, {"close": "Close", "volume": "Volume"})
+
+        expected = [int(ts.timestamp()) for ts in df.index]
+        assert columns["timestamp"].tolist() == expected
+        assert columns["volume"].dtype == np.int64
+        assert columns["close"].tolist() == df["Close"].tolist()
+
+    def test_rows_with_missing_values_are_dropped(self):
+        df = make_minute_bars(4)
+        df.iloc[1, 0] = np.nan
+
+        columns = frame_to_columns(df, {"close": "Close"})
+
+        assert len(columns["timestamp"]) == 3
+        assert not np.isnan(columns["close"]).any()
+
+    def test_empty_frame(self):
+        columns = frame_to_columns(pd.DataFrame(), {"close": "Close"})
+
+        assert len(columns["timestamp"]) == 0
+        assert len(columns["close"]) == 0
+
+
+class TestBulkUpsert:
+    async def test_inserts_all_rows(self, async_test_db: AsyncSession):
+        df = make_minute_bars(2500)
+        columns = frame_to_columns(df, {"close": "Close"})
+
+        await bulk_upsert(async_test_db, Intraday, "AAPL", columns)
+        await async_test_db.commit()
+
+        count = await async_test_db.scalar(select(func.count()).select_from(Intraday))
+        assert count == 2500
+
+    async def test_integer_columns_round_trip(self, async_test_db: AsyncSession):
+        df = make_minute_bars(5)
+        columns = frame_to_columns(df, {"close": "Close", "volume": "Volume"})
+
+        await bulk_upsert(async_test_db, TickerEntry, "AAPL", columns)
+        await async_test_db.commit()
+
+        result = await async_test_db.execute(
+            select(TickerEntry).order_by(TickerEntry.timestamp)
+        )
+        entries = result.scalars().all()
+        assert [e.volume for e in entries] == [0, 1, 2, 3, 4]
+        assert all(e.ticker == "AAPL" for e in entries)
+
+    async def test_conflicts_update_or_skip(self, async_test_db: AsyncSession):
+        df = make_minute_bars(3)
+        columns = frame_to_columns(df, {"close": "Close"})
+        await bulk_upsert(async_test_db, Intraday, "AAPL", columns)
+
+        revised = dict(columns, close=columns["close"] + 1.0)
+        await bulk_upsert(async_test_db, Intraday, "AAPL", revised)
+        await async_test_db.commit()
+        closes = await async_test_db.scalars(
+            select(Intraday.close).order_by(Intraday.timestamp)
+        )
+        assert closes.all() == columns["close"].tolist()
+
+        await bulk_upsert(async_test_db, Intraday, "AAPL", revised, ("close",))
+        await async_test_db.commit()
+        closes = await async_test_db.scalars(
+            select(Intraday.close).order_by(Intraday.timestamp)
+        )
+        assert closes.all() == revised["close"].tolist()
+
+        count = await async_test_db.scalar(select(func.count()).select_from(Intraday))
+        assert count == 3
@@ -0,0 +1,216 @@
+from fastapi import status
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+
+from tests.test_ticker import make_statements
+
+HISTORY_ROUTE = "/ticker/{ticker}/history"
+HISTORY_URL = "/ticker/AAPL/history?start=2023-01-01&end=2023-01-05"
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestMetrics:
+    async def test_metrics_endpoint(self, authenticated_client: AsyncClient):
+        response = await authenticated_client.get("/metrics")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "equisight_request_duration_seconds" in response.text
+
+    async def test_upstream_queue_depth_exported(
+        self, authenticated_client: AsyncClient
+    ):
+        from upstream import upstream_executor
+
+        response = await authenticated_client.get("/metrics")
+        for metric in (
+            "equisight_upstream_queued_calls",
+            "equisight_upstream_active_calls",
+            "equisight_upstream_peak_queued_calls",
+        ):
+            assert metric in response.text
+        assert (
+            sample("equisight_upstream_peak_queued_calls")
+            == upstream_executor.stats()["peakQueued"]
+        )
+
+    async def test_history_timings_are_labelled_by_route(
+        self, authenticated_client: AsyncClient, mock_yfinance
+    ):
+        requests = sample(
+            "equisight_request_duration_seconds_count",
+            method="GET",
+            route=HISTORY_ROUTE,
+            status="200",
+        )
+        upstream = sample(
+            "equisight_upstream_call_duration_seconds_count",
+            call="get_missing_data",
+            route=HISTORY_ROUTE,
+            outcome="ok",
+        )
+        selects = sample(
+            "equisight_db_duration_seconds_count",
+            operation="select",
+            route=HISTORY_ROUTE,
+        )
+        commits = sample(
+            "equisight_db_duration_seconds_count",
+            operation="commit",
+            route=HISTORY_ROUTE,
+        )
+        encodes = sample(
+            "equisight_serialization_duration_seconds_count", route=HISTORY_ROUTE
+        )
+
+        response = await authenticated_client.get(HISTORY_URL)
+        assert response.status_code == status.HTTP_200_OK
+
+        assert (
+            sample(
+                "equisight_request_duration_seconds_count",
+                method="GET",
+                route=HISTORY_ROUTE,
+                status="200",
+            )
+            == requests + 1
+        )
+        assert (
+            sample(
+                "equisight_upstream_call_duration_seconds_count",
+                call="get_missing_data",
+                route=HISTORY_ROUTE,
+                outcome="ok",
+            )
+            == upstream + 1
+        )
+        assert (
+            sample(
+                "equisight_db_duration_seconds_count",
+                operation="select",
+                route=HISTORY_ROUTE,
+            )
+            > selects
+        )
+        assert (
+            sample(
+                "equisight_db_duration_seconds_count",
+                operation="commit",
+                route=HISTORY_ROUTE,
+            )
+            > commits
+        )
+        assert (
+            sample(
+                "equisight_serialization_duration_seconds_count",
+                route=HISTORY_ROUTE,
+            )
+            == encodes + 1
+        )
+
+    async def test_unmatched_paths_share_one_label(
+        self, authenticated_client: AsyncClient
+    ):
+        before = sample(
+            "equisight_request_duration_seconds_count",
+            method="GET",
+            route="unmatched",
+            status="404",
+        )
+        await authenticated_client.get("/no/such/path")
+        assert (
+            sample(
+                "equisight_request_duration_seconds_count",
+                method="GET",
+                route="unmatched",
+                status="404",
+            )
+            == before + 1
+        )
+
+    async def test_ticker_info_hits_and_misses(
+        self, authenticated_client: AsyncClient, mock_yfinance
+    ):
+        hits = sample(
+            "equisight_cache_lookups_total", cache="ticker_info", result="hit"
+        )
+        misses = sample(
+            "equisight_cache_lookups_total", cache="ticker_info", result="miss"
+        )
+
+        await authenticated_client.get(HISTORY_URL)
+        await authenticated_client.get(HISTORY_URL)
+
+        assert (
+            sample("equisight_cache_lookups_total", cache="ticker_info", result="miss")
+            == misses + 1
+        )
+        assert (
+            sample("equisight_cache_lookups_total", cache="ticker_info", result="hit")
+            == hits + 1
+        )
+
+    async def test_metrics_table_hits_and_misses(
+        self, authenticated_client: AsyncClient, mock_yfinance
+    ):
+        ticker_instance = mock_yfinance["ticker_instance"]
+        (
+            ticker_instance.quarterly_income_stmt,
+            ticker_instance.quarterly_balance_sheet,
+            ticker_instance.quarterly_cashflow,
+        ) = make_statements(["2024-09-30", "2024-06-30", "2024-03-31", "2023-12-31"])
+        hits = sample(
+            "equisight_cache_lookups_total", cache="quarterly_metrics", result="hit"
+        )
+        misses = sample(
+            "equisight_cache_lookups_total", cache="quarterly_metrics", result="miss"
+        )
+
+        await authenticated_client.get("/ticker/AAPL/quarterly-reports")
+        await authenticated_client.get("/ticker/AAPL/quarterly-reports")
+
+        assert (
+            sample(
+                "equisight_cache_lookups_total",
+                cache="quarterly_metrics",
+                result="miss",
+            )
+            == misses + 4
+        )
+        assert (
+            sample(
+                "equisight_cache_lookups_total", cache="quarterly_metrics", result="hit"
+            )
+            == hits + 4
+        )
+
+    async def test_statement_downloads_are_labelled_by_statement(
+        self, authenticated_client: AsyncClient, mock_yfinance
+    ):
+        ticker_instance = mock_yfinance["ticker_instance"]
+        (
+            ticker_instance.quarterly_income_stmt,
+            ticker_instance.quarterly_balance_sheet,
+            ticker_instance.quarterly_cashflow,
+        ) = make_statements(["2024-09-30", "2024-06-30", "2024-03-31", "2023-12-31"])
+        route = "/ticker/{ticker}/quarterly-reports"
+        before = sample(
+            "equisight_upstream_call_duration_seconds_count",
+            call="quarterly_cashflow",
+            route=route,
+            outcome="ok",
+        )
+
+        await authenticated_client.get("/ticker/AAPL/quarterly-reports")
+
+        assert (
+            sample(
+                "equisight_upstream_call_duration_seconds_count",
+                call="quarterly_cashflow",
+                route=route,
+                outcome="ok",
+            )
+            == before + 1
+        )
@@ -0,0 +1,91 @@
+from sqlalchemy import create_engine, inspect, text
+
+from migrations import run_migrations
+
+
+def make_legacy_engine():
+    engine = create_engine("sqlite:///:memory:")
+    with engine.begin() as conn:
+        for table in ("ticker_entries", "intraday_entries", "intraweek_entries"):
+            conn.execute(
+                text(
+                    f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, ticker VARCHAR, "
+                    "timestamp BIGINT, close FLOAT, volume INTEGER)"
+                )
+            )
+            conn.execute(text(f"CREATE INDEX ix_{table}_ticker ON {table} (ticker)"))
+            conn.execute(
+                text(f"CREATE INDEX ix_{table}_timestamp ON {table} (timestamp)")
+            )
+    return engine
+
+
+class TestMigrations:
+    def test_duplicates_removed_and_unique_index_created(self):
+        engine = make_legacy_engine()
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    "INSERT INTO intraday_entries (ticker, timestamp, close) VALUES "
+                    "('AAPL', 100, 1.0), ('AAPL', 100, 2.0), ('AAPL', 160, 3.0), "
+                    "('MSFT', 100, 4.0)"
+                )
+            )
+
+        run_migrations(engine)
+
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text(
+                    "SELECT ticker, timestamp, close FROM intraday_entries "
+                    "ORDER BY ticker, timestamp"
+                )
+            ).all()
+        assert rows == [("AAPL", 100, 2.0), ("AAPL", 160, 3.0), ("MSFT", 100, 4.0)]
+
+        indexes = {
+            ix["name"]: ix for ix in inspect(engine).get_indexes("intraday_entries")
+        }
+        assert set(indexes) == {"ix_intraday_entries_ticker_timestamp"}
+        assert indexes["ix_intraday_entries_ticker_timestamp"]["unique"]
+
+    def test_migrations_apply_once(self):
+        engine = make_legacy_engine()
+
+        run_migrations(engine)
+        run_migrations(engine)
+
+        with engine.connect() as conn:
+            applied = conn.execute(text("SELECT name FROM schema_migrations")).all()
+        assert applied == [("0001_unique_time_series",), ("0002_unique_metrics",)]
+
+    def test_duplicate_report_periods_removed(self):
+        engine = make_legacy_engine()
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    "CREATE TABLE quarterly_metrics (id INTEGER PRIMARY KEY, "
+                    'ticker VARCHAR, "quarterEndDate" BIGINT, revenue FLOAT)'
+                )
+            )
+            conn.execute(
+                text(
+                    'INSERT INTO quarterly_metrics (ticker, "quarterEndDate", revenue) '
+                    "VALUES ('AAPL', 100, 1.0), ('AAPL', 100, 1.0), ('AAPL', 200, 2.0)"
+                )
+            )
+
+        run_migrations(engine)
+
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text(
+                    'SELECT ticker, "quarterEndDate" FROM quarterly_metrics '
+                    'ORDER BY "quarterEndDate"'
+                )
+            ).all()
+        assert rows == [("AAPL", 100), ("AAPL", 200)]
+        indexes = inspect(engine).get_indexes("quarterly_metrics")
+        assert [(ix["name"], ix["unique"]) for ix in indexes] == [
+            ("ix_quarterly_metrics_ticker_quarterEndDate", 1)
+        ]
@@ -0,0 +1,118 @@
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from models import Intraday, Intraweek, TickerInfo, User, UserWatchlist
+from refresher import MarketDataRefresher
+
+# Monday 2025-06-02 11:00 New York, XNYS in session, XTKS closed
+IN_SESSION = int(pd.Timestamp("2025-06-02 15:00:00+00:00").timestamp())
+
+
+def make_download(symbols, period, interval):
+    freq = "min" if interval == "1m" else "h"
+    index = pd.date_range(
+        "2025-06-02 09:30", periods=3, freq=freq, tz="America/New_York"
+    )
+    return {
+        symbol: pd.DataFrame({"Close": [1.0, 2.0, 3.0], "Volume": [1, 2, 3]}, index)
+        for symbol in symbols
+    }
+
+
+async def watch(db: AsyncSession, user: User, ticker: str, tznStr: str):
+    db.add(UserWatchlist(user_id=user.id, ticker=ticker))
+    db.add(TickerInfo(ticker=ticker, exchangeTimezoneName=tznStr))
+    await db.commit()
+
+
+class TestMarketDataRefresher:
+    async def test_refreshes_only_exchanges_in_session(
+        self, async_test_db: AsyncSession, test_user: User, mocker
+    ):
+        download = mocker.patch("refresher.download_bars", side_effect=make_download)
+        await watch(async_test_db, test_user, "AAPL", "America/New_York")
+        await watch(async_test_db, test_user, "MSFT", "America/New_York")
+        await watch(async_test_db, test_user, "7203.T", "Asia/Tokyo")
+
+        refresher = MarketDataRefresher(
+            sessionmaker(async_test_db.bind, class_=AsyncSession)
+        )
+        await refresher.refresh_once(now=IN_SESSION)
+
+        # One batched download per bar size, Tokyo skipped
+        assert download.call_count == 2
+        for call in download.call_args_list:
+            assert sorted(call.args[0]) == ["AAPL", "MSFT"]
+
+        intraday_count = await async_test_db.scalar(
+            select(func.count()).select_from(Intraday)
+        )
+        intraweek_count = await async_test_db.scalar(
+            select(func.count()).select_from(Intraweek)
+        )
+        assert intraday_count == 6
+        assert intraweek_count == 6
+
+        assert refresher.is_fresh("aapl", Intraday)
+        assert not refresher.is_fresh("7203.T", Intraday)
+
+    async def test_intervals_respected(
+        self, async_test_db: AsyncSession, test_user: User, mocker
+    ):
+        download = mocker.patch("refresher.download_bars", side_effect=make_download)
+        await watch(async_test_db, test_user, "AAPL", "America/New_York")
+
+        refresher = MarketDataRefresher(
+            sessionmaker(async_test_db.bind, class_=AsyncSession)
+        )
+        await refresher.refresh_once(now=IN_SESSION)
+        await refresher.refresh_once(now=IN_SESSION)
+
+        assert download.call_count == 2
+
+    async def test_failed_info_lookup_skips_only_that_ticker(
+        self, async_test_db: AsyncSession, test_user: User, mocker
+    ):
+        download = mocker.patch("refresher.download_bars", side_effect=make_download)
+        mocker.patch("refresher.ticker_info_cache.get", side_effect=Exception("429"))
+        await watch(async_test_db, test_user, "AAPL", "America/New_York")
+        # No stored timezone, so the refresher has to look it up
+        async_test_db.add(UserWatchlist(user_id=test_user.id, ticker="NEW"))
+        await async_test_db.commit()
+
+        refresher = MarketDataRefresher(
+            sessionmaker(async_test_db.bind, class_=AsyncSession)
+        )
+        await refresher.refresh_once(now=IN_SESSION)
+
+        assert download.call_count == 2
+        for call in download.call_args_list:
+            assert call.args[0] == ["AAPL"]
+
+    async def test_failed_exchange_does_not_block_others(
+        self, async_test_db: AsyncSession, test_user: User, mocker
+    ):
+        # 16:00 London, so XLON is in session alongside XNYS
+        def download(symbols, period, interval):
+            if "AAPL" in symbols:
+                raise Exception("429")
+            return make_download(symbols, period, interval)
+
+        mocker.patch("refresher.download_bars", side_effect=download)
+        await watch(async_test_db, test_user, "AAPL", "America/New_York")
+        await watch(async_test_db, test_user, "VOD.L", "Europe/London")
+
+        refresher = MarketDataRefresher(
+            sessionmaker(async_test_db.bind, class_=AsyncSession)
+        )
+        await refresher.refresh_once(now=IN_SESSION)
+
+        assert refresher.is_fresh("VOD.L", Intraday)
+        assert refresher.is_fresh("VOD.L", Intraweek)
+        assert not refresher.is_fresh("AAPL", Intraday)
+        intraday_count = await async_test_db.scalar(
+            select(func.count()).select_from(Intraday)
+        )
+        assert intraday_count == 3
@@ -0,0 +1,109 @@
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ingestion import bulk_upsert
+from models import Intraday, TickerEntry
+from repository import (
+    bar_columns,
+    bar_columns_many,
+    bar_rows,
+    latest_timestamp,
+    latest_timestamps,
+    stream_bar_rows,
+)
+
+START = 1_749_043_800
+
+
+async def store_bars(db: AsyncSession, model, ticker: str, count: int):
+    columns = {
+        "timestamp": START + 60 * np.arange(count),
+        "close": 100.0 + np.arange(count),
+        "volume": 1000 + np.arange(count),
+    }
+    await bulk_upsert(db, model, ticker, columns)
+    await db.commit()
+
+
+class TestBarReads:
+    async def test_rows_are_column_tuples_newest_first(
+        self, async_test_db: AsyncSession
+    ):
+        await store_bars(async_test_db, TickerEntry, "AAPL", 5)
+
+        rows = await bar_rows(
+            async_test_db,
+            TickerEntry,
+            "AAPL",
+            ("timestamp", "close"),
+            START + 60,
+            START + 180,
+        )
+
+        assert rows == [(START + 180, 103.0), (START + 120, 102.0), (START + 60, 101.0)]
+
+    async def test_columns_are_typed_arrays(self, async_test_db: AsyncSession):
+        await store_bars(async_test_db, TickerEntry, "AAPL", 3)
+
+        columns = await bar_columns(
+            async_test_db, TickerEntry, "AAPL", ("timestamp", "close", "volume")
+        )
+
+        assert columns["timestamp"].dtype == np.int64
+        assert columns["close"].dtype == np.float64
+        assert columns["volume"].tolist() == [1002, 1001, 1000]
+
+    async def test_no_bars_gives_empty_arrays(self, async_test_db: AsyncSession):
+        columns = await bar_columns(
+            async_test_db, Intraday, "AAPL", ("timestamp", "close")
+        )
+
+        assert columns["timestamp"].size == 0
+        assert columns["close"].dtype == np.float64
+
+    async def test_many_tickers_in_one_query(self, async_test_db: AsyncSession):
+        await store_bars(async_test_db, Intraday, "AAPL", 3)
+        await store_bars(async_test_db, Intraday, "MSFT", 2)
+
+        bars = await bar_columns_many(
+            async_test_db,
+            Intraday,
+            ["MSFT", "AAPL", "TSLA"],
+            ("timestamp", "close"),
+            START + 60,
+        )
+
+        assert list(bars) == ["MSFT", "AAPL", "TSLA"]
+        assert bars["AAPL"]["timestamp"].tolist() == [START + 120, START + 60]
+        assert bars["MSFT"]["close"].tolist() == [101.0]
+        assert bars["TSLA"]["timestamp"].size == 0
+
+    async def test_latest_timestamps(self, async_test_db: AsyncSession):
+        await store_bars(async_test_db, Intraday, "AAPL", 3)
+        await store_bars(async_test_db, Intraday, "MSFT", 1)
+
+        assert await latest_timestamp(async_test_db, Intraday, "AAPL") == START + 120
+        assert (
+            await latest_timestamp(async_test_db, Intraday, "AAPL", START + 600) is None
+        )
+        assert await latest_timestamps(
+            async_test_db, Intraday, ["AAPL", "MSFT", "TSLA"]
+        ) == {"AAPL": START + 120, "MSFT": START}
+
+    async def test_stream_in_chunks(self, async_test_db: AsyncSession):
+        await store_bars(async_test_db, TickerEntry, "AAPL", 25)
+
+        chunks = [
+            rows
+            async for rows in stream_bar_rows(
+                async_test_db.bind,
+                TickerEntry,
+                "AAPL",
+                ("timestamp", "close"),
+                chunk_rows=10,
+            )
+        ]
+
+        assert [len(rows) for rows in chunks] == [10, 10, 5]
+        assert chunks[0][0] == (START + 60 * 24, 124.0)
+        assert chunks[-1][-1] == (START, 100.0)
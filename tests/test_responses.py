@@ -0,0 +1,49 @@
+import json
+import numpy as np
+
+import responses
+from responses import FastJSONResponse, time_series_payload
+
+COLUMNS = {
+    "timestamp": np.array([1700000000, 1700086400]),
+    "close": np.array([1.5, 2.5]),
+}
+
+
+class TestFastJSONResponse:
+    def test_encodes_numpy_arrays(self):
+        content = {"timestamp": np.array([1, 2], dtype=np.int64), "x": np.float64(1.5)}
+
+        body = FastJSONResponse(content=content).body
+
+        assert json.loads(body) == {"timestamp": [1, 2], "x": 1.5}
+
+    def test_stdlib_fallback(self, mocker):
+        mocker.patch.object(responses, "orjson", None)
+        content = {"close": np.array([1.5, 2.5]), "n": np.int64(3)}
+
+        body = FastJSONResponse(content=content).body
+
+        assert body == b'{"close":[1.5,2.5],"n":3}'
+
+
+class TestTimeSeriesPayload:
+    def test_rows(self):
+        rows = time_series_payload("AAPL", COLUMNS, False)
+
+        assert rows == [
+            {"ticker": "AAPL", "timestamp": 1700000000, "close": 1.5},
+            {"ticker": "AAPL", "timestamp": 1700086400, "close": 2.5},
+        ]
+
+    def test_columnar(self):
+        volume = np.array([10, None], dtype=object)
+        columns = time_series_payload("AAPL", COLUMNS | {"volume": volume}, True)
+
+        body = json.loads(FastJSONResponse(content=columns).body)
+        assert body == {
+            "ticker": "AAPL",
+            "timestamp": [1700000000, 1700086400],
+            "close": [1.5, 2.5],
+            "volume": [10, None],
+        }
@@ -1,9 +1,13 @@
+import asyncio
+import time
+from unittest.mock import MagicMock
+
 from fastapi import status
 from httpx import AsyncClient
 
 
 class TestTickerEndpoints:
-    async def test_get_valid_ticker_info_no_caching(
+    async def test_get_valid_ticker_info_with_caching(
         self, authenticated_client: AsyncClient, mock_yfinance
     ):
         # First call
@@ -13,14 +17,14 @@ class TestTickerEndpoints:
         assert data1["symbol"] == "AAPL"
         assert data1["shortName"] == "Apple Inc."
 
-        # Second call - should call yfinance again (no caching for info)
+        # Second call - should be served from the info cache
         response2 = await authenticated_client.get("/ticker/AAPL/info")
         assert response2.status_code == status.HTTP_200_OK
         data2 = response2.json()
         assert data1 == data2
 
-        # Verify the constructor was called twice (no caching)
-        assert mock_yfinance["ticker_constructor"].call_count == 2
+        # Verify the constructor was only called once
+        assert mock_yfinance["ticker_constructor"].call_count == 1
 
     async def test_get_ticker_info_stores_timezone(
         self, authenticated_client: AsyncClient, mock_yfinance
@@ -63,8 +67,43 @@ class TestTickerEndpoints:
         data2 = response2.json()
         assert data1 == data2
 
-        # The constructor might be called once more for timezone lookup, but not for data fetching
-        # The exact behavior depends on your caching implementation
+        # The covered range is answered from the DB without calling yfinance
+        assert mock_yfinance["ticker_instance"].history.call_count == 1
+
+    async def test_get_ticker_history_columnar(
+        self, authenticated_client: AsyncClient, mock_yfinance
+    ):
+        params = "start=2023-01-01&end=2023-01-05"
+        rows = await authenticated_client.get(f"/ticker/AAPL/history?{params}")
+        columnar = await authenticated_client.get(
+            f"/ticker/AAPL/history?{params}&format=columnar"
+        )
+        assert columnar.status_code == status.HTTP_200_OK
+
+        history = columnar.json()["history"]
+        assert history["ticker"] == "AAPL"
+        assert history["timestamp"] == [e["timestamp"] for e in rows.json()["history"]]
+        assert history["close"] == [e["close"] for e in rows.json()["history"]]
+        assert history["volume"] == [e["volume"] for e in rows.json()["history"]]
+
+        invalid = await authenticated_client.get("/ticker/AAPL/history?format=csv")
+        assert invalid.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    async def test_get_ticker_history_ndjson(
+        self, authenticated_client: AsyncClient, mock_yfinance
+    ):
+        import json
+
+        params = "start=2023-01-01&end=2023-01-05"
+        rows = await authenticated_client.get(f"/ticker/AAPL/history?{params}")
+        streamed = await authenticated_client.get(
+            f"/ticker/AAPL/history?{params}&format=ndjson"
+        )
+        assert streamed.status_code == status.HTTP_200_OK
+        assert streamed.headers["content-type"] == "application/x-ndjson"
+
+        lines = [json.loads(line) for line in streamed.text.splitlines()]
+        assert lines == rows.json()["history"]
 
     async def test_get_ticker_history_different_date_ranges(
         self, authenticated_client: AsyncClient, mock_yfinance
@@ -86,6 +125,26 @@ class TestTickerEndpoints:
         # Should have made additional calls for the new date range
         assert mock_yfinance["ticker_constructor"].call_count > initial_call_count
 
+    async def test_empty_history_answer_is_not_covered(
+        self, authenticated_client: AsyncClient, mock_yfinance
+    ):
+        import pandas as pd
+
+        url = "/ticker/AAPL/history?start=2023-01-03&end=2023-01-06"
+        history = mock_yfinance["ticker_instance"].history
+        history.side_effect = lambda **kwargs: pd.DataFrame()
+        response = await authenticated_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["history"] == []
+        assert response.headers["Warning"].startswith("110")
+
+        history.side_effect = None
+        calls = history.call_count
+        response = await authenticated_client.get(url)
+        assert history.call_count == calls + 1
+        assert len(response.json()["history"]) > 0
+        assert "Warning" not in response.headers
+
     async def test_get_invalid_ticker_info(
         self, authenticated_client: AsyncClient, mock_yfinance
     ):
@@ -148,3 +207,332 @@ class TestTickerEndpoints:
         assert "exchangeTimezoneName" not in data
         # Verify the mock was called
         mock_yfinance["ticker_constructor"].assert_called_with("AAPL")
+
+
+class TestBatchEndpoints:
+    async def test_batch_info(self, authenticated_client: AsyncClient, mock_yfinance):
+        response = await authenticated_client.get(
+            "/ticker/batch/info?symbols=aapl,GOOGL,INVALID,AAPL"
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+
+        assert set(data["tickers"]) == {"AAPL", "GOOGL"}
+        assert data["tickers"]["AAPL"]["shortName"] == "Apple Inc."
+        assert data["invalid"] == ["INVALID"]
+
+    async def test_batch_info_requires_symbols(
+        self, authenticated_client: AsyncClient, mock_yfinance
+    ):
+        response = await authenticated_client.get("/ticker/batch/info?symbols=,")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    async def test_batch_intraday_single_download(
+        self, authenticated_client: AsyncClient, mock_yfinance, mocker
+    ):
+        import pandas as pd
+
+        from calendars import calendar_registry
+
+        exchange = calendar_registry.get("XNYS")
+        idx = exchange.latest_open_index(int(time.time()))
+        marketOpen = int(exchange.opens[idx])
+        index = pd.to_datetime([marketOpen, marketOpen + 60], unit="s", utc=True)
+
+        def fake_download(symbols, period, interval):
+            return {
+                s: pd.DataFrame({"Close": [1.0, 2.0]}, index=index) for s in symbols
+            }
+
+        download = mocker.patch(
+            "routers.ticker.download_bars", side_effect=fake_download
+        )
+
+        response = await authenticated_client.get(
+            "/ticker/batch/intraday?symbols=AAPL,MSFT"
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+
+        assert download.call_count == 1
+        assert sorted(download.call_args.args[0]) == ["AAPL", "MSFT"]
+        for symbol in ("AAPL", "MSFT"):
+            assert data["intraday"][symbol]["marketOpen"] == marketOpen
+            assert [e["timestamp"] for e in data["intraday"][symbol]["intraday"]] == [
+                marketOpen + 60,
+                marketOpen,
+            ]
+
+
+def make_statements(periods):
+    """Income, balance and cashflow frames shaped like yfinance's, newest first"""
+    import pandas as pd
+
+    columns = pd.to_datetime(periods)
+    income = pd.DataFrame(
+        {
+            c: {
+                "Total Revenue": 1000.0 + i,
+                "Gross Profit": 400.0,
+                "Net Income": 100.0,
+                "Diluted EPS": 1.5,
+                "EBITDA": 200.0,
+            }
+            for i, c in enumerate(columns)
+        }
+    )
+    balance = pd.DataFrame(
+        {
+            c: {
+                "Total Assets": 5000.0,
+                "Total Liabilities Net Minority Interest": 3000.0,
+                "Stockholders Equity": 2000.0,
+            }
+            for c in columns
+        }
+    )
+    cashflow = pd.DataFrame(
+        {c: {"Operating Cash Flow": 150.0, "Free Cash Flow": 120.0} for c in columns}
+    )
+    return income, balance, cashflow
+
+
+class TestReportEndpoints:
+    async def test_quarterly_reports_stored_and_reused(
+        self, authenticated_client: AsyncClient, mock_yfinance
+    ):
+        income, balance, cashflow = make_statements(
+            ["2024-12-31", "2024-09-30", "2024-06-30", "2024-03-31", "2023-12-31"]
+        )
+        ticker_instance = mock_yfinance["ticker_instance"]
+        ticker_instance.quarterly_income_stmt = income
+        ticker_instance.quarterly_balance_sheet = balance
+        ticker_instance.quarterly_cashflow = cashflow
+
+        response = await authenticated_client.get("/ticker/AAPL/quarterly-reports")
+        assert response.status_code == status.HTTP_200_OK
+        reports = response.json()["quarterlyReports"]
+        assert len(reports) == 4
+        assert reports[0]["revenue"] == 1000.0
+        assert reports[0]["totalLiabilities"] == 3000.0
+        assert reports[0]["grossMargin"] == 0.4
+        assert reports[0]["roe"] == 0.05
+        assert reports[0]["roa"] == 0.02
+
+        # Second request is served from the DB without peeking upstream
+        ticker_instance.quarterly_income_stmt = None
+        ticker_instance.quarterly_cashflow = None
+        response = await authenticated_client.get("/ticker/aapl/quarterly-reports")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["quarterlyReports"] == reports
+
+    async def test_concurrent_first_requests_store_each_period_once(
+        self, authenticated_client: AsyncClient, mock_yfinance
+    ):
+        ticker_instance = mock_yfinance["ticker_instance"]
+        (
+            ticker_instance.quarterly_income_stmt,
+            ticker_instance.quarterly_balance_sheet,
+            ticker_instance.quarterly_cashflow,
+        ) = make_statements(["2024-09-30", "2024-06-30", "2024-03-31", "2023-12-31"])
+
+        responses = await asyncio.gather(
+            *(
+                authenticated_client.get("/ticker/AAPL/quarterly-reports")
+                for _ in range(4)
+            )
+        )
+        assert all(r.status_code == status.HTTP_200_OK for r in responses)
+
+        response = await authenticated_client.get("/ticker/AAPL/quarterly-reports")
+        dates = [r["quarterEndDate"] for r in response.json()["quarterlyReports"]]
+        assert len(set(dates)) == 4
+
+    async def test_new_quarter_only_adds_missing_rows(
+        self, authenticated_client: AsyncClient, mock_yfinance, async_test_db, mocker
+    ):
+        from sqlalchemy import func, select
+
+        from models import FundamentalsSchedule, QuarterlyMetrics
+
+        ticker_instance = mock_yfinance["ticker_instance"]
+        (
+            ticker_instance.quarterly_income_stmt,
+            ticker_instance.quarterly_balance_sheet,
+            ticker_instance.quarterly_cashflow,
+        ) = make_statements(["2024-09-30", "2024-06-30", "2024-03-31", "2023-12-31"])
+        await authenticated_client.get("/ticker/AAPL/quarterly-reports")
+
+        (
+            ticker_instance.quarterly_income_stmt,
+            ticker_instance.quarterly_balance_sheet,
+            ticker_instance.quarterly_cashflow,
+        ) = make_statements(["2024-12-31", "2024-09-30", "2024-06-30", "2024-03-31"])
+        # Past the date the next filing was expected
+        mocker.patch("services.time.time", return_value=time.time() + 200 * 86400)
+        response = await authenticated_client.get("/ticker/AAPL/quarterly-reports")
+        reports = response.json()["quarterlyReports"]
+
+        # Older quarters keep their stored values
+        assert [r["revenue"] for r in reports] == [1000.0, 1000.0, 1001.0, 1002.0]
+        count = await async_test_db.scalar(
+            select(func.count()).select_from(QuarterlyMetrics)
+        )
+        assert count == 5
+        schedule = await async_test_db.scalar(select(FundamentalsSchedule))
+        assert schedule.period == "quarterly"
+        assert schedule.nextExpected > schedule.lastChecked
+
+    async def test_annual_reports(
+        self, authenticated_client: AsyncClient, mock_yfinance
+    ):
+        income, balance, cashflow = make_statements(["2024-12-31", "2023-12-31"])
+        ticker_instance = mock_yfinance["ticker_instance"]
+        ticker_instance.income_stmt = income
+        ticker_instance.balance_sheet = balance
+        ticker_instance.cashflow = cashflow
+
+        response = await authenticated_client.get("/ticker/AAPL/annual-reports")
+        assert response.status_code == status.HTTP_200_OK
+        reports = response.json()["annualReports"]
+        assert [r["revenue"] for r in reports] == [1000.0, 1001.0]
+        assert reports[0]["roe"] == 0.05
+        assert reports[0]["debtToEquity"] == 1.5
+
+    async def test_reports_without_statements(
+        self, authenticated_client: AsyncClient, mock_yfinance
+    ):
+        import pandas as pd
+
+        mock_yfinance["ticker_instance"].quarterly_cashflow = pd.DataFrame()
+
+        response = await authenticated_client.get("/ticker/AAPL/quarterly-reports")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def trip(kind):
+    """Open the circuit for upstream endpoint type `kind`"""
+    from upstream import upstream_guard
+
+    breaker = upstream_guard.breaker(kind)
+    for _ in range(breaker.min_calls):
+        breaker.record(0.0, False)
+
+
+class TestUpstreamFailures:
+    async def test_info_throttled_is_unavailable_not_invalid(
+        self, authenticated_client: AsyncClient, mock_yfinance
+    ):
+        mock_yfinance["ticker_constructor"].side_effect = Exception("Too Many Requests")
+        response = await authenticated_client.get("/ticker/AAPL/info")
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert "Retry-After" in response.headers
+
+    async def test_info_served_stale_while_circuit_open(
+        self, authenticated_client: AsyncClient, mock_yfinance, mocker
+    ):
+        from info_cache import ticker_info_cache
+        from upstream import INFO
+
+        response = await authenticated_client.get("/ticker/AAPL/info")
+        assert "Warning" not in response.headers
+        mocker.patch.object(ticker_info_cache, "live_ttl", 0)
+        trip(INFO)
+
+        response = await authenticated_client.get("/ticker/AAPL/info")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["symbol"] == "AAPL"
+        assert response.headers["Warning"].startswith("110")
+        assert mock_yfinance["ticker_constructor"].call_count == 1
+
+    async def test_batch_info_reports_throttled_symbols_as_unavailable(
+        self, authenticated_client: AsyncClient, mock_yfinance
+    ):
+        from tests.conftest import get_mock_ticker_info
+
+        def throttled(symbol, session=None):
+            if symbol == "MSFT":
+                raise Exception("Too Many Requests")
+            if symbol == "INVALID":
+                instance = MagicMock()
+                instance.info = {}
+                return instance
+            instance = MagicMock()
+            instance.info = get_mock_ticker_info(symbol)
+            return instance
+
+        mock_yfinance["ticker_constructor"].side_effect = throttled
+        response = await authenticated_client.get(
+            "/ticker/batch/info?symbols=AAPL,MSFT,INVALID"
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert set(data["tickers"]) == {"AAPL"}
+        assert data["invalid"] == ["INVALID"]
+        assert data["unavailable"] == ["MSFT"]
+
+    async def test_batch_intraday_uses_stored_timezone_while_throttled(
+        self, authenticated_client: AsyncClient, async_test_db, mock_yfinance, mocker
+    ):
+        from models import TickerInfo
+
+        async_test_db.add(
+            TickerInfo(ticker="AAPL", exchangeTimezoneName="America/New_York")
+        )
+        await async_test_db.commit()
+        mock_yfinance["ticker_constructor"].side_effect = Exception("429")
+        mocker.patch("routers.ticker.download_bars", side_effect=Exception("429"))
+
+        response = await authenticated_client.get(
+            "/ticker/batch/intraday?symbols=AAPL,MSFT"
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert set(data["intraday"]) == {"AAPL"}
+        assert data["invalid"] == []
+        assert data["unavailable"] == ["MSFT"]
+        assert response.headers["Warning"].startswith("110")
+
+    async def test_intraweek_falls_back_to_stored_bars(
+        self, authenticated_client: AsyncClient, async_test_db, mock_yfinance
+    ):
+        import numpy as np
+
+        from calendars import calendar_registry
+        from ingestion import bulk_upsert
+        from models import Intraweek
+        from routers.ticker import background_refreshes
+        from upstream import BARS, upstream_guard
+
+        exchange = calendar_registry.get("XNYS")
+        window = exchange.last_sessions(5, int(time.time()))
+        latestClose = int(exchange.closes[window][-1])
+        stored = np.array([latestClose - 7200, latestClose - 3600])
+        await bulk_upsert(
+            async_test_db,
+            Intraweek,
+            "AAPL",
+            {"timestamp": stored, "close": np.array([1.0, 2.0])},
+            ("close",),
+        )
+        await async_test_db.commit()
+
+        # A failing fetch is answered from the DB
+        mock_yfinance["ticker_instance"].history.side_effect = Exception("429")
+        response = await authenticated_client.get("/ticker/AAPL/intraweek")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["Warning"].startswith("110")
+        assert [e["timestamp"] for e in response.json()["intraweek"]] == sorted(
+            stored.tolist(), reverse=True
+        )
+
+        # With the circuit open the fetch moves to the background
+        trip(BARS)
+        calls = mock_yfinance["ticker_instance"].history.call_count
+        response = await authenticated_client.get("/ticker/AAPL/intraweek")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["Warning"].startswith("110")
+        await asyncio.gather(*background_refreshes.values())
+        # ...where the open circuit turns it away without calling Yahoo
+        assert upstream_guard.breaker(BARS).stats()["rejected"] == 1
+        assert mock_yfinance["ticker_instance"].history.call_count == calls
@@ -0,0 +1,148 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from upstream import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    UpstreamExecutor,
+    UpstreamGuard,
+    UpstreamUnavailable,
+)
+
+
+class TestUpstreamExecutor:
+    async def test_concurrency_is_bounded(self):
+        executor = UpstreamExecutor(max_workers=2)
+        lock = threading.Lock()
+        running = 0
+        peak = 0
+
+        def slow_call():
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+
+        await asyncio.gather(*(executor.run(slow_call) for _ in range(6)))
+
+        assert peak == 2
+        stats = executor.stats()
+        assert stats["completed"] == 6
+        assert stats["peakQueued"] >= 4
+        assert stats["queued"] == 0
+        assert stats["active"] == 0
+        executor.shutdown()
+
+    async def test_queue_depth_reported_while_busy(self):
+        executor = UpstreamExecutor(max_workers=1)
+        release = threading.Event()
+
+        tasks = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+
+        stats = executor.stats()
+        assert stats["active"] == 1
+        assert stats["queued"] == 2
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert executor.stats()["queued"] == 0
+        executor.shutdown()
+
+    async def test_errors_propagate_and_are_counted(self):
+        executor = UpstreamExecutor(max_workers=1)
+
+        def failing_call():
+            raise ValueError("upstream down")
+
+        with pytest.raises(ValueError):
+            await executor.run(failing_call)
+
+        assert executor.stats()["failed"] == 1
+        executor.shutdown()
+
+
+class TestCircuitBreaker:
+    def test_opens_on_failure_ratio(self):
+        breaker = CircuitBreaker("info", min_calls=4, failure_ratio=0.5)
+        for ok in (True, True, False):
+            breaker.record(0.01, ok)
+        assert breaker.state == CLOSED
+
+        breaker.record(0.01, False)
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+        assert breaker.stats()["errorRate"] == 0.5
+        assert breaker.stats()["rejected"] == 1
+
+    def test_slow_calls_count_as_failures(self):
+        breaker = CircuitBreaker("bars", min_calls=2, slow_call=0.5)
+        breaker.record(1.0, True)
+        breaker.record(1.0, True)
+        assert breaker.state == OPEN
+
+    async def test_single_probe_after_cooldown(self):
+        breaker = CircuitBreaker("news", min_calls=1, cooldown=0.01)
+        breaker.record(0.01, False)
+        assert not breaker.allow()
+
+        await asyncio.sleep(0.02)
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow()
+        assert not breaker.allow()
+
+        breaker.record(0.01, True)
+        assert breaker.state == CLOSED
+        assert breaker.allow()
+
+    async def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker("news", min_calls=1, cooldown=0.01)
+        breaker.record(0.01, False)
+        await asyncio.sleep(0.02)
+        assert breaker.allow()
+        breaker.record(0.01, False)
+        assert breaker.state == OPEN
+        assert breaker.retry_after() > 0
+
+
+class TestUpstreamGuard:
+    async def test_open_circuit_rejects_without_calling(self):
+        executor = UpstreamExecutor(max_workers=1)
+        guard = UpstreamGuard(executor, min_calls=2)
+        calls = []
+
+        def failing_call():
+            calls.append(1)
+            raise ValueError("429 Too Many Requests")
+
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                await guard.run("info", failing_call)
+        assert not guard.is_healthy("info")
+
+        with pytest.raises(UpstreamUnavailable):
+            await guard.run("info", failing_call)
+        assert len(calls) == 2
+        # Other endpoint types are unaffected
+        assert guard.is_healthy("bars")
+        executor.shutdown()
+
+    async def test_timeout_counts_as_failure(self):
+        executor = UpstreamExecutor(max_workers=1)
+        guard = UpstreamGuard(executor, timeout=0.01, min_calls=1)
+        release = threading.Event()
+
+        with pytest.raises(UpstreamUnavailable):
+            await guard.run("bars", release.wait)
+        assert guard.stats()["bars"]["state"] == OPEN
+
+        release.set()
+        executor.shutdown()
@@ -273,3 +273,54 @@ class TestWatchlistEndpoints:
             f"/users/me/watchlist/{ticker_symbol}"
         )
         assert len(response.json()["positions"]) == 0
+
+    async def test_watchlist_snapshot_empty(
+        self,
+        authenticated_client: AsyncClient,
+        test_user: User,
+        async_test_db: AsyncSession,
+    ):
+        response = await authenticated_client.get("/users/me/watchlist/snapshot")
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["holdings"] == []
+        assert data["totalMarketValue"] is None
+
+    async def test_watchlist_snapshot_aggregates_positions(
+        self,
+        authenticated_client: AsyncClient,
+        test_user: User,
+        async_test_db: AsyncSession,
+        mock_yfinance,
+        mocker,
+    ):
+        mocker.patch("routers.watchlist.get_rate", return_value=1.5)
+        await authenticated_client.post("/users/me/watchlist/AAPL")
+        for position in (
+            {"direction": "BUY", "quantity": 10, "unitCost": 100.0},
+            {"direction": "BUY", "quantity": 10, "unitCost": 200.0},
+            {"direction": "SELL", "quantity": 5, "unitCost": 250.0},
+        ):
+            await authenticated_client.post(
+                "/users/me/watchlist/AAPL/positions", json=position
+            )
+
+        response = await authenticated_client.get(
+            "/users/me/watchlist/snapshot?currency=sgd"
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+
+        assert data["baseCurrency"] == "SGD"
+        [holding] = data["holdings"]
+        assert holding["ticker"] == "AAPL"
+        assert holding["quantity"] == 15
+        assert holding["averageCost"] == 150.0
+        assert holding["costBasis"] == 2250.0
+        assert holding["realizedPnl"] == 500.0
+        # Mocked regularMarketPrice is 200.0 USD
+        assert holding["marketValue"] == 3000.0
+        assert holding["unrealizedPnl"] == 750.0
+        assert holding["currency"] == "USD"
+        assert data["totalMarketValue"] == 4500.0
+        assert data["totalUnrealizedPnl"] == 1125.0
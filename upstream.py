@@ -0,0 +1,284 @@
+import asyncio
+import functools
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import (
+    current_route,
+    export_upstream_pool,
+    observe_circuit,
+    observe_upstream,
+)
+
+# yfinance is synchronous; every upstream call runs on this pool so a slow
+# Yahoo response never blocks the event loop
+UPSTREAM_MAX_WORKERS = int(os.getenv("EQUISIGHT_UPSTREAM_WORKERS", "8"))
+# A guarded call waiting longer than this (queueing included) fails and
+# counts against its circuit; the worker thread finishes on its own
+UPSTREAM_TIMEOUT_SECONDS = float(os.getenv("EQUISIGHT_UPSTREAM_TIMEOUT", "15"))
+# Circuit breaker settings, shared by every endpoint type
+CIRCUIT_WINDOW = 20
+CIRCUIT_MIN_CALLS = 5
+CIRCUIT_FAILURE_RATIO = 0.5
+CIRCUIT_SLOW_CALL_SECONDS = float(os.getenv("EQUISIGHT_UPSTREAM_SLOW_CALL", "5"))
+CIRCUIT_COOLDOWN_SECONDS = float(os.getenv("EQUISIGHT_CIRCUIT_COOLDOWN", "30"))
+
+# Yahoo endpoint types, each behind its own circuit
+INFO = "info"
+BARS = "bars"
+FUNDAMENTALS = "fundamentals"
+NEWS = "news"
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class UpstreamUnavailable(Exception):
+    """The circuit for `kind` is open, or the call timed out"""
+
+    def __init__(self, kind: str, retry_after: float = 0):
+        super().__init__(f"Upstream {kind} data is unavailable")
+        self.kind = kind
+        self.retry_after = retry_after
+
+
+def call_name(fn) -> str:
+    """Metric label for an upstream callable, e.g. get_news_sync or rate"""
+    fn = getattr(fn, "func", fn)
+    return getattr(fn, "__name__", type(fn).__name__)
+
+
+class UpstreamExecutor:
+    """
+    Size-bounded thread pool for upstream I/O that tracks queue depth.
+
+    `queued` counts calls waiting for a worker, `active` calls currently
+    running, `peakQueued` the deepest backlog seen since startup.
+    """
+
+    def __init__(self, max_workers: int = UPSTREAM_MAX_WORKERS):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="upstream"
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._peak_queued = 0
+        self._completed = 0
+        self._failed = 0
+
+    async def run(self, fn, *args, **kwargs):
+        call = functools.partial(fn, *args, **kwargs)
+        with self._lock:
+            self._queued += 1
+            self._peak_queued = max(self._peak_queued, self._queued)
+
+        # Labels are resolved here, the worker thread has no request context
+        future = self._executor.submit(self._call, call, call_name(fn), current_route())
+        future.add_done_callback(self._on_done)
+        return await asyncio.wrap_future(future)
+
+    def _call(self, call, name: str, route: str):
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = call()
+            ok = True
+            return result
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            observe_upstream(name, route, time.perf_counter() - start, ok)
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+
+    def _on_done(self, future):
+        # Cancelled before a worker picked it up, so _call never ran
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "maxWorkers": self.max_workers,
+                "active": self._active,
+                "queued": self._queued,
+                "peakQueued": self._peak_queued,
+                "completed": self._completed,
+                "failed": self._failed,
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+class CircuitBreaker:
+    """
+    Error rate and latency of the last `window` calls to one endpoint type.
+
+    Once at least `min_calls` are recorded and `failure_ratio` of them failed
+    or took `slow_call` seconds or more, the circuit opens and calls are
+    rejected for `cooldown` seconds. Then a single probe call is let through
+    (half open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        window: int = CIRCUIT_WINDOW,
+        min_calls: int = CIRCUIT_MIN_CALLS,
+        failure_ratio: float = CIRCUIT_FAILURE_RATIO,
+        slow_call: float = CIRCUIT_SLOW_CALL_SECONDS,
+        cooldown: float = CIRCUIT_COOLDOWN_SECONDS,
+    ):
+        self.kind = kind
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.slow_call = slow_call
+        self.cooldown = cooldown
+        # (seconds, ok) per call
+        self._calls: deque[tuple[float, bool]] = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self.retry_after() == 0:
+            return HALF_OPEN
+        return self._state
+
+    def retry_after(self) -> float:
+        """Seconds until the circuit lets a probe through"""
+        if self._state != OPEN:
+            return 0
+        return max(self._opened_at + self.cooldown - time.monotonic(), 0)
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead; a True in half-open state is the probe"""
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self._probing:
+            self._state = HALF_OPEN
+            self._probing = True
+            observe_circuit(self.kind, HALF_OPEN)
+            return True
+        self._rejected += 1
+        return False
+
+    def record(self, seconds: float, ok: bool):
+        self._probing = False
+        ok = ok and seconds < self.slow_call
+        self._calls.append((seconds, ok))
+        if self._state == HALF_OPEN:
+            if ok:
+                self._calls.clear()
+                self._transition(CLOSED)
+            else:
+                self._open()
+        elif self._state == CLOSED and len(self._calls) >= self.min_calls:
+            failures = sum(1 for _, call_ok in self._calls if not call_ok)
+            if failures >= self.failure_ratio * len(self._calls):
+                self._open()
+
+    def release(self):
+        """A probe ended without an outcome (e.g. the caller was cancelled)"""
+        self._probing = False
+
+    def _open(self):
+        self._opened_at = time.monotonic()
+        self._transition(OPEN)
+        print(f"Upstream {self.kind} circuit opened for {self.cooldown:.0f}s.")
+
+    def _transition(self, state: str):
+        self._state = state
+        observe_circuit(self.kind, state)
+
+    def stats(self) -> dict:
+        seconds = sorted(s for s, _ in self._calls)
+        failures = sum(1 for _, ok in self._calls if not ok)
+        return {
+            "state": self.state,
+            "calls": len(seconds),
+            "errorRate": failures / len(seconds) if seconds else 0.0,
+            "p95Seconds": seconds[int(0.95 * (len(seconds) - 1))] if seconds else 0.0,
+            "rejected": self._rejected,
+            "retryAfter": self.retry_after(),
+        }
+
+
+class UpstreamGuard:
+    """One circuit breaker per Yahoo endpoint type in front of the pool"""
+
+    def __init__(
+        self,
+        executor: UpstreamExecutor,
+        timeout: float = UPSTREAM_TIMEOUT_SECONDS,
+        **breaker_options,
+    ):
+        self.executor = executor
+        self.timeout = timeout
+        self._breaker_options = breaker_options
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def breaker(self, kind: str) -> CircuitBreaker:
+        breaker = self._breakers.get(kind)
+        if breaker is None:
+            breaker = CircuitBreaker(kind, **self._breaker_options)
+            self._breakers[kind] = breaker
+        return breaker
+
+    def is_healthy(self, kind: str) -> bool:
+        """False while `kind` is failing; callers should then serve what they have"""
+        return self.breaker(kind).state == CLOSED
+
+    async def run(self, kind: str, fn, *args, **kwargs):
+        breaker = self.breaker(kind)
+        if not breaker.allow():
+            raise UpstreamUnavailable(kind, breaker.retry_after())
+
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(
+                self.executor.run(fn, *args, **kwargs), self.timeout
+            )
+        except TimeoutError:
+            breaker.record(time.perf_counter() - start, False)
+            raise UpstreamUnavailable(kind, breaker.retry_after())
+        except Exception:
+            breaker.record(time.perf_counter() - start, False)
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        breaker.record(time.perf_counter() - start, True)
+        return result
+
+    def stats(self) -> dict:
+        return {kind: breaker.stats() for kind, breaker in self._breakers.items()}
+
+    def reset(self):
+        self._breakers.clear()
+
+
+upstream_executor = UpstreamExecutor()
+export_upstream_pool(upstream_executor.stats)
+upstream_guard = UpstreamGuard(upstream_executor)
+
+
+async def run_upstream(kind: str, fn, *args, **kwargs):
+    """Run a yfinance call for endpoint type `kind` on the pool, guarded"""
+    return await upstream_guard.run(kind, fn, *args, **kwargs)